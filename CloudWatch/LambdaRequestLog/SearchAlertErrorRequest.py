@@ -7,9 +7,11 @@ import re
 import inspect
 import sys
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from dataclasses import dataclass, fields
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple, TypeVar
 
 __SCRIPT_DIR: str = os.path.dirname(os.path.abspath(__file__))
 __PROJ_DIR = os.path.dirname(os.path.dirname(__SCRIPT_DIR))
@@ -17,11 +19,17 @@ if __PROJ_DIR not in sys.path:
     sys.path.insert(0, __PROJ_DIR)
 
 from CloudWatch.LambdaRequestLog.AlertDataclass import LogDetail  # noqa: E402
-from CloudWatch.cloud_watch_helper import get_log_client, filter_log_events, get_log_events  # noqa: E402
+from CloudWatch.cloud_watch_dataclass import FetchStats  # noqa: E402
+from CloudWatch.cloud_watch_event_cache import EventCache  # noqa: E402
+from CloudWatch.cloud_watch_helper import (  # noqa: E402
+    get_log_client, filter_log_events, filter_log_events_cached, iter_filter_log_events,
+)
+from CloudWatch.cloud_watch_token_index import is_orphan_first_token, log_id_token  # noqa: E402
 from utils.aws_consts import AllEnvs, Env  # noqa: E402
 from utils.aws_consts_profile import get_profiles_for_curr_pc, PROFILE_Samson  # noqa: E402
 from utils.aws_urls import gen_cloud_watch_log_stream_url, gen_cloud_watch_log_stream_url1  # noqa: E402
 from utils.exec_env_util import is_running_in_pycharm  # noqa: E402
+from utils.rate_limiter import RateLimiter  # noqa: E402
 
 """
 使用方法：
@@ -193,24 +201,6 @@ PAT_START_LINE = re.compile(
 PAT_END_LINE = re.compile(
     r'^(?:END|REPORT)\s+RequestId:\s+(?P<aws_req_id>[0-9a-fA-F-]{8,})',
 )
-# Lambda 运行时打的行首标记，用于识别一行日志是否属于 app（否则视为 runtime 行）
-RUNTIME_FIRST_TOKENS = frozenset([
-    'START', 'END', 'REPORT', 'INIT_START', 'LOGS', 'EXTENSION',
-    'LAMBDA_WARNING', 'LAMBDA_RUNTIME',
-])
-
-
-def is_orphan_first_token(first_token: str) -> bool:
-    """判断 message 首个空格分隔的 token 是不是 app log_id。
-    app 网关日志形如 "XVJGbp ⚕ [INFO] ..." —— 首 token 是随机 log_id。
-    orphan 行首 token 会是 "[ERROR]" / "[INFO]" / runtime 关键字，此时视为无 log_id。"""
-    if not first_token:
-        return True
-    if first_token.startswith('[') and first_token.endswith(']'):
-        return True
-    if first_token in RUNTIME_FIRST_TOKENS:
-        return True
-    return False
 
 
 @dataclass
@@ -221,6 +211,180 @@ class OrphanRequest:
     dt_end: datetime
 
 
+@dataclass
+class StreamWindow:
+    """单个 stream 上的一段时间窗，用于批量搜索 START/END 标记。"""
+    log_stream: str
+    dt_start: datetime
+    dt_end: datetime
+
+
+_Span = TypeVar('_Span', OrphanRequest, StreamWindow)
+
+
+# region 请求 ID 拉取策略
+
+# 按请求 ID 拉完整日志的三种方式：
+#   chunked: 请求 ID 拼成 |-分隔的正则，每块一次整窗口服务端过滤（块数 = 扫描次数）
+#   streams: 只拉 ERROR 行所在 log stream 的整窗口日志一次（每次最多 100 个 stream，超出时分批），本地按首 token 分流
+#   window:  拉整个日志组的整窗口日志一次，本地按首 token 分流
+#   bounded: 先按 START/END 定位每个请求的边界，只拉这些 stream 在边界内的日志（每次最多 100 个 stream，并发）
+# 开启本地缓存且整窗口事件都已缓存时不发请求，按 log_id 倒排表点查（token_index，不可通过 --fanout 指定）
+FANOUT_CHUNKED = 'chunked'
+FANOUT_STREAMS = 'streams'
+FANOUT_WINDOW = 'window'
+FANOUT_BOUNDED = 'bounded'
+FANOUT_STRATEGIES = (FANOUT_CHUNKED, FANOUT_STREAMS, FANOUT_WINDOW, FANOUT_BOUNDED)
+FANOUT_TOKEN_INDEX = 'token_index'
+
+FANOUT_PATTERN_MAX_LEN = 1024 - 2  # filter pattern 上限 1024，去掉两侧 %
+FANOUT_MAX_STREAMS = 100           # FilterLogEvents logStreamNames 上限
+
+RECONSTRUCT_MAX_BATCH_SPAN = timedelta(seconds=60)  # 一次调用合并的请求时间跨度上限，保持时间边界紧凑
+RECONSTRUCT_WORKERS = 4                             # 按请求边界拉取时的并发调用数（共享限速器）
+
+# chunked 调用次数预估：FilterLogEvents 每次调用最多返回 10000 条，带 pattern 时每次调用大致扫过的时间跨度
+FANOUT_EVENTS_PER_CALL = 10000
+FANOUT_SCAN_SPAN_PER_CALL = timedelta(minutes=1)
+
+
+def build_request_id_patterns(id_set: Iterable[str]) -> List[str]:
+    """把请求 ID 拼成若干 %id1|id2|...% 正则，每块不超过 filter pattern 长度上限。"""
+    patterns = ['']
+    for rid in id_set:
+        rid_clean = re.escape(rid)
+        if not patterns[-1]:
+            patterns[-1] = rid_clean
+        elif len(patterns[-1] + f'|{rid_clean}') < FANOUT_PATTERN_MAX_LEN:
+            patterns[-1] += f'|{rid_clean}'
+        else:
+            patterns.append(rid_clean)
+    return [rf'%{p}%' for p in patterns if p]
+
+
+def choose_fanout_strategy(n_patterns: int, n_streams: int, is_cached: bool = False) -> str:
+    """按预估扫描量选择拉取方式。
+
+    - 只有一块正则、或各块在本地缓存中已完整覆盖：chunked（一次或零次扫描）
+    - ERROR 行所在 stream 不超过 FANOUT_MAX_STREAMS：streams（只扫这些 stream 一次）
+    - 否则：bounded（按请求边界分批扫这些 stream）
+    """
+    if n_patterns <= 1 or is_cached:
+        return FANOUT_CHUNKED
+    if 0 < n_streams <= FANOUT_MAX_STREAMS:
+        return FANOUT_STREAMS
+    return FANOUT_BOUNDED
+
+
+def estimate_chunked_calls(n_patterns: int, dt_start: datetime, dt_end: datetime, n_events: int) -> Optional[int]:
+    """按时间窗口与 ERROR 事件数预估 chunked 方式的调用次数，无法预估时返回 None。
+
+    每块正则扫一遍整窗口：调用次数取 窗口跨度 / FANOUT_SCAN_SPAN_PER_CALL 与 事件数 / FANOUT_EVENTS_PER_CALL 中的较大者。
+    不用 ERROR 扫描实际的调用次数，它来自本地缓存时为 0。
+    """
+    if n_patterns <= 0 or dt_end <= dt_start:
+        return None
+    span_calls = -(-(dt_end - dt_start) // FANOUT_SCAN_SPAN_PER_CALL)
+    event_calls = -(-n_events // FANOUT_EVENTS_PER_CALL)
+    return n_patterns * max(1, span_calls, event_calls)
+
+
+def demux_by_first_token(events: Iterable[dict], id_set: Set[str]) -> List[dict]:
+    """按 message 首个空格分隔的 token（app log_id）做哈希查找，只保留属于 id_set 的事件。"""
+    return [e for e in events if e['message'].split(' ', 1)[0] in id_set]
+
+
+def fetch_request_logs_single_pass(
+        client,
+        aws_region: str,
+        log_group: str,
+        id_set: Set[str],
+        dt_start: datetime,
+        dt_end: datetime,
+        log_stream_names: Optional[List[str]] = None,
+        max_calls: Optional[int] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        limiter: Optional[RateLimiter] = None,
+) -> Optional[List[dict]]:
+    """不带 pattern 扫一遍窗口（可限定 log stream），边拉边按首 token 分流出 id_set 的日志。
+
+    log_stream_names 超过 FANOUT_MAX_STREAMS 个时按 FANOUT_MAX_STREAMS 分批扫描，结果按 (timestamp, eventId) 合并。
+    max_calls 为预估的 chunked 方式调用次数：扫描（各批合计）超出它说明窗口日志量大于预期，放弃并返回 None，
+    由调用方回退到 bounded。
+    """
+    if log_stream_names:
+        stream_batches = [log_stream_names[i:i + FANOUT_MAX_STREAMS]
+                          for i in range(0, len(log_stream_names), FANOUT_MAX_STREAMS)]
+    else:
+        stream_batches = [None]
+    stats = FetchStats()
+    hits: List[dict] = []
+    for stream_batch in stream_batches:
+        with closing(iter_filter_log_events(
+                aws_region, log_group, '',
+                dt_start=dt_start, dt_end=dt_end,
+                stop_event=cancel_token,
+                client=client,
+                log_stream_names=stream_batch,
+                limiter=limiter,
+                stats=stats,
+        )) as pages:
+            for page in pages:
+                hits += demux_by_first_token(page, id_set)
+                if max_calls is not None and stats.iterations > max_calls:
+                    return None
+        _check_cancelled(cancel_token)
+    if len(stream_batches) > 1:
+        hits.sort(key=lambda e: (e['timestamp'], e['eventId']))
+    return hits
+
+
+def fetch_request_logs_bounded(
+        client,
+        aws_region: str,
+        log_group: str,
+        id_set: Set[str],
+        error_events: List[dict],
+        cancel_token: Optional[CancellationToken] = None,
+        limiter: Optional[RateLimiter] = None,
+) -> Tuple[List[dict], Set[str]]:
+    """按 ERROR 行所在 stream 定位每个请求的 START/END 边界，只在边界内拉取，再按首 token 分流出 id_set 的日志。
+
+    返回: (命中事件（升序、按 eventId 去重）, 没能定位边界的请求 ID —— 调用方需要另行搜索)
+    """
+    target_events = [e for e in error_events if e['message'].split(' ', 1)[0] in id_set]
+    spans, missing_events = resolve_request_spans(
+        client=client,
+        aws_region=aws_region,
+        log_group=log_group,
+        events=target_events,
+        cancel_token=cancel_token,
+        limiter=limiter,
+    )
+    events_by_key = fetch_request_spans(
+        client=client,
+        aws_region=aws_region,
+        log_group=log_group,
+        spans=spans,
+        limiter=limiter,
+        cancel_token=cancel_token,
+    )
+
+    seen: Set[str] = set()
+    hits: List[dict] = []
+    for e in demux_by_first_token((e for evs in events_by_key.values() for e in evs), id_set):
+        if e['eventId'] not in seen:
+            seen.add(e['eventId'])
+            hits.append(e)
+    hits.sort(key=lambda e: (e['timestamp'], e['eventId']))
+
+    found_ids = {e['message'].split(' ', 1)[0] for e in hits}
+    unresolved_ids = {e['message'].split(' ', 1)[0] for e in missing_events} - found_ids
+    return hits, unresolved_ids
+
+# endregion 请求 ID 拉取策略
+
+
 @dataclass
 class HandleAlertResult:
     error_cnt: int
@@ -234,7 +398,12 @@ def handle_alert(
         dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
         output_dir: Optional[str] = None,
         cancel_token: Optional[CancellationToken] = None,
+        use_cache: bool = False,
+        fanout: Optional[str] = None,
 ) -> HandleAlertResult:
+    """use_cache=True 时 ERROR 与请求 ID 的搜索走本地事件缓存，重跑同一窗口只拉取未覆盖的部分；
+    打开缓存时先清理 RETENTION_DAYS 天前的事件。
+    fanout 指定请求 ID 的拉取策略（FANOUT_STRATEGIES 之一），None 时按预估扫描量自动选择。"""
     alert_dt = alert_detail.alarm_dt
     alert_rgn = alert_detail.rgn
     fn_name = alert_detail.func_name
@@ -261,17 +430,41 @@ def handle_alert(
 
     env_name = fn_name.split('--')[0]
     env: Env = AllEnvs.get_env_by_name(env_name)
-    client = get_log_client(alert_rgn, env)
+    # 由下面的共享令牌桶限速，client 不挂自适应限速
+    client = get_log_client(alert_rgn, env, adaptive=False)
+    cache = None
+    if use_cache:
+        cache = EventCache()
+        cache.prune()
+    # 本次告警处理的所有 API 调用（含各阶段的并发批次）共享一个令牌桶
+    limiter = RateLimiter.for_cloudwatch()
+
+    def __search(pattern: str) -> Tuple[List[dict], FetchStats]:
+        if cache is None:
+            events, _stats = filter_log_events(
+                aws_region=alert_rgn,
+                log_group_name=log_group,
+                pattern=pattern,
+                dt_start=local_dt_start,
+                dt_end=local_dt_end,
+                client=client,
+                limiter=limiter,
+            )
+        else:
+            events, _stats = filter_log_events_cached(
+                aws_region=alert_rgn,
+                log_group_name=log_group,
+                pattern=pattern,
+                dt_start=local_dt_start,
+                dt_end=local_dt_end,
+                client=client,
+                limiter=limiter,
+                cache=cache,
+            )
+        return events, _stats
 
     _check_cancelled(cancel_token)
-    events_all, _stats = filter_log_events(
-        aws_region=alert_rgn,
-        log_group_name=log_group,
-        pattern=r'%\[ERROR\]%',
-        dt_start=local_dt_start,
-        dt_end=local_dt_end,
-        client=client,
-    )
+    events_all, _stats = __search(r'%\[ERROR\]%')
     _check_cancelled(cancel_token)
 
     # 分流：first-token 是 app log_id 的 ERROR 走原路径；否则视为 orphan（handler 崩溃、无 app log_id）
@@ -293,6 +486,7 @@ def handle_alert(
         log_group=log_group,
         orphan_events=orphan_events,
         cancel_token=cancel_token,
+        limiter=limiter,
     )
     orphan_full_by_key, orphan_id_by_key = fetch_orphan_full_logs(
         client=client,
@@ -300,6 +494,7 @@ def handle_alert(
         aws_region=alert_rgn,
         orphan_requests=orphan_requests,
         cancel_token=cancel_token,
+        limiter=limiter,
     )
 
     orphan_err_details = build_orphan_error_details(
@@ -346,27 +541,64 @@ def handle_alert(
     log_details: List[LogDetail] = []
 
     if id_set:
-        patterns = ['']
-        for rid in id_set:
-            rid_clean = re.escape(rid)
-            if not patterns[-1]:
-                patterns[-1] = rid_clean
-            elif len(patterns[-1] + f'|{rid_clean}') < 1024 - 2:
-                patterns[-1] += f'|{rid_clean}'
-            else:
-                patterns.append(rid_clean)
-
-        for p in patterns:
+        patterns = build_request_id_patterns(id_set)
+        err_streams = sorted({e['logStreamName'] for e in log_id_events if e['message'].split(' ', 1)[0] in id_set})
+        start_ms, end_ms = int(local_dt_start.timestamp() * 1000), int(local_dt_end.timestamp() * 1000)
+        is_cached = cache is not None and not any(
+            cache.missing_intervals(alert_rgn, log_group, p, start_ms, end_ms) for p in patterns
+        )
+        strategy = fanout or choose_fanout_strategy(len(patterns), len(err_streams), is_cached)
+
+        events = None
+        is_window_local = cache is not None and not cache.missing_intervals(alert_rgn, log_group, '', start_ms, end_ms)
+        if fanout is None and is_window_local:
+            # 窗口内全部事件都在本地：按 log_id 倒排表点查，与单次扫描后按首 token 分流的结果一致
+            strategy = FANOUT_TOKEN_INDEX
+            events = cache.query_tokens(alert_rgn, log_group, [log_id_token(i) for i in id_set], start_ms, end_ms)
+        print(f'请求 ID {len(id_set)} 个，正则 {len(patterns)} 块，ERROR stream {len(err_streams)} 个，策略：{strategy}')
+
+        if strategy in (FANOUT_STREAMS, FANOUT_WINDOW):
             _check_cancelled(cancel_token)
-            events, _stats = filter_log_events(
+            # 单次扫描的调用预算：chunked 方式的预估调用次数（按窗口跨度与 ERROR 事件数）
+            events = fetch_request_logs_single_pass(
+                client=client,
                 aws_region=alert_rgn,
-                log_group_name=log_group,
-                pattern=rf'%{p}%',
+                log_group=log_group,
+                id_set=id_set,
                 dt_start=local_dt_start,
                 dt_end=local_dt_end,
+                log_stream_names=err_streams if strategy == FANOUT_STREAMS else None,
+                max_calls=None if fanout else estimate_chunked_calls(
+                    len(patterns), local_dt_start, local_dt_end, len(events_all)),
+                cancel_token=cancel_token,
+                limiter=limiter,
+            )
+            if events is None:
+                print(f'[WARN] 单次扫描超出预估调用次数，回退到 {FANOUT_BOUNDED}')
+                strategy = FANOUT_BOUNDED
+        if strategy == FANOUT_BOUNDED:
+            _check_cancelled(cancel_token)
+            events, unresolved_ids = fetch_request_logs_bounded(
                 client=client,
+                aws_region=alert_rgn,
+                log_group=log_group,
+                id_set=id_set,
+                error_events=log_id_events,
+                cancel_token=cancel_token,
+                limiter=limiter,
             )
-            log_details += extract_log_details(log_group, alert_rgn, events)  # noqa
+            # 没找到 START/END 边界的请求，仍按正则在整窗口里搜
+            for p in build_request_id_patterns(unresolved_ids):
+                _check_cancelled(cancel_token)
+                chunk_events, _stats = __search(p)
+                events += chunk_events
+        if events is None:
+            events = []
+            for p in patterns:
+                _check_cancelled(cancel_token)
+                chunk_events, _stats = __search(p)
+                events += chunk_events
+        log_details += extract_log_details(log_group, alert_rgn, events)  # noqa
 
     # orphan 请求已经拉过整段日志，直接并入 —— 每条 LogDetail 的 id 已被统一成该请求的合成/真实 log_id
     for details in orphan_full_by_key.values():
@@ -418,40 +650,71 @@ def resolve_orphan_requests(
         log_group: str,
         orphan_events: List[dict],
         cancel_token: Optional[CancellationToken] = None,
+        limiter: Optional[RateLimiter] = None,
 ) -> Tuple[List[OrphanRequest], int]:
     """给每条 orphan ERROR 找到它所在的请求 (stream, awsRequestId, dt_start, dt_end)，按请求去重。
 
     返回: (去重后的 OrphanRequest 列表, 未匹配到 START 的 orphan 事件数)
     """
-    if not orphan_events:
-        return [], 0
+    requests, missing_events = resolve_request_spans(
+        client=client,
+        aws_region=aws_region,
+        log_group=log_group,
+        events=orphan_events,
+        cancel_token=cancel_token,
+        limiter=limiter,
+    )
+    return requests, len(missing_events)
+
+
+def resolve_request_spans(
+        client,
+        aws_region: str,
+        log_group: str,
+        events: List[dict],
+        cancel_token: Optional[CancellationToken] = None,
+        limiter: Optional[RateLimiter] = None,
+) -> Tuple[List[OrphanRequest], List[dict]]:
+    """给每条事件找到它所在请求的 START/END 边界 (stream, awsRequestId, dt_start, dt_end)，按请求去重。
+
+    每个 stream 只搜一个时间窗 [最早事件 - ORPHAN_BACK_SECONDS, 最晚事件 + ORPHAN_FORWARD_SECONDS]，
+    各 stream 的时间窗再按 batch_request_spans 合并成批，在线程池中并发搜索（共享 limiter）。
 
-    # 按 stream 聚合 orphan 事件 —— 一个 stream 内串行，可以一次 filter 拿到该 stream 内所有 START/END
+    返回: (去重后的请求列表, 未匹配到 START 的事件)
+    """
+    if not events:
+        return [], []
+
+    # 按 stream 聚合事件 —— 一个 stream 内串行，一个时间窗就能拿到该 stream 内所有 START/END
     by_stream: Dict[str, List[dict]] = {}
-    for e in orphan_events:
+    for e in events:
         by_stream.setdefault(e['logStreamName'], []).append(e)
 
-    resolved: Dict[Tuple[str, str], OrphanRequest] = {}
-    missing_cnt = 0
+    windows: List[StreamWindow] = []
     for stream, evts in by_stream.items():
-        _check_cancelled(cancel_token)
         ts_min = min(e['timestamp'] for e in evts)
         ts_max = max(e['timestamp'] for e in evts)
-        win_start = datetime.fromtimestamp(
-            ts_min / 1000 - ORPHAN_BACK_SECONDS, tz=timezone.utc,
-        )
-        win_end = datetime.fromtimestamp(
-            ts_max / 1000 + ORPHAN_FORWARD_SECONDS, tz=timezone.utc,
-        )
-        marker_events, _stats = filter_log_events(
-            aws_region=aws_region,
-            log_group_name=log_group,
-            pattern=r'%RequestId:%',
-            dt_start=win_start,
-            dt_end=win_end,
-            client=client,
-            log_stream_names=[stream],
-        )
+        windows.append(StreamWindow(
+            log_stream=stream,
+            dt_start=datetime.fromtimestamp(ts_min / 1000 - ORPHAN_BACK_SECONDS, tz=timezone.utc),
+            dt_end=datetime.fromtimestamp(ts_max / 1000 + ORPHAN_FORWARD_SECONDS, tz=timezone.utc),
+        ))
+    _check_cancelled(cancel_token)
+    markers_per_window = fetch_stream_windows(
+        client=client,
+        aws_region=aws_region,
+        log_group=log_group,
+        windows=windows,
+        pattern=r'%RequestId:%',
+        limiter=limiter,
+        cancel_token=cancel_token,
+    )
+
+    resolved: Dict[Tuple[str, str], OrphanRequest] = {}
+    missing_events: List[dict] = []
+    for window, marker_events in zip(windows, markers_per_window):
+        stream = window.log_stream
+        evts = by_stream[stream]
         # 分离 START / END 行，按 timestamp 升序（filter_log_events 返回本身是升序）
         starts: List[Tuple[int, str]] = []  # (timestamp, aws_req_id)
         ends: List[Tuple[int, str]] = []
@@ -474,9 +737,9 @@ def resolve_orphan_requests(
                     matched_start = (s_ts, s_id)
                     break
             if matched_start is None:
-                missing_cnt += 1
+                missing_events.append(oe)
                 print(
-                    f'[WARN] orphan ERROR at {datetime.fromtimestamp(oe_ts/1000, tz=timezone.utc).isoformat()} '
+                    f'[WARN] ERROR at {datetime.fromtimestamp(oe_ts/1000, tz=timezone.utc).isoformat()} '
                     f'in stream {stream} 未找到 START RequestId'
                 )
                 continue
@@ -502,7 +765,111 @@ def resolve_orphan_requests(
                 dt_end=datetime.fromtimestamp(end_ts / 1000, tz=timezone.utc),
             )
 
-    return list(resolved.values()), missing_cnt
+    return list(resolved.values()), missing_events
+
+
+def batch_request_spans(
+        spans: List[_Span],
+        max_streams: int = FANOUT_MAX_STREAMS,
+        max_span: timedelta = RECONSTRUCT_MAX_BATCH_SPAN,
+) -> List[List[_Span]]:
+    """按开始时间把请求（或 stream 时间窗）分批：每批最多 max_streams 个 stream，整批时间跨度不超过 max_span。
+    单个时间窗本身超过 max_span 时独占一批。"""
+    batches: List[List[_Span]] = []
+    cur: List[_Span] = []
+    cur_streams: Set[str] = set()
+    cur_start: Optional[datetime] = None
+    for span in sorted(spans, key=lambda r: r.dt_start):
+        is_stream_full = span.log_stream not in cur_streams and len(cur_streams) >= max_streams
+        if cur and (is_stream_full or span.dt_end - cur_start > max_span):
+            batches.append(cur)
+            cur, cur_streams = [], set()
+        if not cur:
+            cur_start = span.dt_start
+        cur.append(span)
+        cur_streams.add(span.log_stream)
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+def fetch_stream_windows(
+        client,
+        aws_region: str,
+        log_group: str,
+        windows: List[_Span],
+        pattern: str = '',
+        limiter: Optional[RateLimiter] = None,
+        max_workers: int = RECONSTRUCT_WORKERS,
+        cancel_token: Optional[CancellationToken] = None,
+) -> List[List[dict]]:
+    """拉取每个时间窗 [dt_start, dt_end] 内、所在 stream 上匹配 pattern 的日志，返回与 windows 一一对应的事件列表（升序）。
+
+    时间窗按 batch_request_spans 分批，每批一次 filter_log_events（logStreamNames=该批 stream，
+    时间取该批边界的并集），各批在线程池中并发执行、共享一个限速器，拉回后再按 stream + 边界切回各时间窗。
+    cancel_token 被 set 后未开始的批直接跳过，已开始的批在下一页前停止，最后统一抛 CancelledError。
+    """
+    if not windows:
+        return []
+    limiter = limiter if limiter is not None else RateLimiter.for_cloudwatch()
+    batches = batch_request_spans(windows)
+    index_of = {id(w): i for i, w in enumerate(windows)}
+
+    def __fetch(batch: List[_Span]) -> List[Tuple[int, List[dict]]]:
+        if cancel_token is not None and cancel_token.is_set():
+            return []
+        events, _stats = filter_log_events(
+            aws_region=aws_region,
+            log_group_name=log_group,
+            pattern=pattern,
+            dt_start=min(w.dt_start for w in batch),
+            dt_end=max(w.dt_end for w in batch),
+            stop_event=cancel_token,
+            client=client,
+            log_stream_names=sorted({w.log_stream for w in batch}),
+            limiter=limiter,
+        )
+        out: List[Tuple[int, List[dict]]] = []
+        for w in batch:
+            start_ms, end_ms = int(w.dt_start.timestamp() * 1000), int(w.dt_end.timestamp() * 1000)
+            out.append((index_of[id(w)], [
+                e for e in events
+                if e['logStreamName'] == w.log_stream and start_ms <= e['timestamp'] <= end_ms
+            ]))
+        return out
+
+    result: List[List[dict]] = [[] for _ in windows]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as pool:
+        for part in pool.map(__fetch, batches):
+            for idx, events in part:
+                result[idx] = events
+    _check_cancelled(cancel_token)
+    return result
+
+
+def fetch_request_spans(
+        client,
+        aws_region: str,
+        log_group: str,
+        spans: List[OrphanRequest],
+        limiter: Optional[RateLimiter] = None,
+        max_workers: int = RECONSTRUCT_WORKERS,
+        cancel_token: Optional[CancellationToken] = None,
+) -> Dict[Tuple[str, str], List[dict]]:
+    """拉取每个请求 [dt_start, dt_end] 内、所在 stream 的全部日志（分批并发，见 fetch_stream_windows）。
+
+    返回: {(stream, awsRequestId): 事件列表（升序）}
+    """
+    events_per_span = fetch_stream_windows(
+        client=client,
+        aws_region=aws_region,
+        log_group=log_group,
+        windows=spans,
+        limiter=limiter,
+        max_workers=max_workers,
+        cancel_token=cancel_token,
+    )
+    return {(r.log_stream, r.aws_req_id): events for r, events in zip(spans, events_per_span)}
 
 
 def fetch_orphan_full_logs(
@@ -511,8 +878,9 @@ def fetch_orphan_full_logs(
         aws_region: str,
         orphan_requests: List[OrphanRequest],
         cancel_token: Optional[CancellationToken] = None,
+        limiter: Optional[RateLimiter] = None,
 ) -> Tuple[Dict[Tuple[str, str], List[LogDetail]], Dict[Tuple[str, str], str]]:
-    """对每个 orphan 请求拉整段日志，并从中挑一条 app 行的 log_id 作为该请求的 id。
+    """对每个 orphan 请求拉整段日志（按 stream 分批并发，见 fetch_request_spans），并从中挑一条 app 行的 log_id 作为该请求的 id。
 
     返回:
         - {(stream, awsRequestId): [LogDetail, ...]} 完整日志（已把 id 统一为下面挑选出的 log_id）
@@ -520,16 +888,18 @@ def fetch_orphan_full_logs(
     """
     full_by_key: Dict[Tuple[str, str], List[LogDetail]] = {}
     id_by_key: Dict[Tuple[str, str], str] = {}
+    _check_cancelled(cancel_token)
+    events_by_key = fetch_request_spans(
+        client=client,
+        aws_region=aws_region,
+        log_group=log_group,
+        spans=orphan_requests,
+        limiter=limiter,
+        cancel_token=cancel_token,
+    )
     for req in orphan_requests:
         _check_cancelled(cancel_token)
-        events, _stats = get_log_events(
-            client=client,
-            logStreamName=req.log_stream,
-            logGroupName=log_group,
-            startTime=req.dt_start,
-            endTime=req.dt_end + timedelta(milliseconds=1),
-            startFromHead=True,
-        )
+        events = events_by_key.get((req.log_stream, req.aws_req_id), [])
         # 从整段日志里挑第一条 app log 行的 first-token 作为 log_id
         picked_id: Optional[str] = None
         for e in events:
@@ -715,6 +1085,15 @@ def __parse_args(argv: List[str]):
                        help='结束时间，必须带时区后缀，格式 "YYYY-MM-DD HH:MM:SS+0800" 或 "+0000"。'
                             '与 --window-after 互斥。')
 
+    parser.add_argument('--cache', action='store_true', default=False,
+                        help='[选填] 使用本地事件缓存（%%LOCALAPPDATA%%/AwsTools/cw_events.sqlite3）：'
+                             '重跑同一窗口只拉取缓存未覆盖的时间段；打开时清理 7 天前的事件。')
+
+    parser.add_argument('--fanout', choices=FANOUT_STRATEGIES, default=None,
+                        help='请求 ID 完整日志的拉取策略，默认按预估扫描量自动选择：'
+                             'chunked=按 ID 正则分块逐块搜索；streams=只扫 ERROR 所在 stream 一次；'
+                             'window=扫整个日志组一次；bounded=按 START/END 边界只拉相关 stream 的请求区间。')
+
     parser.add_argument('--print-result-json', action='store_true',
                         help='完成后在 stdout 末尾打印一行 JSON，包含 csv 路径和命中数（便于脚本/skill 解析）。')
 
@@ -789,6 +1168,8 @@ def main():
         dt_start=dt_start,
         dt_end=dt_end,
         output_dir=args.output_dir,
+        use_cache=args.cache,
+        fanout=args.fanout,
     )
 
     if args.print_result_json:
@@ -1,11 +1,17 @@
 import argparse
+import functools
+import json
 import logging
 import os
 import sys
+import threading
 import time
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
 
 SCRIPT_DIR_PATH = os.path.dirname(os.path.abspath(__file__))
 PROJ_PATH = os.path.dirname(SCRIPT_DIR_PATH)
@@ -14,7 +20,8 @@ if PROJ_PATH not in sys.path:
 
 from S3.s3_downloader import download_dir_from_s3  # noqa: E402
 from S3.s3_helper import get_s3_client, is_bucket_exists, update_bucket_policy_if_needed  # noqa: E402
-from cloud_watch_helper import get_log_client  # noqa: E402
+from CloudWatch.cloud_watch_helper import get_log_client  # noqa: E402
+from CloudWatch.cloud_watch_event_cache import SETTLE_SECONDS  # noqa: E402
 from utils.aws_consts import ACCT_DEV_CN, ACCT_DEV_US, ACCT_PROD_CN, ACCT_PROD_US, AllEnvs, Env  # noqa: E402
 from utils.aws_urls import get_s3_bucket_url  # noqa: E402
 from utils.logging_helper import setup_logging  # noqa: E402
@@ -32,18 +39,29 @@ S3_PREFIX = ''
 DATA_DOWNLOAD_DIR = os.path.join(SCRIPT_DIR_PATH, 'Data/LogGroup')
 START_TS_MS = 0
 END_TS_MS = 0
+INCREMENTAL_SLICE_HOURS = 24  # 增量模式下单个导出任务覆盖的时长，按 UTC 对齐，同时是本地归档的分区粒度
 # endregion 配置项
 
+WATERMARK_FILE_NAME = '_watermarks.json'  # 增量水位：{"<region>|<log_group>": {"end_ts_ms", "updated_at"}}
+_EXPORT_POLL_INTERVAL = 5          # 轮询导出任务状态的间隔（秒）
+_EXPORT_LIMIT_RETRY_INTERVAL = 30  # 账号下已有进行中的导出任务（LimitExceededException）时的重试间隔（秒）
+_EXPORT_LIMIT_MAX_RETRIES = 40
+_INCREMENTAL_MIN_SPAN_MS = 60 * 1000  # 距上次水位不足该时长时不建导出任务
+EXPORT_QUEUE_FILE_NAME = '_export_queue.json'  # 多 log group 调度的队列状态，崩溃后重跑从这里续上
+_DOWNLOAD_WORKERS = 2                           # 与下一个导出并行的下载任务数
+
 
 @dataclass
 class __CmdArgs:
     environment_name: str
     region: str
-    log_group_name: str
+    log_group_name: List[str]
     s3_bucket_name_prefix: Optional[str]
     s3_prefix: Optional[str]
     start_ts_ms: Optional[int]
     end_ts_ms: Optional[int]
+    incremental: bool
+    slice_hours: int
 
 
 def __parse_args(args: List[str]) -> __CmdArgs:
@@ -64,8 +82,9 @@ def __parse_args(args: List[str]) -> __CmdArgs:
     )
     parser.add_argument(
         '--log_group_name', '-lg',
-        help='CloudWatch Log Group名称',
+        help='CloudWatch Log Group名称，可传多个，多个时排队依次导出并与下载流水线并行',
         type=str,
+        nargs='+',
         required=True,
     )
     parser.add_argument(
@@ -95,6 +114,17 @@ def __parse_args(args: List[str]) -> __CmdArgs:
         default=None, required=False,
         help='结束时间戳（毫秒）'
     )
+    parser.add_argument(
+        '--incremental', '-inc',
+        action='store_true',
+        help='增量模式：从本地水位导出到现在，按 slice_hours 分片依次导出，追加到本地按日期分区的归档',
+    )
+    parser.add_argument(
+        '--slice_hours', '-sh',
+        type=int,
+        default=INCREMENTAL_SLICE_HOURS,
+        help='增量模式下单个导出任务覆盖的小时数',
+    )
     parsed_args = parser.parse_args(args)
     return __CmdArgs(**vars(parsed_args))
 
@@ -196,17 +226,7 @@ def export_log_group_to_s3(
 
     client = get_log_client(rgn=region, env=env)
 
-    # 获取 log group 信息
-    resp_desc = client.describe_log_groups(logGroupNamePrefix=log_group_name)
-    logging.debug(f'resp_desc={resp_desc}')
-    # 检查 log group 是否存在
-    log_groups = resp_desc.get('logGroups', None)
-    log_group = None
-    if log_groups:
-        for lg in resp_desc['logGroups']:
-            if lg.get('logGroupName', None) == log_group_name:
-                log_group = lg
-                break
+    log_group = describe_log_group(client, log_group_name)
     if not log_group:
         logging.error(f'Log group not found. log_group_name={log_group_name} region={region}')
         return False, ''
@@ -221,7 +241,8 @@ def export_log_group_to_s3(
     if s3_prefix is None:
         s3_prefix = ''
 
-    resp_create_task = client.create_export_task(
+    resp_create_task = _create_export_task(
+        client,
         taskName=task_name,
         logGroupName=log_group_name,
         fromTime=start_ts_ms,
@@ -239,6 +260,34 @@ def export_log_group_to_s3(
     # 等待导出任务完成
     logging.debug(f'response={resp_create_task}, s3_bucket_url={get_s3_bucket_url(region, s3_bucket_name)}')
 
+    wait_export_task(client, task_id)
+    return True, task_id
+
+
+def describe_log_group(client, log_group_name: str) -> Optional[dict]:
+    """按名字精确查找 log group，不存在返回 None。"""
+    resp_desc = client.describe_log_groups(logGroupNamePrefix=log_group_name)
+    logging.debug(f'resp_desc={resp_desc}')
+    for lg in resp_desc.get('logGroups', None) or []:
+        if lg.get('logGroupName', None) == log_group_name:
+            return lg
+    return None
+
+
+def _create_export_task(client, **kwargs) -> dict:
+    """创建导出任务。每个账号同时只能有一个进行中的导出任务，遇到 LimitExceededException 时等待后重试。"""
+    for attempt in range(_EXPORT_LIMIT_MAX_RETRIES + 1):
+        try:
+            return client.create_export_task(**kwargs)
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'LimitExceededException' or attempt == _EXPORT_LIMIT_MAX_RETRIES:
+                raise
+            logging.info(f'Another export task is active, retrying in {_EXPORT_LIMIT_RETRY_INTERVAL}s ...')
+            time.sleep(_EXPORT_LIMIT_RETRY_INTERVAL)
+
+
+def wait_export_task(client, task_id: str) -> Optional[str]:
+    """轮询直到导出任务结束，返回最终状态码（COMPLETED / FAILED / CANCELLED ...）。"""
     while True:
         resp_desc_task = client.describe_export_tasks(taskId=task_id)
         logging.debug(f'resp_desc_task={resp_desc_task}')
@@ -247,10 +296,348 @@ def export_log_group_to_s3(
             execution_info = resp_desc_task['exportTasks'][0].get('executionInfo', {})
             span = execution_info.get('completionTime', -1) - execution_info.get('creationTime', 0)
             logging.info(f'Export task completed. task_id={task_id} task_status={task_status} span={span}ms')
-            break
+            return task_status
         logging.debug(f'Export task {task_id} is {task_status}')
-        time.sleep(5)
-    return True, task_id
+        time.sleep(_EXPORT_POLL_INTERVAL)
+
+
+# region 增量导出
+
+def _watermark_key(region: str, log_group_name: str) -> str:
+    return f'{region}|{log_group_name}'
+
+
+def load_watermarks(archive_root: str) -> Dict[str, dict]:
+    path = os.path.join(archive_root, WATERMARK_FILE_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_watermark(archive_root: str, region: str, log_group_name: str, end_ts_ms: int) -> None:
+    """记录 (region, log group) 已归档到 end_ts_ms（不含），写临时文件后原子替换。"""
+    os.makedirs(archive_root, exist_ok=True)
+    watermarks = load_watermarks(archive_root)
+    watermarks[_watermark_key(region, log_group_name)] = {
+        'end_ts_ms': end_ts_ms,
+        'updated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+    path = os.path.join(archive_root, WATERMARK_FILE_NAME)
+    with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+        json.dump(watermarks, f, ensure_ascii=False, indent=2)
+    os.replace(f'{path}.tmp', path)
+
+
+def split_export_slices(start_ts_ms: int, end_ts_ms: int, slice_hours: int) -> List[Tuple[int, int]]:
+    """把 [start_ts_ms, end_ts_ms) 按 UTC 对齐的 slice_hours 边界切片，每片为左闭右开区间。"""
+    slice_ms = slice_hours * 3600 * 1000
+    slices = []
+    cursor = start_ts_ms
+    while cursor < end_ts_ms:
+        boundary = (cursor // slice_ms + 1) * slice_ms
+        slices.append((cursor, min(boundary, end_ts_ms)))
+        cursor = slices[-1][1]
+    return slices
+
+
+def export_log_group_incremental(
+        region: str, env: Env, log_group_name: str, s3_bucket_name: str, s3_prefix: str, archive_root: str,
+        start_ts_ms: Optional[int] = None, end_ts_ms: Optional[int] = None,
+        slice_hours: int = INCREMENTAL_SLICE_HOURS,
+) -> int:
+    """
+    增量导出：从本地水位（首次为 start_ts_ms 或 log group 创建时间）导出到 end_ts_ms（默认 now - SETTLE_SECONDS）。
+
+    按 slice_hours 切片依次导出（账号同时只允许一个导出任务），每片下载到
+    <archive_root>/<region>/dt=<片起始 UTC 日期>/<task_id>/ 后推进水位，中途失败下次从失败的片继续。
+
+    Returns:
+        int: 本次完成的切片数
+    """
+    client = get_log_client(rgn=region, env=env)
+    watermark = load_watermarks(archive_root).get(_watermark_key(region, log_group_name))
+    if watermark:
+        start_ts_ms = watermark['end_ts_ms']
+    elif start_ts_ms is None:
+        log_group = describe_log_group(client, log_group_name)
+        if not log_group:
+            logging.error(f'Log group not found. log_group_name={log_group_name} region={region}')
+            return 0
+        start_ts_ms = int(log_group['creationTime'])
+    # 最近 SETTLE_SECONDS 内的事件可能还没写完，留到下次导出
+    settled_ms = int((time.time() - SETTLE_SECONDS) * 1000)
+    end_ts_ms = settled_ms if end_ts_ms is None else min(end_ts_ms, settled_ms)
+    if end_ts_ms - start_ts_ms < _INCREMENTAL_MIN_SPAN_MS:
+        logging.info(f'Nothing new to export. log_group={log_group_name} watermark={start_ts_ms}')
+        return 0
+
+    slices = split_export_slices(start_ts_ms, end_ts_ms, slice_hours)
+    logging.info(f'Incremental export log_group={log_group_name} slices={len(slices)} '
+                 f'start_ts_ms={start_ts_ms} end_ts_ms={end_ts_ms}')
+    for idx, (slice_start, slice_end) in enumerate(slices):
+        resp_create_task = _create_export_task(
+            client,
+            taskName=f'{log_group_name}-{slice_start}-{slice_end}',
+            logGroupName=log_group_name,
+            fromTime=slice_start,
+            to=slice_end - 1,  # to 为闭区间
+            destination=s3_bucket_name,
+            destinationPrefix=s3_prefix,
+        )
+        task_id = resp_create_task.get('taskId', None)
+        if not task_id:
+            logging.error(f'Create export task failed. resp_create_task={resp_create_task}')
+            return idx
+        task_status = wait_export_task(client, task_id)
+        if task_status != 'COMPLETED':
+            logging.error(f'Export task not completed. task_id={task_id} task_status={task_status}')
+            return idx
+
+        dt_partition = datetime.fromtimestamp(slice_start / 1000, tz=timezone.utc).strftime('%Y-%m-%d')
+        download_dir_from_s3(
+            env=env,
+            region=region,
+            bucket_name=s3_bucket_name,
+            dir_key=f'{s3_prefix}/{task_id}',
+            output_path=os.path.join(archive_root, region, f'dt={dt_partition}', task_id),
+        )
+        save_watermark(archive_root, region, log_group_name, slice_end)
+        logging.info(f'Slice {idx + 1}/{len(slices)} archived. task_id={task_id} watermark={slice_end}')
+    return len(slices)
+
+# endregion 增量导出
+
+
+# region 多 log group 调度
+
+JOB_PENDING = 'PENDING'        # 未建导出任务
+JOB_EXPORTING = 'EXPORTING'    # 导出任务进行中（task_id 已记录，重启后继续等待同一个任务）
+JOB_EXPORTED = 'EXPORTED'      # 导出完成，待下载
+JOB_DONE = 'DONE'
+JOB_FAILED = 'FAILED'
+
+
+@dataclass
+class ExportJob:
+    log_group_name: str
+    start_ts_ms: int
+    end_ts_ms: int            # 闭区间，即 create_export_task 的 to
+    s3_prefix: str
+    status: str = JOB_PENDING
+    task_id: str = ''
+    watermark_root: str = ''  # 非空时为增量任务：下载到该目录的日期分区，完成后推进水位（见 ExportScheduler._advance_watermark）
+
+    @property
+    def key(self) -> Tuple[str, int, int]:
+        return self.log_group_name, self.start_ts_ms, self.end_ts_ms
+
+
+class ExportScheduler:
+    """
+    多个 log group 的导出调度：任意时刻只有一个导出任务在跑（账号限制），
+    已完成导出的任务在后台线程下载，与下一个导出并行，总耗时接近各导出耗时之和。
+
+    队列状态在每次状态变化后写入 state_path，崩溃后用同一个 state_path 重跑：
+    EXPORTING 的任务继续等待原 task_id，EXPORTED 的任务重新下载（下载有断点续传），DONE 的跳过。
+
+    增量任务按切片入队，下载并行完成的顺序不固定：水位只推进到从最早切片起连续 DONE 的末尾，
+    前面还有未完成切片的 DONE 任务保留在队列状态里，直到水位越过它。
+    """
+
+    def __init__(
+            self, region: str, env: Env, s3_bucket_name: str, download_root: str, state_path: str,
+            download_workers: int = _DOWNLOAD_WORKERS,
+    ):
+        self.region = region
+        self.env = env
+        self.s3_bucket_name = s3_bucket_name
+        self.download_root = download_root
+        self.state_path = state_path
+        self.download_workers = download_workers
+        self._lock = threading.Lock()  # 下载完成回调在线程池里写状态文件
+        self._watermark_lock = threading.Lock()  # 下载完成回调并发推进水位
+        self.jobs: List[ExportJob] = self._load()
+
+    def _load(self) -> List[ExportJob]:
+        if not os.path.exists(self.state_path):
+            return []
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            jobs = [ExportJob(**item) for item in json.load(f)]
+        return [job for job in jobs if job.status != JOB_DONE or not self._is_watermarked(job)]
+
+    def _is_watermarked(self, job: ExportJob) -> bool:
+        if not job.watermark_root:
+            return True
+        watermark = load_watermarks(job.watermark_root).get(_watermark_key(self.region, job.log_group_name))
+        return watermark is not None and watermark['end_ts_ms'] > job.end_ts_ms
+
+    def _save(self) -> None:
+        with self._lock:
+            os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+            with open(f'{self.state_path}.tmp', 'w', encoding='utf-8') as f:
+                json.dump([asdict(job) for job in self.jobs], f, ensure_ascii=False, indent=2)
+            os.replace(f'{self.state_path}.tmp', self.state_path)
+
+    def add(self, job: ExportJob) -> None:
+        """加入队列；同一 (log group, 时间范围) 已在队列中（上次未完成）时保留原状态。
+        增量任务与队列中同一 log group 的切片时间重叠时跳过，等水位越过已有切片后下次再导出。"""
+        if job.key in {j.key for j in self.jobs}:
+            return
+        if job.watermark_root and any(
+                j.watermark_root and j.log_group_name == job.log_group_name
+                and j.start_ts_ms <= job.end_ts_ms and job.start_ts_ms <= j.end_ts_ms
+                for j in self.jobs):
+            return
+        self.jobs.append(job)
+        self._save()
+
+    def output_path(self, job: ExportJob) -> str:
+        if job.watermark_root:
+            dt_partition = datetime.fromtimestamp(job.start_ts_ms / 1000, tz=timezone.utc).strftime('%Y-%m-%d')
+            return os.path.join(job.watermark_root, self.region, f'dt={dt_partition}', job.task_id)
+        return f'{self.download_root}/{job.s3_prefix}/{self.region}/{job.task_id}'
+
+    def _download(self, job: ExportJob) -> ExportJob:
+        download_dir_from_s3(
+            env=self.env,
+            region=self.region,
+            bucket_name=self.s3_bucket_name,
+            dir_key=f'{job.s3_prefix}/{job.task_id}',
+            output_path=self.output_path(job),
+        )
+        return job
+
+    def _on_downloaded(self, job: ExportJob, fut: Future) -> None:
+        if fut.exception() is not None:
+            # 保持 EXPORTED，下次运行重新下载
+            logging.error(f'Download failed. log_group={job.log_group_name} error={fut.exception()}')
+            return
+        job.status = JOB_DONE
+        if job.watermark_root:
+            self._advance_watermark(job)
+        self._save()
+        logging.info(f'Job done. log_group={job.log_group_name} task_id={job.task_id}')
+
+    def _advance_watermark(self, job: ExportJob) -> None:
+        """把 job 所在 log group 的水位推进到从最早切片起连续 DONE 的切片末尾（end_ts_ms + 1）。"""
+        with self._watermark_lock:
+            slices = sorted(
+                (j for j in self.jobs if j.watermark_root and j.log_group_name == job.log_group_name),
+                key=lambda j: j.start_ts_ms,
+            )
+            end_ts_ms = None
+            for j in slices:
+                if j.status != JOB_DONE:
+                    break
+                end_ts_ms = j.end_ts_ms + 1
+            if end_ts_ms is not None:
+                save_watermark(job.watermark_root, self.region, job.log_group_name, end_ts_ms)
+
+    def _export(self, client, job: ExportJob) -> bool:
+        """建导出任务（或继续等待已有 task_id）直到导出完成；失败（含 LimitExceeded 以外的 ClientError）返回 False。"""
+        try:
+            if job.status == JOB_PENDING:
+                resp_create_task = _create_export_task(
+                    client,
+                    taskName=f'{job.log_group_name}-{job.start_ts_ms}-{job.end_ts_ms}',
+                    logGroupName=job.log_group_name,
+                    fromTime=job.start_ts_ms,
+                    to=job.end_ts_ms,
+                    destination=self.s3_bucket_name,
+                    destinationPrefix=job.s3_prefix,
+                )
+                job.task_id = resp_create_task.get('taskId', '')
+                if not job.task_id:
+                    logging.error(f'Create export task failed. resp_create_task={resp_create_task}')
+                    return False
+                job.status = JOB_EXPORTING
+                self._save()
+            task_status = wait_export_task(client, job.task_id)
+        except ClientError as e:
+            logging.error(f'Export failed. log_group={job.log_group_name} task_id={job.task_id} error={e}')
+            return False
+        if task_status != 'COMPLETED':
+            logging.error(f'Export task not completed. task_id={job.task_id} task_status={task_status}')
+            return False
+        job.status = JOB_EXPORTED
+        self._save()
+        return True
+
+    def run(self) -> List[ExportJob]:
+        """处理队列中全部未完成的任务，返回失败的任务。"""
+        client = get_log_client(rgn=self.region, env=self.env)
+        failed: List[ExportJob] = []
+        # EXPORTING 的排在最前：它的导出任务可能仍占着账号的导出配额
+        queue = sorted(
+            (job for job in self.jobs if job.status in (JOB_PENDING, JOB_EXPORTING, JOB_EXPORTED, JOB_FAILED)),
+            key=lambda j: j.status != JOB_EXPORTING,
+        )
+        with ThreadPoolExecutor(max_workers=self.download_workers) as pool:
+            for idx, job in enumerate(queue):
+                if job.status == JOB_FAILED:
+                    job.status, job.task_id = JOB_PENDING, ''
+                if job.status != JOB_EXPORTED:
+                    logging.info(f'Export {idx + 1}/{len(queue)} log_group={job.log_group_name}')
+                    if not self._export(client, job):
+                        job.status = JOB_FAILED
+                        self._save()
+                        failed.append(job)
+                        continue
+                fut = pool.submit(self._download, job)
+                fut.add_done_callback(functools.partial(self._on_downloaded, job))
+        failed += [job for job in queue if job.status == JOB_EXPORTED]
+        return failed
+
+
+def build_export_jobs(
+        region: str, env: Env, log_group_names: List[str],
+        start_ts_ms: Optional[int] = None, end_ts_ms: Optional[int] = None,
+        incremental: bool = False, download_root: str = DATA_DOWNLOAD_DIR,
+        slice_hours: int = INCREMENTAL_SLICE_HOURS,
+) -> List[ExportJob]:
+    """
+    为每个 log group 生成导出任务，时间范围在这里定死，写入队列状态后重跑不会漂移。
+
+    incremental=True 时从各自的增量水位（<download_root>/<s3_prefix>/incremental，与单 log group 增量模式相同）
+    开始，无水位时从 start_ts_ms / 创建时间开始；与 export_log_group_incremental 一样按 slice_hours 切片，
+    每片一个任务，完成后推进水位。
+    """
+    client = get_log_client(rgn=region, env=env)
+    now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    settled_ms = int((time.time() - SETTLE_SECONDS) * 1000)
+    jobs: List[ExportJob] = []
+    for name in log_group_names:
+        s3_prefix = [tkn for tkn in name.split('/') if tkn][-1]
+        watermark_root = f'{download_root}/{s3_prefix}/incremental' if incremental else ''
+        job_start, job_end = start_ts_ms, end_ts_ms
+        if watermark_root:
+            watermark = load_watermarks(watermark_root).get(_watermark_key(region, name))
+            job_start = watermark['end_ts_ms'] if watermark else job_start
+            job_end = settled_ms if job_end is None else min(job_end, settled_ms)
+        if job_start is None:
+            log_group = describe_log_group(client, name)
+            if not log_group:
+                logging.error(f'Log group not found. log_group_name={name} region={region}')
+                continue
+            job_start = int(log_group['creationTime'])
+        job_end = now_ms if job_end is None else job_end
+        if job_end - job_start < _INCREMENTAL_MIN_SPAN_MS:
+            logging.info(f'Nothing new to export. log_group={name}')
+            continue
+        if not watermark_root:
+            jobs.append(ExportJob(log_group_name=name, start_ts_ms=job_start, end_ts_ms=job_end, s3_prefix=s3_prefix))
+            continue
+        jobs += [
+            ExportJob(
+                log_group_name=name, start_ts_ms=slice_start, end_ts_ms=slice_end - 1,  # to 为闭区间
+                s3_prefix=s3_prefix, watermark_root=watermark_root,
+            )
+            for slice_start, slice_end in split_export_slices(job_start, job_end, slice_hours)
+        ]
+    return jobs
+
+# endregion 多 log group 调度
 
 
 def main():
@@ -263,7 +650,7 @@ def main():
         sys_argv = sys_argv_str.split(' ')
     cmd_args: __CmdArgs = __parse_args(sys_argv)
 
-    LOG_GROUP_NAME = cmd_args.log_group_name
+    LOG_GROUP_NAME = cmd_args.log_group_name[0]
     S3_PREFIX = cmd_args.s3_prefix
     START_TS_MS = cmd_args.start_ts_ms
     END_TS_MS = cmd_args.end_ts_ms
@@ -275,8 +662,39 @@ def main():
     if not success:
         return
 
+    if len(cmd_args.log_group_name) > 1:
+        scheduler = ExportScheduler(
+            region=REGION, env=ENV, s3_bucket_name=s3_bucket_name, download_root=DATA_DOWNLOAD_DIR,
+            state_path=os.path.join(DATA_DOWNLOAD_DIR, EXPORT_QUEUE_FILE_NAME),
+        )
+        jobs = build_export_jobs(
+            region=REGION, env=ENV, log_group_names=cmd_args.log_group_name,
+            start_ts_ms=START_TS_MS, end_ts_ms=END_TS_MS,
+            incremental=cmd_args.incremental, download_root=DATA_DOWNLOAD_DIR,
+            slice_hours=cmd_args.slice_hours,
+        )
+        for job in jobs:
+            scheduler.add(job)
+        failed = scheduler.run()
+        logging.info(f'Scheduler finished. jobs={len(scheduler.jobs)} failed={len(failed)}')
+        return
+
     s3_prefix = S3_PREFIX if S3_PREFIX else [tkn for tkn in LOG_GROUP_NAME.split('/') if tkn][-1]
 
+    if cmd_args.incremental:
+        export_log_group_incremental(
+            region=REGION,
+            env=ENV,
+            log_group_name=LOG_GROUP_NAME,
+            s3_bucket_name=s3_bucket_name,
+            s3_prefix=s3_prefix,
+            archive_root=f'{DATA_DOWNLOAD_DIR}/{s3_prefix}/incremental',
+            start_ts_ms=START_TS_MS,
+            end_ts_ms=END_TS_MS,
+            slice_hours=cmd_args.slice_hours,
+        )
+        return
+
     # 导出 Log Group 到 S3
     success, task_id = export_log_group_to_s3(
         region=REGION,
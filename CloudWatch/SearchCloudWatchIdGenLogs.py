@@ -5,24 +5,24 @@
 该日志组的所有类型都找到后提前停止。
 
 输出文件：
-- 运行输出文件: {DATA_DIR}/IdGen_{timestamp}_run.log     各 worker 的运行日志
+- 运行输出文件: {DATA_DIR}/IdGen_{timestamp}_run.log     各任务的运行日志
 - 日志数据文件: {DATA_DIR}/IdGen_{timestamp}_data.csv    拉取到的日志数据
 """
 import csv
-import multiprocessing
 import os
 import re
 import sys
 from datetime import datetime, timedelta, timezone
-from typing import Callable, Dict, List
+from typing import Callable, Dict, List, Tuple
 
 __SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 __PROJ_DIR = os.path.dirname(__SCRIPT_DIR)
 if __PROJ_DIR not in sys.path:
     sys.path.insert(0, __PROJ_DIR)
 
-from CloudWatch.cloud_watch_dataclass import FilterLogEventsResp  # noqa: E402
+from CloudWatch.cloud_watch_dataclass import FetchStats, FilterLogEventsResp  # noqa: E402
 from CloudWatch.cloud_watch_helper import filter_log_events_descending  # noqa: E402
+from CloudWatch.cloud_watch_job_pool import DEFAULT_POOL_SIZE, LogFetchJob, WorkerContext, run_job_pool  # noqa: E402
 from utils import aws_urls  # noqa: E402
 from utils.aws_consts import REGION_TO_ABBR  # noqa: E402
 
@@ -182,32 +182,29 @@ def make_find_each_id_type_batch_fn(
 # endregion on_receive_batch 回调工厂
 
 
-def process_worker(
-    log_group_name: str, region: str,
-    known_types: List[str],
-    dt_start_utc: datetime, dt_end_utc: datetime,
-    segment_duration: timedelta,
-    shared_msg_dict: dict, shared_dict: Dict[str, list], stop_event,
-):
+def idgen_job(job: LogFetchJob, ctx: WorkerContext) -> Tuple[dict, FetchStats]:
+    """任务池中执行的单个 (日志组, region) 搜索：倒序查找该日志组每种 ID 类型最新的一条。"""
     fmt = FMT_DT_CONTENT
 
     def __gen_msg(msg: str):
         return f'{datetime.now().strftime(fmt)} > {msg}'
 
+    log_group_name, region = job.log_group_name, job.region
+    known_types: List[str] = job.payload['known_types']
     worker_dt_start = datetime.now()
-    shared_key = f'{log_group_name} {REGION_TO_ABBR.get(region, region)}'
-    shared_msg_dict[shared_key] = [__gen_msg(f'{shared_key}: 开始 搜索类型：{known_types}')]
-    print(shared_msg_dict[shared_key])
-    shared_dict[shared_key] = []
+    start_msg = __gen_msg(f'{job.key}: 开始 搜索类型：{known_types}')
+    print(start_msg)
 
     on_receive_batch = make_find_each_id_type_batch_fn(known_types)
     events, _stats = filter_log_events_descending(
         region, log_group_name, PATTERN,
-        dt_start=dt_start_utc, dt_end=dt_end_utc,
+        dt_start=job.dt_start, dt_end=job.dt_end,
         is_stop_on_match=True,
-        stop_event=stop_event,
-        segment_duration=segment_duration,
+        stop_event=ctx.stop_event,
+        client=ctx.get_client(region, log_group_name),
+        segment_duration=job.payload['segment_duration'],
         on_receive_batch=on_receive_batch,
+        limiter=ctx.get_limiter(region, log_group_name),
     )
 
     # 从回调的 found_types 中提取结果，按时间升序构建 CSV 行
@@ -231,64 +228,45 @@ def process_worker(
         })
         print(f'{datetime.strftime(event_ts, fmt)[:-3]}', f'{msg_clean}', f'{event_url}', sep='\t')
 
-    shared_dict[shared_key] = csv_rows
-
     found = list(on_receive_batch.found_types.keys())
     missing = [t for t in known_types if t not in on_receive_batch.found_types]
     worker_duration = (datetime.now() - worker_dt_start).total_seconds()
     finish_msg = __gen_msg(
-        f'{shared_key}: 完成。耗时：{worker_duration:.3f}s 任务总结：{_stats}'
+        f'{job.key}: 完成。耗时：{worker_duration:.3f}s 任务总结：{_stats}'
         f' 找到({len(found)}/{len(known_types)})：{found}'
         + (f' 未找到：{missing}' if missing else '')
     )
-    shared_msg_dict[shared_key] = [shared_msg_dict[shared_key][0], finish_msg]
     print(finish_msg)
+    return {'csv_rows': csv_rows, 'msgs': [start_msg, finish_msg]}, _stats
 
 
-def run_parallel():
+def run_parallel(pool_size: int = DEFAULT_POOL_SIZE):
     run_timestamp = datetime.now().strftime(FMT_DT_FILE)
 
-    stop_event = multiprocessing.Event()
-    with multiprocessing.Manager() as manager:
-        shared_msg_dict = manager.dict()
-        shared_dict = manager.dict()
-
-        processes: List[multiprocessing.Process] = []
-        for func_name, id_types in LOG_GROUP_ID_TYPES.items():
-            log_group_name = f'{LOG_GROUP_PREFIX}{func_name}'
-            for rgn in REGIONS:
-                process = multiprocessing.Process(
-                    target=process_worker, args=(
-                        log_group_name, rgn, id_types,
-                        DT_START_UTC, DT_END_UTC, SEGMENT_DURATION,
-                        shared_msg_dict, shared_dict, stop_event,
-                    )
-                )
-                processes.append(process)
-                process.start()
-
-        try:
-            for p in processes:
-                p.join()
-        except KeyboardInterrupt:
-            print('Keyboard Interrupted')
-        finally:
-            stop_event.set()
-            for process in processes:
-                process.join()
-        print("All Processes completed.")
-
-        # 收集运行输出
-        run_lines = []
-        for key in sorted(shared_msg_dict.keys()):
-            for line in shared_msg_dict[key]:
-                run_lines.append(line)
-
-        # 收集日志数据
-        all_csv_rows = []
-        for key in sorted(shared_dict.keys()):
-            all_csv_rows.extend(shared_dict[key])
-        all_csv_rows.sort(key=lambda r: r.get('DateTime', ''))
+    jobs = [
+        LogFetchJob(
+            log_group_name=f'{LOG_GROUP_PREFIX}{func_name}', region=rgn,
+            dt_start=DT_START_UTC, dt_end=DT_END_UTC,
+            payload={'known_types': id_types, 'segment_duration': SEGMENT_DURATION},
+        )
+        for func_name, id_types in LOG_GROUP_ID_TYPES.items()
+        for rgn in REGIONS
+    ]
+    results = run_job_pool(jobs, idgen_job, pool_size=pool_size)
+    print("All jobs completed.")
+
+    # 收集运行输出 / 日志数据
+    run_lines = []
+    all_csv_rows = []
+    for job, res in sorted(zip(jobs, results), key=lambda jr: jr[0].key):
+        if res is None:
+            run_lines.append(f'{job.key}: 无结果（worker 异常退出）')
+        elif res.error:
+            run_lines.append(f'{job.key}: 失败：{res.error}')
+        else:
+            run_lines.extend(res.result['msgs'])
+            all_csv_rows.extend(res.result['csv_rows'])
+    all_csv_rows.sort(key=lambda r: r.get('DateTime', ''))
 
     # 保存文件
     run_log_path = os.path.join(DATA_DIR, f'IdGen_{run_timestamp}_run.log')
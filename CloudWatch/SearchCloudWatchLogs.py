@@ -6,8 +6,9 @@ import re
 import shutil
 import subprocess
 import sys
+from contextlib import closing
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 
 # 脚本所在目录（在 os.chdir 之前固定下来，后续 chdir 不影响），默认输出目录基于此。
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -17,12 +18,19 @@ os.chdir(os.path.dirname(os.path.abspath(__file__)))
 os.chdir('..')
 sys.path.append(os.getcwd())
 
-from CloudWatch.cloud_watch_dataclass import FilterLogEventsResp  # noqa: E402
-from CloudWatch.cloud_watch_helper import filter_log_events, filter_log_events_descending  # noqa: E402
+from CloudWatch.cloud_watch_dataclass import FetchStats, FilterLogEventsResp, StopReason  # noqa: E402
+from CloudWatch.cloud_watch_helper import (  # noqa: E402
+    FILTER_LOG_EVENTS_TPS, filter_log_events, filter_log_events_cached, filter_log_events_parallel,
+    iter_filter_log_events, iter_filter_log_events_descending,
+)
+from CloudWatch.cloud_watch_job_pool import (  # noqa: E402
+    DEFAULT_POOL_SIZE, LogFetchJob, LogFetchJobResult, WorkerContext, run_job_pool,
+)
 from utils import aws_urls  # noqa: E402
 from utils.aws_client_error_handler import print_err  # noqa: E402
 from utils.aws_consts import REGION_ABBR, REGION_TO_ABBR  # noqa: E402
 from utils.exec_env_util import is_running_in_pycharm  # noqa: E402
+from utils.rate_limiter import RateLimiter  # noqa: E402
 
 # region 默认值（仅当 PyCharm 直接 Run 时使用，命令行运行需通过参数传入）
 DEFAULT_LOG_GROUP_NAMES: List[str] = [
@@ -43,130 +51,210 @@ DEFAULT_DT_END_UTC: Optional[datetime] = datetime(2026, 4, 22, tzinfo=timezone.u
 DEFAULT_ASCENDING = False
 DEFAULT_FIND_FIRST = True
 DEFAULT_SEGMENT_DURATION_MIN = 24 * 60
+DEFAULT_SLICES = 1
 DEFAULT_PATTERN = r'IdName code resp'
 # endregion 默认值
 
 
-def process_worker(
+def iter_result_pages(
     log_group_name: str, region: str, pattern: str,
     dt_start_utc: Optional[datetime], dt_end_utc: Optional[datetime],
-    ascending: bool, find_first: bool, segment_duration: timedelta,
-    shared_results: dict, stop_event, print_lock, output_dir: Optional[str],
-):
-    shared_key = f'{log_group_name} {REGION_TO_ABBR.get(region, region)}'
-    with print_lock:
-        print(f'开始：{shared_key}')
-    worker_dt_start = datetime.now()
-
-    error: Optional[str] = None
-    events: list
-    try:
-        if not ascending and find_first:
-            events, _ = filter_log_events_descending(
+    ascending: bool, find_first: bool, segment_duration: timedelta, slices: int,
+    stop_event=None, limiter: Optional[RateLimiter] = None,
+    client=None, stats: Optional[FetchStats] = None, use_cache: bool = False,
+) -> Iterator[List[dict]]:
+    """按最终输出顺序逐页产出命中事件，供调用方边拉边写，内存只占一页（倒序时为一段）。
+
+    - 倒序 + find-first：倒序分段，取第一个非空段的最新一条
+    - 正序：逐页流式（--slices > 1 时走分片并行，整体返回后再输出）
+    - 倒序（非 find-first）：有完整时间范围时倒序分段流式；否则整体拉取后反转
+    - use_cache（非 find-first 且有完整时间范围）：只拉本地缓存未覆盖的空档，整体返回
+
+    limiter 为 None 时按固定间隔限速（单进程），否则所有 API 调用都经过该限速器。
+    stats 传入时原地更新为本次拉取的 FetchStats。
+    """
+    stats = stats if stats is not None else FetchStats()
+    if not ascending and find_first:
+        first_events: Optional[List[dict]] = None
+        with closing(iter_filter_log_events_descending(
                 region, log_group_name, pattern,
                 dt_start=dt_start_utc, dt_end=dt_end_utc,
-                is_stop_on_match=True,
                 stop_event=stop_event,
+                client=client,
                 segment_duration=segment_duration,
-            )
-        else:
-            events, _ = filter_log_events(
-                region, log_group_name, pattern,
-                dt_start=dt_start_utc, dt_end=dt_end_utc,
-                is_stop_on_match=find_first,
-                stop_event=stop_event,
-            )
+                limiter=limiter,
+                stats=stats,
+        )) as seg_iter:
+            for seg_events in seg_iter:
+                first_events = seg_events[:1]
+                break
+        # 退出 with 时 close() 会把 stopped_by 记为 CONSUMER_CLOSED，命中原因在其后再写
+        if first_events is not None:
+            stats.stopped_by = StopReason.MATCH_FOUND
+            yield first_events
+        return
+
+    if use_cache and not find_first and dt_start_utc is not None and dt_end_utc is not None:
+        events, fetch_stats = filter_log_events_cached(
+            region, log_group_name, pattern,
+            dt_start=dt_start_utc, dt_end=dt_end_utc,
+            stop_event=stop_event,
+            client=client,
+            limiter=limiter,
+        )
+        stats.__dict__.update(fetch_stats.__dict__)
         if not ascending:
             events.reverse()
-    except Exception as e:
-        events, error = [], str(e)
-
-    lines = [__format_event_tsv(FilterLogEventsResp(**ev), log_group_name, region) for ev in events]
+        yield events
+    elif slices > 1:
+        events, fetch_stats = filter_log_events_parallel(
+            region, log_group_name, pattern,
+            dt_start=dt_start_utc, dt_end=dt_end_utc,
+            is_stop_on_match=find_first,
+            stop_event=stop_event,
+            client=client,
+            slices=slices,
+            limiter=limiter,
+        )
+        stats.__dict__.update(fetch_stats.__dict__)
+        if not ascending:
+            events.reverse()
+        yield events
+    elif ascending:
+        yield from iter_filter_log_events(
+            region, log_group_name, pattern,
+            dt_start=dt_start_utc, dt_end=dt_end_utc,
+            is_stop_on_match=find_first,
+            stop_event=stop_event,
+            client=client,
+            limiter=limiter,
+            stats=stats,
+        )
+    elif dt_start_utc is not None and dt_end_utc is not None:
+        yield from iter_filter_log_events_descending(
+            region, log_group_name, pattern,
+            dt_start=dt_start_utc, dt_end=dt_end_utc,
+            stop_event=stop_event,
+            client=client,
+            segment_duration=segment_duration,
+            limiter=limiter,
+            stats=stats,
+        )
+    else:
+        # 缺少时间边界无法倒序分段，只能整体拉取后反转
+        events, fetch_stats = filter_log_events(
+            region, log_group_name, pattern,
+            dt_start=dt_start_utc, dt_end=dt_end_utc,
+            stop_event=stop_event,
+            client=client,
+            limiter=limiter,
+        )
+        stats.__dict__.update(fetch_stats.__dict__)
+        events.reverse()
+        yield events
+
+
+def search_job(job: LogFetchJob, ctx: WorkerContext) -> Tuple[dict, FetchStats]:
+    """任务池中执行的单个 (日志组, region) 搜索：边拉边写 TSV，逐页加锁打印。"""
+    opts = job.payload
+    print_lock = ctx.extras['print_lock']
+    with print_lock:
+        print(f'开始：{job.key}')
 
-    # 各 worker 写各自的文件（互不相同的文件，无需加锁）。
+    # 各任务写各自的文件（互不相同的文件，无需加锁），边拉边写。
     out_file: Optional[str] = None
-    if output_dir and not error:
-        out_file = os.path.join(output_dir, __safe_filename(log_group_name, region))
-        with open(out_file, 'w', encoding='utf-8', newline='') as fh:
-            for line in lines:
-                fh.write(line + '\n')
-
-    worker_duration = (datetime.now() - worker_dt_start).total_seconds()
-    # 只回传计数/状态给主进程做汇总与崩溃检测（不再回传整批 events，省内存/省 IPC）。
-    shared_results[shared_key] = {
-        'hits': len(events), 'error': error,
-        'duration': worker_duration, 'file': out_file,
-    }
-
-    # 整块加锁打印：保证单个 worker 的输出连续打完，不与其它 worker 交错。
-    with print_lock:
-        if error:
-            print_err(f'== {shared_key} == 失败：{error}')
-        else:
-            suffix = f'  → {out_file}' if out_file else ''
-            print(f'== {shared_key} == 命中 {len(events)} 耗时 {worker_duration:.3f}s{suffix}')
-            for line in lines:
-                print(line)
-        sys.stdout.flush()
+    if opts['output_dir']:
+        out_file = os.path.join(opts['output_dir'], __safe_filename(job.log_group_name, job.region))
+
+    stats = FetchStats()
+    hits = 0
+    fh = open(out_file, 'w', encoding='utf-8', newline='') if out_file else None
+    try:
+        for page in iter_result_pages(
+                job.log_group_name, job.region, opts['pattern'], job.dt_start, job.dt_end,
+                opts['ascending'], opts['find_first'], opts['segment_duration'], opts['slices'],
+                stop_event=ctx.stop_event,
+                limiter=ctx.get_limiter(job.region, job.log_group_name),
+                client=ctx.get_client(job.region, job.log_group_name),
+                stats=stats,
+                use_cache=opts['use_cache'],
+        ):
+            lines = [__format_event_tsv(FilterLogEventsResp(**ev), job.log_group_name, job.region) for ev in page]
+            hits += len(lines)
+            if fh:
+                fh.writelines(line + '\n' for line in lines)
+            # 按页加锁打印：保证一页内的输出连续，不与其它 worker 交错。
+            with print_lock:
+                for line in lines:
+                    print(line)
+                sys.stdout.flush()
+    except Exception as e:
+        # 带上已写入的部分结果再抛给任务池（任务池只回传错误字符串）
+        suffix = f'（已写入的部分结果：{out_file}）' if out_file and hits else ''
+        raise RuntimeError(f'{e}{suffix}') from e
+    finally:
+        if fh:
+            fh.close()
+    return {'hits': hits, 'file': out_file}, stats
 
 
 def run_parallel(
     log_group_names: List[str], regions: List[str], pattern: str,
     dt_start_utc: Optional[datetime], dt_end_utc: Optional[datetime],
-    ascending: bool, find_first: bool, segment_duration: timedelta,
-    output_dir: Optional[str] = None, open_after: bool = False,
+    ascending: bool, find_first: bool, segment_duration: timedelta, slices: int = DEFAULT_SLICES,
+    tps: float = FILTER_LOG_EVENTS_TPS, workers: int = DEFAULT_POOL_SIZE,
+    output_dir: Optional[str] = None, open_after: bool = False, use_cache: bool = False,
 ):
     if output_dir:
         os.makedirs(output_dir, exist_ok=True)
 
-    stop_event = multiprocessing.Event()
+    opts = dict(
+        pattern=pattern, ascending=ascending, find_first=find_first,
+        segment_duration=segment_duration, slices=slices, output_dir=output_dir, use_cache=use_cache,
+    )
+    jobs = [
+        LogFetchJob(log_group_name=group_name, region=rgn, dt_start=dt_start_utc, dt_end=dt_end_utc, payload=opts)
+        for group_name in log_group_names
+        for rgn in regions
+    ]
+
     with multiprocessing.Manager() as manager:
-        shared_results = manager.dict()
         print_lock = manager.Lock()  # 跨进程串行化 stdout，保证整块输出不交错
 
-        processes: List[multiprocessing.Process] = []
-        for group_name in log_group_names:
-            for rgn in regions:
-                process = multiprocessing.Process(
-                    target=process_worker, args=(
-                        group_name, rgn, pattern,
-                        dt_start_utc, dt_end_utc, ascending, find_first, segment_duration,
-                        shared_results, stop_event, print_lock, output_dir,
-                    )
-                )
-                processes.append(process)
-                process.start()
-
-        try:
-            for p in processes:
-                p.join()
-        except KeyboardInterrupt:
-            print('Keyboard Interrupted')
-        finally:
-            stop_event.set()
-            for process in processes:
-                process.join()
-
-        # 明细已由各 worker 实时（加锁）打印并各自落盘，这里只做崩溃检测 + 总命中汇总。
-        total_hits = 0
-        for group_name in log_group_names:
-            for rgn in regions:
-                shared_key = f'{group_name} {REGION_TO_ABBR.get(rgn, rgn)}'
-                res = shared_results.get(shared_key)
-                if res is None:
-                    print_err(f'== {shared_key} == 无结果（worker 异常退出）')
-                    continue
-                if not res['error']:
-                    total_hits += res['hits']
-        print(f'All Processes completed. 总命中：{total_hits}')
-        if output_dir:
-            print(f'结果已写入目录：{os.path.abspath(output_dir)}')
-            if open_after:
-                __reveal_in_explorer(output_dir, select=False)
+        def __on_result(res: LogFetchJobResult):
+            with print_lock:
+                if res.error:
+                    print_err(f'== {res.job.key} == 失败：{res.error}')
+                else:
+                    out_file = res.result['file']
+                    suffix = f'  → {out_file}' if out_file else ''
+                    print(f'== {res.job.key} == 命中 {res.result["hits"]} 耗时 {res.duration:.3f}s '
+                          f'{res.stats}{suffix}')
+                sys.stdout.flush()
+
+        # 固定大小的 worker 池领取任务；同一 (账号, region) 的任务共用一个跨进程令牌桶
+        results = run_job_pool(
+            jobs, search_job, pool_size=workers, tps=tps,
+            extras={'print_lock': print_lock}, on_result=__on_result,
+        )
+
+    # 明细已由各任务实时（加锁）打印并各自落盘，这里只做崩溃检测 + 总命中汇总。
+    total_hits = 0
+    for job, res in zip(jobs, results):
+        if res is None:
+            print_err(f'== {job.key} == 无结果（worker 异常退出）')
+            continue
+        if not res.error:
+            total_hits += res.result['hits']
+    print(f'All jobs completed. 总命中：{total_hits}')
+    if output_dir:
+        print(f'结果已写入目录：{os.path.abspath(output_dir)}')
+        if open_after:
+            __reveal_in_explorer(output_dir, select=False)
 
 
 def __default_output_dir_parallel() -> str:
-    """并行默认输出目录：CloudWatch/Data/SearchCloudWatchLogs/Run_<时间戳>/（每个 worker 一个文件）。"""
+    """并行默认输出目录：CloudWatch/Data/SearchCloudWatchLogs/Run_<时间戳>/（每个 (log_group, region) 一个文件）。"""
     ts = datetime.now().strftime('%Y%m%d_%H%M%S')
     return os.path.join(OUTPUT_BASE_DIR, f'Run_{ts}')
 
@@ -237,8 +325,8 @@ def __safe_filename(log_group_name: str, region: str) -> str:
 def run_sequential(
     log_group_names: List[str], regions: List[str], pattern: str,
     dt_start_utc: Optional[datetime], dt_end_utc: Optional[datetime],
-    ascending: bool, find_first: bool, segment_duration: timedelta,
-    output: Optional[str] = None, open_after: bool = False,
+    ascending: bool, find_first: bool, segment_duration: timedelta, slices: int = DEFAULT_SLICES,
+    output: Optional[str] = None, open_after: bool = False, use_cache: bool = False,
 ):
     fmt = "%Y-%m-%d %H:%M:%S"
     if output:
@@ -250,30 +338,25 @@ def run_sequential(
             for rgn in regions:
                 dt_start = datetime.now()
                 print(f'开始：{name} {REGION_TO_ABBR.get(rgn, rgn)} {dt_start.strftime(fmt)}')
+                hits = 0
                 try:
-                    if not ascending and find_first:
-                        events, _ = filter_log_events_descending(
-                            rgn, name, pattern, dt_start=dt_start_utc, dt_end=dt_end_utc, is_stop_on_match=True,
-                            segment_duration=segment_duration,
-                        )
-                    else:
-                        events, _ = filter_log_events(
-                            rgn, name, pattern, dt_start=dt_start_utc, dt_end=dt_end_utc, is_stop_on_match=find_first,
-                        )
-                    if not ascending:
-                        events.reverse()
+                    for page in iter_result_pages(
+                            name, rgn, pattern, dt_start_utc, dt_end_utc,
+                            ascending, find_first, segment_duration, slices,
+                            use_cache=use_cache,
+                    ):
+                        for e in (FilterLogEventsResp(**ev) for ev in page):
+                            line = __format_event_tsv(e, name, rgn)
+                            print(line)
+                            if out_fh:
+                                out_fh.write(line + '\n')
+                        hits += len(page)
                 except Exception as e:
                     print_err(f'{name} {REGION_TO_ABBR.get(rgn, rgn)} {e}')
-                    events = []
-                for e in (FilterLogEventsResp(**ev) for ev in events):
-                    line = __format_event_tsv(e, name, rgn)
-                    print(line)
-                    if out_fh:
-                        out_fh.write(line + '\n')
-                total_hits += len(events)
+                total_hits += hits
                 dt_end = datetime.now()
                 duration = (dt_end - dt_start).total_seconds()
-                print(f'完成：{name} {REGION_TO_ABBR.get(rgn, rgn)} {dt_end} 耗时：{duration}s 命中：{len(events)}')
+                print(f'完成：{name} {REGION_TO_ABBR.get(rgn, rgn)} {dt_end} 耗时：{duration}s 命中：{hits}')
     finally:
         if out_fh:
             out_fh.close()
@@ -345,11 +428,35 @@ def __parse_args(args: List[str]):
 
     parser.add_argument('--segment-duration', '-seg',
                         type=int, default=60, required=False,
-                        help='[选填] 倒序搜索时每段时长（分钟），默认 60。仅在倒序+find-first 时生效。',
+                        help='[选填] 倒序搜索时每段时长（分钟），默认 60。倒序时按段从新到旧流式输出；--slices > 1 时不生效。',
+                        )
+
+    parser.add_argument('--slices',
+                        type=int, default=DEFAULT_SLICES, required=False,
+                        help=f'[选填] 把 [start, end) 切成 N 段并发拉取（共享限速器），默认 {DEFAULT_SLICES}（不切分）。'
+                             '需同时提供 --start 和 --end；倒序+find-first 时不生效。',
+                        )
+
+    parser.add_argument('--tps',
+                        type=float, default=FILTER_LOG_EVENTS_TPS, required=False,
+                        help=f'[选填] 并行模式下每个 (账号, region) 的 FilterLogEvents 总 TPS 预算，'
+                             f'所有 worker 共享，默认 {FILTER_LOG_EVENTS_TPS:g}。',
+                        )
+
+    parser.add_argument('--workers', '-w',
+                        type=int, default=DEFAULT_POOL_SIZE, required=False,
+                        help=f'[选填] 并行模式下常驻 worker 进程数，所有 (log_group, region) 任务排队领取，'
+                             f'默认 {DEFAULT_POOL_SIZE}。',
+                        )
+
+    parser.add_argument('--cache', action='store_true', default=False,
+                        help='[选填] 使用本地事件缓存（%%LOCALAPPDATA%%/AwsTools/cw_events.sqlite3）：'
+                             '只拉取缓存未覆盖的时间段，其余从本地读取并在本地按 pattern 过滤。'
+                             '需同时提供 --start 和 --end；--find-first 时不生效。',
                         )
 
     parser.add_argument('--sequential', action='store_true', default=False,
-                        help='[选填] 串行执行（默认并行多进程）。',
+                        help='[选填] 串行执行（默认多进程 worker 池并行）。',
                         )
 
     parser.add_argument('--no-file', action='store_true', default=False,
@@ -361,7 +468,7 @@ def __parse_args(args: List[str]):
     parser.add_argument('--output', '-o',
                         default=None, required=False,
                         help='[选填] 覆盖默认输出位置（TSV：时间\\t消息\\tURL）。'
-                             '串行模式下是单个文件路径；并行模式下是目录（每个 worker 一个文件）。'
+                             '串行模式下是单个文件路径；并行模式下是目录（每个 (log_group, region) 一个文件）。'
                              f'不传则默认写到 {OUTPUT_BASE_DIR} 下（并行为 Run_<时间戳>/ 子目录）。',
                         )
 
@@ -394,7 +501,7 @@ def __resolve_config(args) -> dict:
         sys.exit(1)
 
     # 解析输出（两种模式默认都出文件，--no-file 关闭，-o 覆盖默认）：
-    #   串行：output 是单个文件路径；并行：output 是目录（每个 worker 一个文件）。
+    #   串行：output 是单个文件路径；并行：output 是目录（每个 (log_group, region) 一个文件）。
     if args.no_file:
         output = None
     elif args.sequential:
@@ -423,7 +530,11 @@ def __resolve_config(args) -> dict:
         ascending=ascending,
         find_first=args.find_first,
         segment_duration=timedelta(minutes=args.segment_duration),
+        slices=max(1, args.slices),
+        tps=args.tps,
+        workers=max(1, args.workers),
         sequential=args.sequential,
+        use_cache=args.cache,
         output=output,
         open_after=open_after,
     )
@@ -459,10 +570,12 @@ def main():
     sequential = cfg.pop('sequential')
     output = cfg.pop('output')
     open_after = cfg.pop('open_after')
+    tps = cfg.pop('tps')
+    workers = cfg.pop('workers')
     if sequential:
         run_sequential(**cfg, output=output, open_after=open_after)
     else:
-        run_parallel(**cfg, output_dir=output, open_after=open_after)
+        run_parallel(**cfg, tps=tps, workers=workers, output_dir=output, open_after=open_after)
 
 
 if __name__ == '__main__':
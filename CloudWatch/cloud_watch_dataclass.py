@@ -1,4 +1,5 @@
 import dataclasses
+import time
 from datetime import datetime
 from enum import Enum
 from typing import Optional, List
@@ -11,6 +12,7 @@ class StopReason(Enum):
     MATCH_FOUND = 'match_found'
     ON_RECEIVE_BATCH = 'on_receive_batch'
     COMPLETED = 'completed'
+    CONSUMER_CLOSED = 'consumer_closed'
 
 
 @dataclasses.dataclass(init=False)
@@ -59,6 +61,17 @@ class FetchStats:
     events_per_iteration: List[int] = dataclasses.field(default_factory=list)
     stopped_by: StopReason = StopReason.COMPLETED
 
+    def record_iteration(self, t_start: float, n_events: int) -> None:
+        """一次 API 调用完成后原地更新，让流式调用方随时读到最新进度。t_start 为 time.perf_counter() 起点。"""
+        self.iterations += 1
+        self.total_events += n_events
+        self.events_per_iteration.append(n_events)
+        self.update_duration(t_start)
+
+    def update_duration(self, t_start: float) -> None:
+        self.total_duration_ms = round((time.perf_counter() - t_start) * 1000, 2)
+        self.avg_iteration_ms = round(self.total_duration_ms / self.iterations, 2) if self.iterations > 0 else 0.0
+
     def __repr__(self):
         return (
             f'耗时={(self.total_duration_ms / 1000):.3f}s 命中={self.total_events} '
@@ -0,0 +1,310 @@
+"""CloudWatch Logs 事件本地缓存：按 (region, 日志组) 落盘原始事件，并记录哪些时间区间已经完整拉取过。
+
+同一时间窗的重复排查（重跑 SearchAlertErrorRequest / SearchCloudWatchLogs）只向 CloudWatch 请求
+未覆盖的空档，其余部分直接从本地 SQLite 读出，再在本地按 filter pattern 过滤。
+
+覆盖区间按 pattern 分别记录：
+- pattern='' 的覆盖表示区间内全部事件都在本地，任何能本地编译的 pattern 都可以直接在本地求值；
+- 其他 pattern 的覆盖只表示该 pattern 的命中都在本地（命中关系记在 pattern_hits 表），
+  本地编译不了的 pattern 只能复用自己的覆盖。
+
+区间一律为毫秒闭区间 [start_ms, end_ms]，与 FilterLogEvents 的 startTime / endTime 语义一致。
+距当前不足 SETTLE_SECONDS 的部分可能还有事件在写入，拉取后不记为已覆盖，下次仍会重新请求。
+
+event_tokens 是事件的标识符倒排表（token -> events.id，token 定义见 cloud_watch_token_index），
+store_events 时同步写入；按 RequestId / log_id / 玩家查日志用 query_tokens 点查，不再扫描窗口内全部事件。
+
+缓存文件路径（与 log_groups_cache 同目录）：
+  Windows: %LOCALAPPDATA%/AwsTools/cw_events.sqlite3
+  其他:     ~/.local/share/AwsTools/cw_events.sqlite3
+"""
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from CloudWatch.cloud_watch_filter_pattern import compile_filter_pattern
+from CloudWatch.cloud_watch_token_index import extract_tokens
+from services.cloudwatch.log_groups_cache import get_cache_dir
+
+SETTLE_SECONDS = 300  # 事件写入延迟的保守估计：晚于 now - SETTLE_SECONDS 的区间不记为已覆盖
+RETENTION_DAYS = 7    # 事件保留天数，prune 不传 before 时按此清理
+
+_DB_FILE_NAME = 'cw_events.sqlite3'
+_SQLITE_TIMEOUT = 30.0  # 多进程并发写时等待锁的秒数
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    region TEXT NOT NULL,
+    log_group TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    log_stream TEXT NOT NULL,
+    message TEXT NOT NULL,
+    ingestion_time INTEGER,
+    UNIQUE (region, log_group, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (region, log_group, timestamp);
+CREATE TABLE IF NOT EXISTS coverage (
+    region TEXT NOT NULL,
+    log_group TEXT NOT NULL,
+    pattern TEXT NOT NULL,
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_coverage_key ON coverage (region, log_group, pattern);
+CREATE TABLE IF NOT EXISTS pattern_hits (
+    region TEXT NOT NULL,
+    log_group TEXT NOT NULL,
+    pattern TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    PRIMARY KEY (region, log_group, pattern, event_id)
+);
+CREATE TABLE IF NOT EXISTS event_tokens (
+    token TEXT NOT NULL,
+    event_rowid INTEGER NOT NULL,
+    PRIMARY KEY (token, event_rowid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_event_tokens_rowid ON event_tokens (event_rowid);
+"""
+
+Interval = Tuple[int, int]
+
+
+def to_ms(dt: datetime) -> int:
+    return int(dt.timestamp() * 1000)
+
+
+def from_ms(ms: int) -> datetime:
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """合并重叠或相邻（end + 1 == start）的闭区间，按起点升序返回。"""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(start_ms: int, end_ms: int, covered: Sequence[Interval]) -> List[Interval]:
+    """[start_ms, end_ms] 中未被 covered（已合并、升序）覆盖的空档。"""
+    gaps: List[Interval] = []
+    cursor = start_ms
+    for c_start, c_end in covered:
+        if c_end < cursor:
+            continue
+        if c_start > end_ms:
+            break
+        if c_start > cursor:
+            gaps.append((cursor, c_start - 1))
+        cursor = max(cursor, c_end + 1)
+        if cursor > end_ms:
+            break
+    if cursor <= end_ms:
+        gaps.append((cursor, end_ms))
+    return gaps
+
+
+class EventCache:
+    """SQLite 事件缓存。每次操作新开连接，可在多线程 / 多进程（WAL）下共用同一个文件。"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = str(db_path) if db_path is not None else str(get_cache_dir() / _DB_FILE_NAME)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=_SQLITE_TIMEOUT)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    # region 覆盖区间
+
+    def covered_intervals(self, region: str, log_group: str, pattern: str = '') -> List[Interval]:
+        """pattern 在本地可求值的全部覆盖：自身的覆盖，能本地编译时再并上 pattern='' 的覆盖。"""
+        patterns = [pattern]
+        if pattern and compile_filter_pattern(pattern) is not None:
+            patterns.append('')
+        with self._connect() as conn:
+            rows = conn.execute(
+                f'SELECT start_ms, end_ms FROM coverage WHERE region = ? AND log_group = ? '
+                f'AND pattern IN ({",".join("?" * len(patterns))})',
+                (region, log_group, *patterns),
+            ).fetchall()
+        return merge_intervals(rows)
+
+    def missing_intervals(self, region: str, log_group: str, pattern: str, start_ms: int, end_ms: int) -> List[Interval]:
+        """[start_ms, end_ms] 中仍需向 CloudWatch 请求的空档。"""
+        return subtract_intervals(start_ms, end_ms, self.covered_intervals(region, log_group, pattern))
+
+    def mark_covered(self, region: str, log_group: str, pattern: str, start_ms: int, end_ms: int) -> None:
+        """把 [start_ms, end_ms] 记为该 pattern 已完整拉取，并与已有覆盖合并。"""
+        if start_ms > end_ms:
+            return
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            key = (region, log_group, pattern)
+            rows = conn.execute(
+                'SELECT start_ms, end_ms FROM coverage WHERE region = ? AND log_group = ? AND pattern = ?', key,
+            ).fetchall()
+            conn.execute('DELETE FROM coverage WHERE region = ? AND log_group = ? AND pattern = ?', key)
+            conn.executemany(
+                'INSERT INTO coverage (region, log_group, pattern, start_ms, end_ms) VALUES (?, ?, ?, ?, ?)',
+                [(*key, s, e) for s, e in merge_intervals(rows + [(start_ms, end_ms)])],
+            )
+
+    # endregion 覆盖区间
+
+    # region 事件读写
+
+    def store_events(self, region: str, log_group: str, pattern: str, events: List[dict]) -> None:
+        """保存 filter_log_events 返回的原始事件；pattern 非空时同时记录命中关系。"""
+        if not events:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT OR IGNORE INTO events '
+                '(region, log_group, event_id, timestamp, log_stream, message, ingestion_time) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (region, log_group, e['eventId'], e['timestamp'], e.get('logStreamName', ''),
+                     e['message'], e.get('ingestionTime'))
+                    for e in events
+                ],
+            )
+            if pattern:
+                conn.executemany(
+                    'INSERT OR IGNORE INTO pattern_hits (region, log_group, pattern, event_id) VALUES (?, ?, ?, ?)',
+                    [(region, log_group, pattern, e['eventId']) for e in events],
+                )
+            postings = [(e['eventId'], token) for e in events for token in extract_tokens(e['message'])]
+            if postings:
+                # 事件 id 与 token 一起按 (region, log_group, event_id) 联表写入，不逐条回查 id
+                conn.execute(
+                    'CREATE TEMP TABLE IF NOT EXISTS new_postings (event_id TEXT NOT NULL, token TEXT NOT NULL)')
+                conn.executemany('INSERT INTO new_postings (event_id, token) VALUES (?, ?)', postings)
+                conn.execute(
+                    'INSERT OR IGNORE INTO event_tokens (token, event_rowid) '
+                    'SELECT p.token, e.id FROM new_postings p JOIN events e '
+                    'ON e.region = ? AND e.log_group = ? AND e.event_id = p.event_id',
+                    (region, log_group),
+                )
+                conn.execute('DELETE FROM new_postings')
+
+    def query_events(
+            self, region: str, log_group: str, pattern: str, start_ms: int, end_ms: int,
+            log_stream_names: Optional[List[str]] = None,
+    ) -> List[dict]:
+        """读取 [start_ms, end_ms] 内匹配 pattern 的本地事件，按 (timestamp, eventId) 升序，字段与 API 返回一致。
+
+        pattern 能本地编译时对窗口内全部事件求值；否则只返回 pattern_hits 中记录过的命中。
+        调用方负责保证窗口已被覆盖（见 missing_intervals），否则结果可能不完整。
+        """
+        matcher = compile_filter_pattern(pattern)
+        sql = ('SELECT e.event_id, e.timestamp, e.log_stream, e.message, e.ingestion_time FROM events e '
+               'WHERE e.region = ? AND e.log_group = ? AND e.timestamp BETWEEN ? AND ?')
+        params: list = [region, log_group, start_ms, end_ms]
+        if matcher is None:
+            sql += (' AND EXISTS (SELECT 1 FROM pattern_hits h WHERE h.region = e.region AND h.log_group = e.log_group '
+                    'AND h.pattern = ? AND h.event_id = e.event_id)')
+            params.append(pattern)
+        if log_stream_names:
+            sql += f' AND e.log_stream IN ({",".join("?" * len(log_stream_names))})'
+            params += log_stream_names
+        sql += ' ORDER BY e.timestamp, e.event_id'
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        events: List[dict] = []
+        for event_id, ts, stream, message, ingestion_time in rows:
+            if matcher is not None and not matcher(message):
+                continue
+            event = {'logStreamName': stream, 'timestamp': ts, 'message': message, 'eventId': event_id}
+            if ingestion_time is not None:
+                event['ingestionTime'] = ingestion_time
+            events.append(event)
+        return events
+
+    # endregion 事件读写
+
+    # region 标识符倒排表
+
+    def query_tokens(
+            self, region: str, log_group: str, tokens: Iterable[str],
+            start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+            log_stream_names: Optional[List[str]] = None,
+    ) -> List[dict]:
+        """本地缓存中含任一 token 的事件，按 (timestamp, eventId) 升序，字段与 API 返回一致。
+
+        只能查到已缓存的事件；窗口是否完整拉取过由调用方按 missing_intervals 判断。
+        """
+        tokens = list(set(tokens))
+        if not tokens:
+            return []
+        sql = ('SELECT e.event_id, e.timestamp, e.log_stream, e.message, e.ingestion_time FROM events e '
+               f'WHERE e.id IN (SELECT event_rowid FROM event_tokens WHERE token IN ({",".join("?" * len(tokens))})) '
+               'AND e.region = ? AND e.log_group = ?')
+        params: list = [*tokens, region, log_group]
+        if start_ms is not None:
+            sql += ' AND e.timestamp >= ?'
+            params.append(start_ms)
+        if end_ms is not None:
+            sql += ' AND e.timestamp <= ?'
+            params.append(end_ms)
+        if log_stream_names:
+            sql += f' AND e.log_stream IN ({",".join("?" * len(log_stream_names))})'
+            params += log_stream_names
+        sql += ' ORDER BY e.timestamp, e.event_id'
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        events: List[dict] = []
+        for event_id, ts, stream, message, ingestion_time in rows:
+            event = {'logStreamName': stream, 'timestamp': ts, 'message': message, 'eventId': event_id}
+            if ingestion_time is not None:
+                event['ingestionTime'] = ingestion_time
+            events.append(event)
+        return events
+
+    # endregion 标识符倒排表
+
+    def prune(self, before: Optional[datetime] = None) -> int:
+        """删除 before（默认 RETENTION_DAYS 天前）之前的事件和覆盖，控制缓存文件体积，返回删除的事件数。"""
+        if before is None:
+            before = datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)
+        before_ms = to_ms(before)
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'DELETE FROM pattern_hits WHERE event_id IN (SELECT event_id FROM events WHERE timestamp < ?)',
+                (before_ms,),
+            )
+            conn.execute(
+                'DELETE FROM event_tokens WHERE event_rowid IN (SELECT id FROM events WHERE timestamp < ?)',
+                (before_ms,),
+            )
+            deleted = conn.execute('DELETE FROM events WHERE timestamp < ?', (before_ms,)).rowcount
+            conn.execute('DELETE FROM coverage WHERE end_ms < ?', (before_ms,))
+            conn.execute('UPDATE coverage SET start_ms = ? WHERE start_ms < ?', (before_ms, before_ms))
+        if deleted <= 0:
+            return 0
+        # events.id 是显式 INTEGER PRIMARY KEY，VACUUM 不会重排，倒排表无需重建
+        with self._connect() as conn:
+            conn.execute('VACUUM')
+        return deleted
+
+
+def settled_end_ms(end_ms: int) -> int:
+    """可以记为已覆盖的最晚毫秒：不晚于 now - SETTLE_SECONDS。"""
+    return min(end_ms, int((time.time() - SETTLE_SECONDS) * 1000))
@@ -0,0 +1,423 @@
+"""CloudWatch Logs 导出归档（CreateExportTask 下载到本地的 .gz 文件）的读取与索引。
+
+LogGroupDownloader 下载的目录结构：
+    <task_id>/aws-logs-write-test
+    <task_id>/<log stream 名，可能含 />/000000.gz, 000001.gz ...
+
+每个 .gz 解压后是按时间排序的文本行，每条事件以 `2024-01-01T00:00:00.000Z ` 开头，
+消息内的换行原样保留（续行不以时间戳开头，归入上一条事件）。
+
+索引（归档根目录下的 .cw_archive_index.json）按文件记录：
+    stream、首末事件时间、是否有序，以及 分钟桶 -> 该分钟第一条事件在解压流中的字节偏移
+查询时先按 stream / 时间范围跳过整个文件，再从起始分钟的偏移处开始解析，越过 dt_end 即停止。
+文件的 mtime / size 变化后重建该文件的索引。
+
+查询接口与 filter_log_events 一致，返回 FilterLogEventsResp 形状的 dict 和 FetchStats（iterations 为读取的文件数）。
+
+按请求 / 玩家点查走倒排索引（.cw_archive_tokens，token 定义见 cloud_watch_token_index）：
+    按文件记录 token -> 事件在解压流中的字节偏移；偏移升序、差分后存成 array('Q')。
+    文件内容整体 zlib 压缩：一行 JSON 头（文件元数据、各 token 在数据区的 [起点, 长度]）+ 换行 + 原始 array 字节。
+    查询只解压含该 token 的文件，并直接 seek 到事件，见 ArchiveTokenIndex / lookup_archive_events。
+"""
+import gzip
+import json
+import os
+import re
+import sys
+import time
+import zlib
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from CloudWatch.cloud_watch_dataclass import FetchStats, StopReason
+from CloudWatch.cloud_watch_event_cache import to_ms
+from CloudWatch.cloud_watch_filter_pattern import parse_filter_pattern
+from CloudWatch.cloud_watch_token_index import extract_tokens
+
+INDEX_FILE_NAME = '.cw_archive_index.json'
+_INDEX_VERSION = 1
+_WRITE_TEST_FILE_NAME = 'aws-logs-write-test'  # 导出任务根目录的标记文件
+_MINUTE_MS = 60 * 1000
+TOKEN_INDEX_FILE_NAME = '.cw_archive_tokens'
+_TOKEN_INDEX_VERSION = 1
+_ZLIB_LEVEL = 6
+
+_LINE_TS_RE = re.compile(rb'^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3})Z ')
+
+
+def _parse_line_ts(line: bytes) -> Optional[int]:
+    """事件首行的毫秒时间戳；续行返回 None。"""
+    m = _LINE_TS_RE.match(line)
+    if m is None:
+        return None
+    dt = datetime.fromisoformat(m.group(1).decode()).replace(tzinfo=timezone.utc)
+    return to_ms(dt)
+
+
+def _iter_raw_events(fp, offset: int = 0) -> Iterator[Tuple[int, int, bytes]]:
+    """从解压流的 offset 处逐条产出 (字节偏移, 毫秒时间戳, 消息原文)。"""
+    if offset:
+        fp.seek(offset)
+    pos = offset
+    cur: Optional[Tuple[int, int, List[bytes]]] = None
+    for line in fp:
+        ts = _parse_line_ts(line)
+        if ts is not None:
+            if cur is not None:
+                yield cur[0], cur[1], b''.join(cur[2])
+            cur = (pos, ts, [line[25:]])  # 'YYYY-MM-DDTHH:MM:SS.mmmZ ' 共 25 字节
+        elif cur is not None:
+            cur[2].append(line)
+        pos += len(line)
+    if cur is not None:
+        yield cur[0], cur[1], b''.join(cur[2])
+
+
+def _event_id(rel_path: str, offset: int) -> str:
+    return f'{zlib.crc32(rel_path.encode()):08x}{offset:012d}'
+
+
+def _to_event(rel_path: str, stream: str, pos: int, ts: int, raw: bytes) -> dict:
+    message = raw.decode('utf-8', errors='replace')
+    return {
+        'logStreamName': stream,
+        'timestamp': ts,
+        'message': message[:-1] if message.endswith('\n') else message,
+        'eventId': _event_id(rel_path, pos),
+    }
+
+
+class ExportArchive:
+    """一个本地导出归档目录（可包含多个导出任务，如增量模式下的 dt=*/<task_id>）。"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_FILE_NAME)
+        self.files: Dict[str, dict] = {}  # 相对路径 -> 文件索引
+
+    # region 索引
+
+    def _stream_of(self, rel_path: str) -> str:
+        """文件所属的 log stream：相对最近的导出任务根目录（含 aws-logs-write-test）的目录路径。"""
+        parts = os.path.dirname(rel_path).split(os.sep)
+        for i in range(len(parts), -1, -1):
+            if os.path.exists(os.path.join(self.root, *parts[:i], _WRITE_TEST_FILE_NAME)):
+                return '/'.join(parts[i:])
+        return '/'.join(parts)
+
+    def _index_file(self, rel_path: str) -> dict:
+        minutes: Dict[str, int] = {}
+        first_ts = last_ts = None
+        is_sorted = True
+        with gzip.open(os.path.join(self.root, rel_path), 'rb') as fp:
+            for offset, ts, _ in _iter_raw_events(fp):
+                if last_ts is not None and ts < last_ts:
+                    is_sorted = False
+                first_ts = ts if first_ts is None else min(first_ts, ts)
+                last_ts = ts if last_ts is None else max(last_ts, ts)
+                minutes.setdefault(str(ts // _MINUTE_MS), offset)
+        stat = os.stat(os.path.join(self.root, rel_path))
+        return {
+            'mtime': stat.st_mtime, 'size': stat.st_size, 'stream': self._stream_of(rel_path),
+            'first_ts': first_ts, 'last_ts': last_ts, 'sorted': is_sorted, 'minutes': minutes,
+        }
+
+    def build_index(self) -> Dict[str, dict]:
+        """扫描归档目录，增量更新索引（只重建新增或变化的文件）并写回 sidecar 文件。"""
+        old: Dict[str, dict] = {}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == _INDEX_VERSION:
+                    old = data['files']
+            except (OSError, ValueError):
+                old = {}
+
+        files: Dict[str, dict] = {}
+        changed = False
+        for dir_path, _, file_names in os.walk(self.root):
+            for name in file_names:
+                if not name.endswith('.gz'):
+                    continue
+                rel_path = os.path.relpath(os.path.join(dir_path, name), self.root)
+                stat = os.stat(os.path.join(dir_path, name))
+                entry = old.get(rel_path)
+                if entry is None or entry['mtime'] != stat.st_mtime or entry['size'] != stat.st_size:
+                    entry = self._index_file(rel_path)
+                    changed = True
+                files[rel_path] = entry
+        if changed or set(files) != set(old):
+            tmp_path = f'{self.index_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': _INDEX_VERSION, 'files': files}, f)
+            os.replace(tmp_path, self.index_path)
+        self.files = files
+        return files
+
+    @property
+    def log_stream_names(self) -> List[str]:
+        return sorted({entry['stream'] for entry in self.files.values()})
+
+    # endregion 索引
+
+    # region 查询
+
+    def _iter_file_events(self, rel_path: str, entry: dict, start_ms: int, end_ms: int) -> Iterator[dict]:
+        offset = 0
+        if entry['sorted']:
+            # 从不早于 start_ms 所在分钟的第一个桶开始读
+            start_minute = start_ms // _MINUTE_MS
+            later = [int(m) for m in entry['minutes'] if int(m) >= start_minute]
+            if not later:
+                return
+            offset = entry['minutes'][str(min(later))]
+        with gzip.open(os.path.join(self.root, rel_path), 'rb') as fp:
+            for pos, ts, raw in _iter_raw_events(fp, offset):
+                if ts > end_ms and entry['sorted']:
+                    break
+                if start_ms <= ts <= end_ms:
+                    yield _to_event(rel_path, entry['stream'], pos, ts, raw)
+
+    def iter_filter_log_events(
+            self, pattern: str = '',
+            dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
+            is_stop_on_match: bool = False,
+            stop_event=None,
+            log_stream_names: Optional[List[str]] = None,
+            stats: Optional[FetchStats] = None,
+    ) -> Iterator[List[dict]]:
+        """按文件逐页产出命中事件（每页一个 .gz 文件的命中，按文件首条时间排序），语义同 iter_filter_log_events。
+
+        Raises:
+            FilterPatternError: pattern 语法错误
+        """
+        matcher = parse_filter_pattern(pattern)
+        stats = stats if stats is not None else FetchStats()
+        if not self.files:
+            self.build_index()
+        start_ms = to_ms(dt_start) if dt_start else 0
+        end_ms = to_ms(dt_end) if dt_end else 2 ** 62
+        streams = set(log_stream_names) if log_stream_names else None
+
+        candidates = sorted(
+            (entry['first_ts'], rel_path) for rel_path, entry in self.files.items()
+            if entry['first_ts'] is not None
+            and entry['last_ts'] >= start_ms and entry['first_ts'] <= end_ms
+            and (streams is None or entry['stream'] in streams)
+        )
+        t_start = time.perf_counter()
+        for _, rel_path in candidates:
+            if stop_event is not None and stop_event.is_set():
+                stats.stopped_by = StopReason.STOP_EVENT
+                break
+            page = [e for e in self._iter_file_events(rel_path, self.files[rel_path], start_ms, end_ms)
+                    if matcher(e['message'])]
+            stats.record_iteration(t_start, len(page))
+            if page:
+                yield page
+                if is_stop_on_match:
+                    stats.stopped_by = StopReason.MATCH_FOUND
+                    break
+        else:
+            stats.stopped_by = StopReason.TOKEN_EXHAUSTED
+        stats.update_duration(t_start)
+
+    def filter_log_events(
+            self, pattern: str = '',
+            dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
+            is_stop_on_match: bool = False,
+            stop_event=None,
+            log_stream_names: Optional[List[str]] = None,
+    ) -> Tuple[List[dict], FetchStats]:
+        """与 cloud_watch_helper.filter_log_events 相同的返回形状，结果按 (timestamp, eventId) 排序。"""
+        stats = FetchStats()
+        events_all: List[dict] = []
+        for page in self.iter_filter_log_events(
+                pattern, dt_start=dt_start, dt_end=dt_end, is_stop_on_match=is_stop_on_match,
+                stop_event=stop_event, log_stream_names=log_stream_names, stats=stats,
+        ):
+            events_all += page
+        events_all.sort(key=lambda e: (e['timestamp'], e['eventId']))
+        return events_all, stats
+
+    # endregion 查询
+
+
+def filter_archive_log_events(
+        archive_root: str, pattern: str = '',
+        dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
+        is_stop_on_match: bool = False,
+        stop_event=None,
+        log_stream_names: Optional[List[str]] = None,
+) -> Tuple[List[dict], FetchStats]:
+    """在本地导出归档中搜索，参数与返回值同 filter_log_events（不需要 region / log group / client）。"""
+    archive = ExportArchive(archive_root)
+    archive.build_index()
+    return archive.filter_log_events(
+        pattern, dt_start=dt_start, dt_end=dt_end, is_stop_on_match=is_stop_on_match,
+        stop_event=stop_event, log_stream_names=log_stream_names,
+    )
+
+
+# region 倒排索引
+
+def _encode_offsets(offsets: List[int]) -> bytes:
+    """升序偏移差分后存成 array('Q')：相邻命中的差值小，zlib 压缩后每条只占几个字节。"""
+    deltas = array('Q', offsets)
+    for i in range(len(deltas) - 1, 0, -1):
+        deltas[i] -= deltas[i - 1]
+    return deltas.tobytes()
+
+
+def _decode_offsets(data: bytes) -> List[int]:
+    offsets = array('Q')
+    offsets.frombytes(data)
+    for i in range(1, len(offsets)):
+        offsets[i] += offsets[i - 1]
+    return offsets.tolist()
+
+
+class ArchiveTokenIndex:
+    """导出归档上的 token 倒排索引（sidecar 文件与 .cw_archive_index.json 同目录）。"""
+
+    def __init__(self, root: str, archive: Optional[ExportArchive] = None):
+        self.archive = archive if archive is not None else ExportArchive(root)
+        self.index_path = os.path.join(self.archive.root, TOKEN_INDEX_FILE_NAME)
+        self.files: Dict[str, dict] = {}  # 相对路径 -> {'mtime', 'size', 'postings': {token: 差分偏移}}
+        self._token_files: Dict[str, List[str]] = {}  # token -> 含该 token 的文件
+
+    def _load(self) -> Dict[str, dict]:
+        """读取 sidecar 文件；不存在、版本不符或损坏时返回空（全部重建）。"""
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, 'rb') as f:
+                raw = zlib.decompress(f.read())
+            header_bytes, _, blob = raw.partition(b'\n')
+            header = json.loads(header_bytes)
+            if header.get('version') != _TOKEN_INDEX_VERSION:
+                return {}
+            swap = header['byteorder'] != sys.byteorder
+            files: Dict[str, dict] = {}
+            for rel_path, cur in header['files'].items():
+                postings: Dict[str, bytes] = {}
+                for token, (start, length) in cur['postings'].items():
+                    data = blob[start:start + length]
+                    if swap:
+                        deltas = array('Q')
+                        deltas.frombytes(data)
+                        deltas.byteswap()
+                        data = deltas.tobytes()
+                    postings[token] = data
+                files[rel_path] = {'mtime': cur['mtime'], 'size': cur['size'], 'postings': postings}
+            return files
+        except (OSError, ValueError, KeyError, TypeError, zlib.error):
+            return {}
+
+    def _save(self, files: Dict[str, dict]) -> None:
+        """JSON 头 + 换行 + 各 token 差分偏移的原始字节，整体 zlib 压缩后原子替换 sidecar 文件。"""
+        chunks: List[bytes] = []
+        pos = 0
+        header_files: Dict[str, dict] = {}
+        for rel_path, cur in files.items():
+            postings: Dict[str, List[int]] = {}
+            for token, data in cur['postings'].items():
+                postings[token] = [pos, len(data)]
+                chunks.append(data)
+                pos += len(data)
+            header_files[rel_path] = {'mtime': cur['mtime'], 'size': cur['size'], 'postings': postings}
+        header = {'version': _TOKEN_INDEX_VERSION, 'byteorder': sys.byteorder, 'files': header_files}
+        payload = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        tmp_path = f'{self.index_path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(zlib.compress(b'\n'.join([payload, b''.join(chunks)]), _ZLIB_LEVEL))
+        os.replace(tmp_path, self.index_path)
+
+    def _index_file(self, rel_path: str) -> Dict[str, bytes]:
+        postings: Dict[str, List[int]] = {}
+        with gzip.open(os.path.join(self.archive.root, rel_path), 'rb') as fp:
+            for offset, _, raw in _iter_raw_events(fp):
+                for token in extract_tokens(raw.decode('utf-8', errors='replace')):
+                    postings.setdefault(token, []).append(offset)
+        return {token: _encode_offsets(offsets) for token, offsets in postings.items()}
+
+    def build(self) -> Dict[str, dict]:
+        """先更新归档索引，再只为新增或 mtime / size 变化的文件重建倒排表，写回 sidecar 文件。"""
+        archive_files = self.archive.build_index()
+        old = self._load()
+
+        files: Dict[str, dict] = {}
+        changed = False
+        for rel_path, entry in archive_files.items():
+            cur = old.get(rel_path)
+            if cur is None or cur['mtime'] != entry['mtime'] or cur['size'] != entry['size']:
+                cur = {'mtime': entry['mtime'], 'size': entry['size'], 'postings': self._index_file(rel_path)}
+                changed = True
+            files[rel_path] = cur
+        if changed or set(files) != set(old):
+            self._save(files)
+
+        self.files = files
+        self._token_files = {}
+        for rel_path, cur in files.items():
+            for token in cur['postings']:
+                self._token_files.setdefault(token, []).append(rel_path)
+        return files
+
+    def lookup(
+            self, tokens: Iterable[str],
+            dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
+            log_stream_names: Optional[List[str]] = None,
+    ) -> List[dict]:
+        """含任一 token 的事件（FilterLogEventsResp 形状），按 (timestamp, eventId) 升序。"""
+        if not self.files:
+            self.build()
+        start_ms = to_ms(dt_start) if dt_start else 0
+        end_ms = to_ms(dt_end) if dt_end else 2 ** 62
+        streams = set(log_stream_names) if log_stream_names else None
+
+        file_offsets: Dict[str, Set[int]] = {}
+        for token in set(tokens):
+            for rel_path in self._token_files.get(token, []):
+                file_offsets.setdefault(rel_path, set()).update(
+                    _decode_offsets(self.files[rel_path]['postings'][token]))
+
+        events: List[dict] = []
+        for rel_path, offsets in file_offsets.items():
+            entry = self.archive.files[rel_path]
+            if entry['last_ts'] < start_ms or entry['first_ts'] > end_ms:
+                continue
+            if streams is not None and entry['stream'] not in streams:
+                continue
+            with gzip.open(os.path.join(self.archive.root, rel_path), 'rb') as fp:
+                # gzip 向后 seek 要从头解压；解析一条事件要预读到下一条的首行，逐个 seek 会回退。
+                # 从最小偏移起顺序解析到最后一个命中为止，整个文件最多解压一遍
+                remaining = set(offsets)
+                for pos, ts, raw in _iter_raw_events(fp, min(offsets)):
+                    if pos not in remaining:
+                        continue
+                    remaining.discard(pos)
+                    if start_ms <= ts <= end_ms:
+                        events.append(_to_event(rel_path, entry['stream'], pos, ts, raw))
+                    if not remaining:
+                        break
+        events.sort(key=lambda e: (e['timestamp'], e['eventId']))
+        return events
+
+
+def lookup_archive_events(
+        archive_root: str, tokens: Iterable[str],
+        dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
+        log_stream_names: Optional[List[str]] = None,
+) -> List[dict]:
+    """在本地导出归档中按 token 点查事件（必要时先增量更新倒排索引）。
+
+    token 用 cloud_watch_token_index 的 request_token / log_id_token / caller_token / platform_token 构造。
+    """
+    index = ArchiveTokenIndex(archive_root)
+    index.build()
+    return index.lookup(tokens, dt_start=dt_start, dt_end=dt_end, log_stream_names=log_stream_names)
+
+# endregion 倒排索引
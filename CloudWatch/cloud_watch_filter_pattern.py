@@ -0,0 +1,467 @@
+"""CloudWatch Logs filter pattern 的本地求值：把 pattern 编译成 matcher，一次拉取的原始事件可以在本地按多个 pattern 过滤。
+
+支持的写法（与 CloudWatch Logs filter pattern 语法一致）：
+
+非结构化日志：
+- ''                          匹配全部
+- ERROR Exception             所有词都出现（大小写敏感，子串匹配）
+- "Out of memory"             带空格/符号的词用双引号括起来
+- ?ERROR ?WARN                任一词出现
+- ERROR -Exiting              包含 ERROR 且不包含 Exiting
+- %\\[ERROR\\]%                 正则（search 语义），也可以作为一个词与其它词组合
+
+JSON 日志（消息整体必须是 JSON，否则不匹配）：
+- { $.eventType = "UpdateTrail" }          字符串相等，值里的 * 为通配符；不带空格的值可以不加引号
+- { $.latency >= 500 }                     数值比较：= != < > <= >=
+- { $.errorCode = %Unauthorized% }         正则
+- { $.user.id = 1 && $.users[0].name != "bob" }   && / || / 括号，下标与 [*]（任一元素）
+- { $.a IS NULL } / { $.b IS TRUE } / { $.c IS FALSE } / { $.d NOT EXISTS }
+
+空格分隔日志（按空白切分字段，"..." 与 [...] 内的空白不切分，两侧的引号/方括号去掉）：
+- [ip, user, username, timestamp, request = "*html*", status_code = 4*, bytes]
+- [..., status_code = 404 || status_code = 500, bytes > 1000]   ... 匹配任意个字段
+
+compile_filter_pattern 在语法错误时返回 None（调用方回退到服务端过滤）；
+parse_filter_pattern 则抛 FilterPatternError。
+
+一致性用例见 tests/test_cloud_watch_filter_pattern.py。
+"""
+import json
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+Matcher = Callable[[str], bool]
+
+_MISSING = object()
+
+
+class FilterPatternError(ValueError):
+    pass
+
+
+# region 消息预处理
+
+def _split_fields(text: str) -> List[str]:
+    """空格分隔日志的字段切分："..." 与 [...] 内的空白不切分，并去掉两侧的引号/方括号。"""
+    fields: List[str] = []
+    i, n = 0, len(text)
+    while i < n:
+        if text[i].isspace():
+            i += 1
+            continue
+        closer = {'"': '"', '[': ']'}.get(text[i])
+        if closer is not None:
+            end = text.find(closer, i + 1)
+            if end != -1:
+                fields.append(text[i + 1:end])
+                i = end + 1
+                continue
+        j = i
+        while j < n and not text[j].isspace():
+            j += 1
+        fields.append(text[i:j])
+        i = j
+    return fields
+
+
+class _Message:
+    """一条消息及其按需解析的 JSON / 字段，多个 pattern 匹配同一条消息时只解析一次。"""
+    __slots__ = ('text', '_json', '_fields')
+
+    def __init__(self, text: str):
+        self.text = text
+        self._json = _MISSING
+        self._fields: Optional[List[str]] = None
+
+    @property
+    def json(self):
+        """解析后的 JSON 对象/数组；不是 JSON 时为 None。"""
+        if self._json is _MISSING:
+            try:
+                value = json.loads(self.text)
+            except ValueError:
+                value = None
+            self._json = value if isinstance(value, (dict, list)) else None
+        return self._json
+
+    @property
+    def fields(self) -> List[str]:
+        if self._fields is None:
+            self._fields = _split_fields(self.text)
+        return self._fields
+
+# endregion 消息预处理
+
+
+# region 非结构化
+
+def _split_terms(pattern: str) -> List[str]:
+    """按空白切分 pattern，双引号和 %regex% 内的空白不切分。"""
+    terms: List[str] = []
+    buf = ''
+    closer = ''
+    for ch in pattern:
+        if closer:
+            buf += ch
+            if ch == closer:
+                closer = ''
+        elif ch in '"%' and buf in ('', '-', '?'):
+            buf += ch
+            closer = ch
+        elif ch.isspace():
+            if buf:
+                terms.append(buf)
+                buf = ''
+        else:
+            buf += ch
+    if closer:
+        raise FilterPatternError(f'引号或 % 未闭合：{pattern!r}')
+    if buf:
+        terms.append(buf)
+    return terms
+
+
+def _compile_regex(body: str) -> 're.Pattern':
+    try:
+        return re.compile(body)
+    except re.error as e:
+        raise FilterPatternError(f'正则无效：%{body}%（{e}）')
+
+
+def _compile_term(term: str) -> Callable[[_Message], bool]:
+    if len(term) >= 2 and term[0] == term[-1] == '%':
+        regex = _compile_regex(term[1:-1])
+        return lambda msg: regex.search(msg.text) is not None
+    if len(term) >= 2 and term[0] == term[-1] == '"':
+        term = term[1:-1]
+    if not term:
+        raise FilterPatternError('空词')
+    return lambda msg: term in msg.text
+
+
+def _compile_unstructured(pattern: str) -> Callable[[_Message], bool]:
+    any_of: List[Callable[[_Message], bool]] = []
+    all_of: List[Callable[[_Message], bool]] = []
+    none_of: List[Callable[[_Message], bool]] = []
+    for term in _split_terms(pattern):
+        if term.startswith('?') and len(term) > 1:
+            any_of.append(_compile_term(term[1:]))
+        elif term.startswith('-') and len(term) > 1:
+            none_of.append(_compile_term(term[1:]))
+        else:
+            all_of.append(_compile_term(term))
+
+    if any_of and (all_of or none_of):
+        # ?term 与普通词/排除词混用时服务端语义不明确，不在本地猜
+        raise FilterPatternError(f'?词 不能与普通词或 -词 混用：{pattern!r}')
+    if any_of:
+        return lambda msg: any(m(msg) for m in any_of)
+    return lambda msg: all(m(msg) for m in all_of) and not any(m(msg) for m in none_of)
+
+# endregion 非结构化
+
+
+# region JSON / 空格分隔的条件表达式
+
+_TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<op>&&|\|\||!=|<=|>=|=|<|>|\(|\))
+      | (?P<str>"(?:[^"\\]|\\.)*")
+      | (?P<regex>%[^%]*%)
+      | (?P<word>[^\s()=!<>&|"%]+)
+    )''', re.VERBOSE)
+
+_NUMBER_RE = re.compile(r'-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?$')
+_SELECTOR_PART_RE = re.compile(r'\.([^.\[\]]+)|\[(\d+|\*)\]')
+_COMPARE_OPS = {'=', '!=', '<', '>', '<=', '>='}
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens: List[Tuple[str, str]] = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if m is None or m.end() == pos:
+            raise FilterPatternError(f'无法解析：{text[pos:]!r}')
+        kind = m.lastgroup
+        tokens.append((kind, m.group(kind)))
+        pos = m.end()
+    return tokens
+
+
+class _Value:
+    """比较右侧的值：数值、字符串（* 通配）或正则。"""
+
+    def __init__(self, kind: str, raw: str):
+        self.number: Optional[float] = None
+        self.regex: Optional['re.Pattern'] = None
+        self.text: Optional[str] = None
+        if kind == 'regex':
+            self.regex = _compile_regex(raw[1:-1])
+            return
+        if kind == 'str':
+            raw = json.loads(raw)
+        elif _NUMBER_RE.match(raw):
+            self.number = float(raw)
+            return
+        if '*' in raw:
+            self.regex = re.compile('^' + '.*'.join(re.escape(p) for p in raw.split('*')) + '$', re.DOTALL)
+        else:
+            self.text = raw
+
+    def matches_text(self, s: str) -> bool:
+        if self.regex is not None:
+            return self.regex.search(s) is not None
+        return s == self.text
+
+
+def _compare_one(actual: Any, op: str, value: _Value, coerce_numeric: bool) -> bool:
+    if actual is None or isinstance(actual, (bool, dict, list)):
+        return False
+    if value.number is not None:
+        if isinstance(actual, str):
+            if not coerce_numeric or not _NUMBER_RE.match(actual):
+                return op == '!=' and coerce_numeric
+            actual = float(actual)
+        return {
+            '=': actual == value.number, '!=': actual != value.number,
+            '<': actual < value.number, '>': actual > value.number,
+            '<=': actual <= value.number, '>=': actual >= value.number,
+        }[op]
+    if op not in ('=', '!='):
+        raise FilterPatternError(f'字符串/正则只支持 = 和 !=，不支持 {op}')
+    text = actual if isinstance(actual, str) else json.dumps(actual)
+    hit = value.matches_text(text)
+    return hit if op == '=' else not hit
+
+
+Resolver = Callable[[str], List[Any]]
+_Node = Callable[[Resolver], bool]
+
+
+class _ExprParser:
+    """递归下降：expr := and ('||' and)*；and := unary ('&&' unary)*；unary := '(' expr ')' | comparison。"""
+
+    def __init__(self, tokens: List[Tuple[str, str]], is_json: bool):
+        self.tokens = tokens
+        self.pos = 0
+        self.is_json = is_json
+
+    def _peek(self) -> Tuple[str, str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else ('', '')
+
+    def _next(self) -> Tuple[str, str]:
+        tok = self._peek()
+        if not tok[0]:
+            raise FilterPatternError('表达式不完整')
+        self.pos += 1
+        return tok
+
+    def parse(self) -> _Node:
+        node = self._parse_or()
+        if self.pos != len(self.tokens):
+            raise FilterPatternError(f'多余的内容：{self._peek()[1]!r}')
+        return node
+
+    def _parse_or(self) -> _Node:
+        nodes = [self._parse_and()]
+        while self._peek() == ('op', '||'):
+            self._next()
+            nodes.append(self._parse_and())
+        return nodes[0] if len(nodes) == 1 else (lambda r: any(n(r) for n in nodes))
+
+    def _parse_and(self) -> _Node:
+        nodes = [self._parse_unary()]
+        while self._peek() == ('op', '&&'):
+            self._next()
+            nodes.append(self._parse_unary())
+        return nodes[0] if len(nodes) == 1 else (lambda r: all(n(r) for n in nodes))
+
+    def _parse_unary(self) -> _Node:
+        if self._peek() == ('op', '('):
+            self._next()
+            node = self._parse_or()
+            if self._next() != ('op', ')'):
+                raise FilterPatternError('括号未闭合')
+            return node
+        return self._parse_comparison()
+
+    def _parse_comparison(self) -> _Node:
+        kind, selector = self._next()
+        if kind != 'word':
+            raise FilterPatternError(f'期望字段名，实际是 {selector!r}')
+        if self.is_json and not selector.startswith('$'):
+            raise FilterPatternError(f'JSON 字段必须以 $ 开头：{selector!r}')
+
+        kind, op = self._next()
+        if kind == 'word' and op == 'IS':
+            _, what = self._next()
+            expected = {'NULL': None, 'TRUE': True, 'FALSE': False}.get(what, _MISSING)
+            if expected is _MISSING:
+                raise FilterPatternError(f'IS 之后只能是 NULL / TRUE / FALSE：{what!r}')
+            return lambda r: any(v is expected for v in r(selector))
+        if kind == 'word' and op == 'NOT':
+            if self._next() != ('word', 'EXISTS'):
+                raise FilterPatternError('NOT 之后只能是 EXISTS')
+            return lambda r: not r(selector)
+        if kind != 'op' or op not in _COMPARE_OPS:
+            raise FilterPatternError(f'期望比较运算符，实际是 {op!r}')
+
+        value_kind, raw = self._next()
+        if value_kind not in ('word', 'str', 'regex'):
+            raise FilterPatternError(f'期望比较值，实际是 {raw!r}')
+        value = _Value(value_kind, raw)
+        if value.number is None and op not in ('=', '!='):
+            raise FilterPatternError(f'字符串/正则只支持 = 和 !=，不支持 {op}')
+        coerce_numeric = not self.is_json
+        return lambda r: any(_compare_one(v, op, value, coerce_numeric) for v in r(selector))
+
+
+def _resolve_json(doc: Any, selector: str) -> List[Any]:
+    """按 $.a.b[0][*] 取值；[*] 展开为全部元素。取不到时返回空列表。"""
+    values = [doc]
+    for m in _SELECTOR_PART_RE.finditer(selector, 1):
+        key, idx = m.group(1), m.group(2)
+        nxt: List[Any] = []
+        for v in values:
+            if key is not None and isinstance(v, dict) and key in v:
+                nxt.append(v[key])
+            elif idx == '*' and isinstance(v, list):
+                nxt.extend(v)
+            elif idx is not None and idx != '*' and isinstance(v, list) and int(idx) < len(v):
+                nxt.append(v[int(idx)])
+        values = nxt
+    return values
+
+
+def _compile_json(body: str) -> Callable[[_Message], bool]:
+    node = _ExprParser(_tokenize(body), is_json=True).parse()
+    selectors = {s for kind, s in _tokenize(body) if kind == 'word' and s.startswith('$')}
+    for s in selectors:
+        if _SELECTOR_PART_RE.sub('', s[1:]):
+            raise FilterPatternError(f'JSON 字段选择器无效：{s!r}')
+
+    def __match(msg: _Message) -> bool:
+        doc = msg.json
+        if doc is None:
+            return False
+        return node(lambda sel: _resolve_json(doc, sel))
+    return __match
+
+
+def _split_slots(body: str) -> List[str]:
+    """按顶层逗号切分 [a, b = "x,y", ...]，引号和 %regex% 内的逗号不切分。"""
+    slots: List[str] = []
+    buf = ''
+    closer = ''
+    for ch in body:
+        if closer:
+            if ch == closer:
+                closer = ''
+        elif ch in '"%':
+            closer = ch
+        elif ch == ',':
+            slots.append(buf.strip())
+            buf = ''
+            continue
+        buf += ch
+    slots.append(buf.strip())
+    return slots
+
+
+def _compile_space_delimited(body: str) -> Callable[[_Message], bool]:
+    names: List[Optional[str]] = []  # None 表示 ...
+    conditions: List[_Node] = []
+    for slot in _split_slots(body):
+        if slot == '...':
+            names.append(None)
+            continue
+        tokens = _tokenize(slot)
+        if not tokens or tokens[0][0] != 'word':
+            raise FilterPatternError(f'字段定义无效：{slot!r}')
+        names.append(tokens[0][1])
+        if len(tokens) > 1:
+            conditions.append(_ExprParser(tokens, is_json=False).parse())
+
+    def __bindings(fields: List[str], i: int, j: int, bound: Dict[str, str]):
+        """把 names[i:] 对齐到 fields[j:]，逐个产出可行的字段绑定。"""
+        if i == len(names):
+            if j == len(fields):
+                yield bound
+            return
+        if names[i] is None:
+            for k in range(j, len(fields) + 1):
+                yield from __bindings(fields, i + 1, k, bound)
+            return
+        if j < len(fields):
+            yield from __bindings(fields, i + 1, j + 1, {**bound, names[i]: fields[j]})
+
+    def __match(msg: _Message) -> bool:
+        for bound in __bindings(msg.fields, 0, 0, {}):
+            resolver = (lambda b: lambda name: [b[name]] if name in b else [])(bound)
+            if all(cond(resolver) for cond in conditions):
+                return True
+        return False
+    return __match
+
+# endregion JSON / 空格分隔的条件表达式
+
+
+class CompiledPattern:
+    """编译后的 filter pattern，可直接当作 matcher(message) -> bool 调用。"""
+
+    def __init__(self, pattern: str, fn: Callable[[_Message], bool]):
+        self.pattern = pattern
+        self._fn = fn
+
+    def __call__(self, message: str) -> bool:
+        return self._fn(_Message(message))
+
+    def __repr__(self):
+        return f'CompiledPattern({self.pattern!r})'
+
+
+def parse_filter_pattern(pattern: str) -> CompiledPattern:
+    """编译 filter pattern；语法错误或本地不支持的写法抛 FilterPatternError。"""
+    text = pattern.strip()
+    if not text:
+        return CompiledPattern(pattern, lambda msg: True)
+    if text.startswith('{'):
+        if not text.endswith('}'):
+            raise FilterPatternError(f'JSON pattern 缺少结尾的 }}：{pattern!r}')
+        return CompiledPattern(pattern, _compile_json(text[1:-1]))
+    if text.startswith('['):
+        if not text.endswith(']'):
+            raise FilterPatternError(f'空格分隔 pattern 缺少结尾的 ]：{pattern!r}')
+        return CompiledPattern(pattern, _compile_space_delimited(text[1:-1]))
+    return CompiledPattern(pattern, _compile_unstructured(text))
+
+
+def compile_filter_pattern(pattern: str) -> Optional[Matcher]:
+    """把 filter pattern 编译成 matcher(message) -> bool；本地无法求值时返回 None。"""
+    try:
+        return parse_filter_pattern(pattern)
+    except FilterPatternError:
+        return None
+
+
+def filter_events(pattern: str, events: Iterable[dict]) -> List[dict]:
+    """在本地按 pattern 过滤 filter_log_events / get_log_events 返回的事件，保持原顺序。"""
+    matcher = parse_filter_pattern(pattern)
+    return [e for e in events if matcher._fn(_Message(e['message']))]
+
+
+def match_events(patterns: Sequence[str], events: Iterable[dict]) -> Dict[str, List[dict]]:
+    """一次遍历 events，同时匹配多个 pattern，返回 {pattern: 命中事件列表}（各自保持原顺序）。
+
+    每条消息的 JSON / 字段切分只做一次，多个 pattern 共用。
+    """
+    compiled = [parse_filter_pattern(p) for p in dict.fromkeys(patterns)]
+    hits: Dict[str, List[dict]] = {c.pattern: [] for c in compiled}
+    for e in events:
+        msg = _Message(e['message'])
+        for c in compiled:
+            if c._fn(msg):
+                hits[c.pattern].append(e)
+    return hits
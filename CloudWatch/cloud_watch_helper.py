@@ -1,33 +1,61 @@
 import random
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import closing
 
-import boto3
-import boto3.session
 from botocore.exceptions import ClientError
 from datetime import datetime, timedelta
-from typing import Callable, List, Optional, Tuple, Union
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 from CloudWatch.cloud_watch_dataclass import FetchStats, StopReason
+from CloudWatch.cloud_watch_event_cache import EventCache, from_ms, settled_end_ms, to_ms
+from CloudWatch.cloud_watch_filter_pattern import match_events, parse_filter_pattern
+from utils.adaptive_rate_control import is_adaptive_client
 from utils.aws_client_helper import get_aws_profile
+from utils.aws_client_pool import get_env_client
 from utils.aws_consts import AllEnvs, Env
-from utils.proxy_helper import check_proxy
+from utils.rate_limiter import RateLimiter
 
-# CloudWatch Logs API 调用频率控制
-_API_CALL_INTERVAL = 0.2           # 每次 API 调用后的最小间隔（秒），用于主动限速
+# CloudWatch Logs API 调用频率控制，同一次调用链只用其中一种（优先级从高到低）：
+#   1. 调用方传入 limiter（共享令牌桶，如 run_job_pool / filter_log_events_parallel / handle_alert）：
+#      每次调用前 acquire，client 用 get_log_client(..., adaptive=False)，被限流时 _call_with_throttle_retry 指数退避
+#   2. 不传 limiter：默认的自适应 client 在 before-send 钩子里排队，不再固定间隔、被限流时直接重试
+#   3. 不传 limiter 且 client 非自适应（调用方自己传入的 client）：每次调用间隔 _API_CALL_INTERVAL，被限流时指数退避
+_API_CALL_INTERVAL = 0.2           # 每次 API 调用后的最小间隔（秒），仅用于上面第 3 种情况
+
+# FilterLogEvents 默认配额：每账号每 region 5 TPS（跨进程共享限速器以此为预算）
+FILTER_LOG_EVENTS_TPS = 5.0
 
 # 限流重试配置（被动兜底，正常情况下不应触发）
 _THROTTLE_MAX_RETRIES = 6          # 最大重试次数
 _THROTTLE_BASE_DELAY = 1.0         # 基础延迟（秒）
 _THROTTLE_MAX_DELAY = 60.0         # 最大延迟（秒）
 
+# 时间分片并行拉取（filter_log_events_parallel）
+_PARALLEL_DEFAULT_SLICES = 4       # 默认分片数（同时也是默认并发线程数）
+_PARALLEL_STOP_POLL = 0.1          # 主线程轮询外部 stop_event 的间隔（秒）
+
+
+def _sleep_api_interval(client, iterations: int) -> None:
+    """非自适应 client 的固定间隔限速；自适应 client 在 before-send 钩子里排队，这里不再等待。"""
+    if iterations > 0 and _API_CALL_INTERVAL > 0 and not is_adaptive_client(client):
+        time.sleep(_API_CALL_INTERVAL)
+
 
 def _call_with_throttle_retry(api_fn, **kwargs):
-    """调用 AWS API，遇到 ThrottlingException 时指数退避重试。"""
+    """调用 AWS API，遇到 ThrottlingException 时指数退避重试。
+
+    自适应 client 被限流时速率已经下调、令牌清空，下一次发送前钩子会按新速率等待，这里直接重试。
+    """
+    is_adaptive = is_adaptive_client(getattr(api_fn, '__self__', None))
     for attempt in range(_THROTTLE_MAX_RETRIES + 1):
         try:
             return api_fn(**kwargs)
         except ClientError as e:
             if e.response['Error']['Code'] == 'ThrottlingException' and attempt < _THROTTLE_MAX_RETRIES:
+                if is_adaptive:
+                    continue
                 delay = min(_THROTTLE_BASE_DELAY * (2 ** attempt) + random.uniform(0, 1), _THROTTLE_MAX_DELAY)
                 print(f'[Throttled] {api_fn.__name__} attempt {attempt + 1}/{_THROTTLE_MAX_RETRIES}, '
                       f'retrying in {delay:.1f}s ...')
@@ -49,8 +77,7 @@ def describe_log_streams_all(aws_region: str, log_group_name: str, stop_event=No
         if next_tkn:
             kwargs['nextToken'] = next_tkn
 
-        if iterations > 0 and _API_CALL_INTERVAL > 0:
-            time.sleep(_API_CALL_INTERVAL)
+        _sleep_api_interval(client, iterations)
 
         response = _call_with_throttle_retry(
             client.describe_log_streams,
@@ -76,16 +103,21 @@ def get_env_from_log_group_name(log_group_name: str):
     return AllEnvs.get_env_by_name(log_group_name.split('/')[-1].split('--')[0])
 
 
-def get_log_client(rgn: str, env: Env):
-    # 配置 proxy
-    config = None
-    proxy_enable, proxy = check_proxy()
-    if proxy_enable:
-        from botocore.config import Config
-        config = Config(proxies={'http': proxy, 'https': proxy})
+def get_log_account_key(aws_region: str, log_group_name: str) -> Tuple[str, str]:
+    """日志组所属的 (profile, region)，作为按账号 + region 共享限速器的 key。
 
-    session = boto3.session.Session(region_name=rgn, profile_name=get_aws_profile(rgn, env.is_prod_aws))
-    return session.client('logs', config=config)
+    profile 与 AWS 账号一一对应（见 get_aws_profile），CloudWatch 的 TPS 配额按账号 + region 计算。
+    """
+    env = get_env_from_log_group_name(log_group_name)
+    return get_aws_profile(aws_region, env.is_prod_aws), aws_region
+
+
+def get_log_client(rgn: str, env: Env, adaptive: bool = True):
+    """进程内共享的 logs client（走系统代理），重复调用返回同一个 client。
+
+    adaptive=True 时挂自适应限速钩子；调用方自己用共享 RateLimiter 控速时传 False，避免两层限速叠加（见文件头）。
+    """
+    return get_env_client('logs', env, rgn, use_proxy=True, adaptive=adaptive)
 
 
 def filter_log_events(
@@ -95,6 +127,7 @@ def filter_log_events(
         stop_event=None,
         client=None,
         log_stream_names: Optional[List[str]] = None,
+        limiter: Optional[RateLimiter] = None,
         ) -> Tuple[List[dict], FetchStats]:
     """从日志组获取所有
 
@@ -105,63 +138,337 @@ def filter_log_events(
         dt_start (datetime, optional): _description_. Defaults to None.
         dt_end (datetime, optional): _description_. Defaults to None.
         is_stop_on_match (bool, optional): _description_. Defaults to False.
+        limiter (RateLimiter, optional): 共享限速器。传入时每次 API 调用前 acquire，
+            取代固定的 _API_CALL_INTERVAL 间隔；等待可被 stop_event 中断。
 
     Returns:
         Tuple[List[dict], FetchStats]: _description_
     """
-    log_group_name = log_group_name if log_group_name.startswith('/aws/lambda/') else f'/aws/lambda/{log_group_name}'
+    stats = FetchStats()
+    events_all: List[dict] = []
+    for page in iter_filter_log_events(
+            aws_region, log_group_name, pattern,
+            dt_start=dt_start, dt_end=dt_end,
+            is_stop_on_match=is_stop_on_match,
+            stop_event=stop_event,
+            client=client,
+            log_stream_names=log_stream_names,
+            limiter=limiter,
+            stats=stats,
+    ):
+        events_all += page
+    return events_all, stats
+
+
+def iter_filter_log_events(
+        aws_region: str, log_group_name: str, pattern: str = '',
+        dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
+        is_stop_on_match: bool = False,
+        stop_event=None,
+        client=None,
+        log_stream_names: Optional[List[str]] = None,
+        limiter: Optional[RateLimiter] = None,
+        stats: Optional[FetchStats] = None,
+) -> Iterator[List[dict]]:
+    """filter_log_events 的流式版本：每拿到一页非空结果就 yield 该页（升序），不在内存里累积。
+
+    参数语义与 filter_log_events 相同。调用方可随时停止迭代（break / close），
+    此时 stats.stopped_by 记为 CONSUMER_CLOSED。
+
+    Args:
+        stats: 可选的 FetchStats，迭代过程中原地更新（每页一次），供调用方实时读取进度。
+    """
+    log_group_name = get_complete_log_group_name(log_group_name)
     if client is None:
-        env = AllEnvs.get_env_by_name(log_group_name.split('/')[-1].split('--')[0])
-        client = get_log_client(aws_region, env)
+        client = get_log_client(aws_region, get_env_from_log_group_name(log_group_name), adaptive=limiter is None)
+    stats = stats if stats is not None else FetchStats()
+
+    kwargs = dict()
+    if dt_start is not None:
+        kwargs['startTime'] = int(dt_start.timestamp() * 1000)
+    if dt_end is not None:
+        kwargs['endTime'] = int(dt_end.timestamp() * 1000)
+    if pattern:
+        kwargs['filterPattern'] = pattern
+    if log_stream_names:
+        kwargs['logStreamNames'] = log_stream_names
 
     next_tkn = ''
-    events_all: List[dict] = []
-    iterations = 0
-    events_per_iteration: List[int] = []
     t_start = time.perf_counter()
+    try:
+        while True:
+            if next_tkn:
+                kwargs['nextToken'] = next_tkn
+
+            if limiter is not None:
+                if not limiter.acquire(cancel=stop_event):
+                    stats.stopped_by = StopReason.STOP_EVENT
+                    break
+            else:
+                _sleep_api_interval(client, stats.iterations)
+
+            response = _call_with_throttle_retry(
+                client.filter_log_events,
+                logGroupName=log_group_name,
+                **kwargs
+            )
+            events, next_tkn = response['events'], response.get('nextToken', '')
+            stats.record_iteration(t_start, len(events))
+            if events:
+                yield events
+
+            if is_stop_on_match and events:
+                stats.stopped_by = StopReason.MATCH_FOUND
+                break
+            if not next_tkn:
+                stats.stopped_by = StopReason.TOKEN_EXHAUSTED
+                break
+            if stop_event is not None and stop_event.is_set():
+                stats.stopped_by = StopReason.STOP_EVENT
+                break
+    except GeneratorExit:
+        stats.stopped_by = StopReason.CONSUMER_CLOSED
+        raise
+    finally:
+        stats.update_duration(t_start)
 
-    while True:
-        kwargs = dict()
-        if dt_start is not None:
-            kwargs['startTime'] = int(dt_start.timestamp() * 1000)
-        if dt_end is not None:
-            kwargs['endTime'] = int(dt_end.timestamp() * 1000)
-        if pattern:
-            kwargs['filterPattern'] = pattern
-        if log_stream_names:
-            kwargs['logStreamNames'] = log_stream_names
-        if next_tkn:
-            kwargs['nextToken'] = next_tkn
 
-        if iterations > 0 and _API_CALL_INTERVAL > 0:
-            time.sleep(_API_CALL_INTERVAL)
+def filter_log_events_cached(
+        aws_region: str, log_group_name: str, pattern: str = '',
+        dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
+        stop_event=None,
+        client=None,
+        log_stream_names: Optional[List[str]] = None,
+        limiter: Optional[RateLimiter] = None,
+        cache: Optional[EventCache] = None,
+) -> Tuple[List[dict], FetchStats]:
+    """带本地缓存的 filter_log_events：只向 CloudWatch 请求缓存未覆盖的空档，其余从本地读取并在本地按 pattern 过滤。
+
+    返回值与 filter_log_events 一致（升序）。stats.iterations 只统计实际的 API 调用，全部命中缓存时为 0。
+    dt_start / dt_end 任一为 None 时无法界定覆盖区间，直接走 filter_log_events。
+    指定 log_stream_names 时拉到的数据不代表整个日志组，只保存事件、不记覆盖。
+    拉取被 stop_event 中断时返回已有的部分结果，stats.stopped_by=STOP_EVENT。
 
-        response = _call_with_throttle_retry(
-            client.filter_log_events,
-            logGroupName=log_group_name,
-            **kwargs
+    Args:
+        cache: EventCache 实例，None 时使用默认缓存文件
+    """
+    if dt_start is None or dt_end is None:
+        return filter_log_events(
+            aws_region, log_group_name, pattern,
+            dt_start=dt_start, dt_end=dt_end,
+            stop_event=stop_event,
+            client=client,
+            log_stream_names=log_stream_names,
+            limiter=limiter,
         )
-        events, next_tkn = response['events'], response.get('nextToken', '')
-        iterations += 1
-        events_per_iteration.append(len(events))
-        events_all += events
 
-        if is_stop_on_match and events:
-            stopped_by = StopReason.MATCH_FOUND
-            break
-        if not next_tkn:
-            stopped_by = StopReason.TOKEN_EXHAUSTED
+    log_group_name = get_complete_log_group_name(log_group_name)
+    cache = cache if cache is not None else EventCache()
+    start_ms, end_ms = to_ms(dt_start), to_ms(dt_end)
+    stats = FetchStats(stopped_by=StopReason.TOKEN_EXHAUSTED)
+    t_start = time.perf_counter()
+
+    gaps = cache.missing_intervals(aws_region, log_group_name, pattern, start_ms, end_ms)
+    if gaps and client is None:
+        client = get_log_client(aws_region, get_env_from_log_group_name(log_group_name), adaptive=limiter is None)
+    for gap_start, gap_end in gaps:
+        gap_stats = FetchStats()
+        for page in iter_filter_log_events(
+                aws_region, log_group_name, pattern,
+                dt_start=from_ms(gap_start), dt_end=from_ms(gap_end),
+                stop_event=stop_event,
+                client=client,
+                log_stream_names=log_stream_names,
+                limiter=limiter,
+                stats=gap_stats,
+        ):
+            cache.store_events(aws_region, log_group_name, pattern, page)
+        stats.iterations += gap_stats.iterations
+        stats.events_per_iteration.extend(gap_stats.events_per_iteration)
+        if gap_stats.stopped_by != StopReason.TOKEN_EXHAUSTED:
+            stats.stopped_by = gap_stats.stopped_by
             break
-        if stop_event is not None and stop_event.is_set():
-            stopped_by = StopReason.STOP_EVENT
+        if not log_stream_names:
+            cache.mark_covered(aws_region, log_group_name, pattern, gap_start, settled_end_ms(gap_end))
+
+    events = cache.query_events(aws_region, log_group_name, pattern, start_ms, end_ms, log_stream_names)
+    stats.total_events = len(events)
+    stats.update_duration(t_start)
+    return events, stats
+
+
+def filter_log_events_multi(
+        aws_region: str, log_group_name: str, patterns: Sequence[str],
+        dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
+        stop_event=None,
+        client=None,
+        log_stream_names: Optional[List[str]] = None,
+        limiter: Optional[RateLimiter] = None,
+        scan_pattern: str = '',
+) -> Tuple[Dict[str, List[dict]], FetchStats]:
+    """一次扫描同时回答多个 pattern：按 scan_pattern 拉一遍（默认不过滤），在本地逐页按各 pattern 匹配。
+
+    与对每个 pattern 各调一次 filter_log_events 相比，同一窗口只扫描一次，API 调用次数与 pattern 数量无关。
+    scan_pattern 用于在服务端先粗筛（如 '?ERROR ?RequestId'），各 pattern 的命中必须是它的子集。
+
+    Returns:
+        ({pattern: 命中事件（升序）}, 扫描的 FetchStats)
+    Raises:
+        FilterPatternError: 某个 pattern 无法在本地求值（在发起任何 API 调用之前）
+    """
+    for p in patterns:
+        parse_filter_pattern(p)
+
+    stats = FetchStats()
+    hits: Dict[str, List[dict]] = {p: [] for p in patterns}
+    for page in iter_filter_log_events(
+            aws_region, log_group_name, scan_pattern,
+            dt_start=dt_start, dt_end=dt_end,
+            stop_event=stop_event,
+            client=client,
+            log_stream_names=log_stream_names,
+            limiter=limiter,
+            stats=stats,
+    ):
+        for p, events in match_events(patterns, page).items():
+            hits[p] += events
+    return hits, stats
+
+
+def filter_log_events_parallel(
+        aws_region: str, log_group_name: str, pattern: str = '',
+        dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
+        is_stop_on_match: bool = False,
+        stop_event=None,
+        client=None,
+        log_stream_names: Optional[List[str]] = None,
+        slices: int = _PARALLEL_DEFAULT_SLICES,
+        limiter: Optional[RateLimiter] = None,
+) -> Tuple[List[dict], FetchStats]:
+    """时间分片并行拉取：把 [dt_start, dt_end) 等分成 `slices` 段，各段独立走 nextToken 链并发拉取，
+    结果按段顺序拼接（段内本身升序），返回值与 filter_log_events 一致。
+
+    所有分段共享同一个 RateLimiter，总 TPS 不超过限速器速率（默认 RateLimiter.for_cloudwatch()）。
+    boto3 client 线程安全，各段复用同一个 client。
+
+    Args:
+        aws_region: AWS 区域
+        log_group_name: 日志组名称
+        pattern: CloudWatch Filter Pattern
+        dt_start: 起始时间（UTC）。与 dt_end 任一为 None 时无法分片，退化为 filter_log_events。
+        dt_end: 结束时间（UTC）
+        is_stop_on_match: 命中即停。返回最早一个有命中的分段的第一批结果；
+            某段命中后，比它晚的分段会被取消。
+        stop_event: 外部取消信号
+        client: 复用的 boto3 logs client
+        log_stream_names: 限定的 log stream 列表
+        slices: 分段数，同时也是并发线程数
+        limiter: 共享限速器，None 时使用 RateLimiter.for_cloudwatch()
+    """
+    log_group_name = get_complete_log_group_name(log_group_name)
+    if client is None:
+        client = get_log_client(aws_region, get_env_from_log_group_name(log_group_name), adaptive=False)
+    if limiter is None:
+        limiter = RateLimiter.for_cloudwatch()
+
+    if dt_start is None or dt_end is None or slices <= 1:
+        return filter_log_events(
+            aws_region, log_group_name, pattern,
+            dt_start=dt_start, dt_end=dt_end,
+            is_stop_on_match=is_stop_on_match,
+            stop_event=stop_event,
+            client=client,
+            log_stream_names=log_stream_names,
+            limiter=limiter,
+        )
+
+    t_start = time.perf_counter()
+    bounds = split_time_range(dt_start, dt_end, slices)
+    # 每段一个取消开关：外部 stop_event 会扇出到所有段；某段命中时只取消比它晚的段
+    seg_stops = [threading.Event() for _ in bounds]
+
+    def __fetch_segment(idx: int) -> Tuple[List[dict], FetchStats]:
+        seg_start, seg_end = bounds[idx]
+        return filter_log_events(
+            aws_region, log_group_name, pattern,
+            dt_start=seg_start, dt_end=seg_end,
+            is_stop_on_match=is_stop_on_match,
+            stop_event=seg_stops[idx],
+            client=client,
+            log_stream_names=log_stream_names,
+            limiter=limiter,
+        )
+
+    results: List[Optional[Tuple[List[dict], FetchStats]]] = [None] * len(bounds)
+    is_stopped_externally = False
+    with ThreadPoolExecutor(max_workers=len(bounds), thread_name_prefix='cw-slice') as executor:
+        futures = {executor.submit(__fetch_segment, i): i for i in range(len(bounds))}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=_PARALLEL_STOP_POLL, return_when=FIRST_COMPLETED)
+            for f in done:
+                idx = futures[f]
+                results[idx] = f.result()
+                if is_stop_on_match and results[idx][0]:
+                    for later in seg_stops[idx + 1:]:
+                        later.set()
+            if stop_event is not None and stop_event.is_set() and not is_stopped_externally:
+                is_stopped_externally = True
+                for seg_stop in seg_stops:
+                    seg_stop.set()
+
+    # 被更早分段的命中取消的段：结果不完整也不需要
+    skipped = [
+        seg_stops[idx].is_set() and seg_stats.stopped_by == StopReason.STOP_EVENT and not is_stopped_externally
+        for idx, (_, seg_stats) in enumerate(results)
+    ]
+    return merge_time_slices(bounds, results, skipped, is_stop_on_match, is_stopped_externally, t_start)
+
+
+def merge_time_slices(
+        bounds: List[Tuple[datetime, datetime]],
+        results: List[Tuple[List[dict], FetchStats]],
+        skipped: List[bool],
+        is_stop_on_match: bool,
+        is_stopped_externally: bool,
+        t_start: float,
+) -> Tuple[List[dict], FetchStats]:
+    """把按时间分段并发拉取的结果按段顺序拼接成一个升序列表，并汇总 FetchStats。
+
+    Args:
+        bounds: split_time_range 的分段边界
+        results: 与 bounds 一一对应的 (段内事件, 段 FetchStats)
+        skipped: 与 bounds 一一对应，True 表示该段结果不采用（如被更早分段的命中取消）
+        is_stop_on_match: 命中即停：只保留第一个有命中的段
+        is_stopped_externally: 是否被外部取消，决定 stopped_by
+        t_start: 整体开始时间（time.perf_counter()）
+    """
+    # API 调用统计覆盖所有分段（包括被取消 / 未采用的分段）
+    total_iterations = sum(seg_stats.iterations for _, seg_stats in results)
+    events_per_iteration: List[int] = [n for _, seg_stats in results for n in seg_stats.events_per_iteration]
+
+    events_all: List[dict] = []
+    stopped_by = StopReason.STOP_EVENT if is_stopped_externally else StopReason.COMPLETED
+    # 相邻分段共享边界毫秒（startTime / endTime 都是闭区间），用 eventId 去重
+    prev_boundary_ids: set = set()
+    for idx, (seg_events, _) in enumerate(results):
+        if skipped[idx]:
+            continue
+        if prev_boundary_ids:
+            seg_events = [e for e in seg_events if e.get('eventId') not in prev_boundary_ids]
+        events_all.extend(seg_events)
+        if is_stop_on_match and seg_events:
+            stopped_by = StopReason.MATCH_FOUND
             break
+        boundary_ms = int(bounds[idx][1].timestamp() * 1000)
+        prev_boundary_ids = {e.get('eventId') for e in seg_events if e['timestamp'] >= boundary_ms}
 
     total_duration_ms = round((time.perf_counter() - t_start) * 1000, 2)
     stats = FetchStats(
-        iterations=iterations,
+        iterations=total_iterations,
         total_events=len(events_all),
         total_duration_ms=total_duration_ms,
-        avg_iteration_ms=round(total_duration_ms / iterations, 2) if iterations > 0 else 0.0,
+        avg_iteration_ms=round(total_duration_ms / total_iterations, 2) if total_iterations > 0 else 0.0,
         events_per_iteration=events_per_iteration,
         stopped_by=stopped_by,
     )
@@ -169,6 +476,24 @@ def filter_log_events(
     return events_all, stats
 
 
+def split_time_range(dt_start: datetime, dt_end: datetime, slices: int) -> List[Tuple[datetime, datetime]]:
+    """把 [dt_start, dt_end) 等分为最多 `slices` 段，按时间升序返回 [(seg_start, seg_end), ...]。
+
+    分段粒度不小于 1 秒，时间范围过短时分段数会相应减少。
+    """
+    total = dt_end - dt_start
+    if total <= timedelta(0):
+        return [(dt_start, dt_end)]
+    slices = max(1, min(slices, int(total.total_seconds())))
+    step = total / slices
+    bounds = []
+    for i in range(slices):
+        seg_start = dt_start + step * i
+        seg_end = dt_end if i == slices - 1 else dt_start + step * (i + 1)
+        bounds.append((seg_start, seg_end))
+    return bounds
+
+
 def filter_log_events_descending(
         aws_region: str, log_group_name: str, pattern: str = '',
         dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
@@ -177,6 +502,7 @@ def filter_log_events_descending(
         client=None,
         segment_duration: timedelta = timedelta(hours=1),
         on_receive_batch: Optional[Callable[[List[dict]], bool]] = None,
+        limiter: Optional[RateLimiter] = None,
 ) -> Tuple[List[dict], FetchStats]:
     """倒序获取日志：将时间范围从后往前分段，每段调用 filter_log_events 正序拉取后反转。
 
@@ -194,62 +520,104 @@ def filter_log_events_descending(
             （已按降序排列）**传入此函数。回调可用于收集、过滤、统计、打印进度等。
             签名: (seg_events_desc: List[dict]) -> bool
             返回 True 表示应当停止搜索。
+        limiter: 共享限速器，语义同 filter_log_events
     """
-    log_group_name = log_group_name if log_group_name.startswith('/aws/lambda/') else f'/aws/lambda/{log_group_name}'
-    if client is None:
-        env = AllEnvs.get_env_by_name(log_group_name.split('/')[-1].split('--')[0])
-        client = get_log_client(aws_region, env)
-
+    stats = FetchStats()
     events_all: List[dict] = []
-    total_iterations = 0
-    events_per_iteration: List[int] = []
-    t_start = time.perf_counter()
-    stopped_by = StopReason.COMPLETED
-
-    seg_end = dt_end
-    while seg_end > dt_start:
-        seg_start = max(seg_end - segment_duration, dt_start)
-        seg_events, seg_stats = filter_log_events(
+    stopped_by: Optional[StopReason] = None
+    with closing(iter_filter_log_events_descending(
             aws_region, log_group_name, pattern,
-            dt_start=seg_start, dt_end=seg_end,
-            is_stop_on_match=False,  # 段内需要拉完才能拿到最新的匹配
+            dt_start=dt_start, dt_end=dt_end,
             stop_event=stop_event,
             client=client,
-        )
-        total_iterations += seg_stats.iterations
-        events_per_iteration.extend(seg_stats.events_per_iteration)
+            segment_duration=segment_duration,
+            limiter=limiter,
+            stats=stats,
+    )) as seg_iter:
+        for seg_events in seg_iter:
+            events_all.extend(seg_events)
+
+            if on_receive_batch is not None:
+                # 自定义回调优先于 is_stop_on_match
+                if on_receive_batch(seg_events):
+                    stopped_by = StopReason.ON_RECEIVE_BATCH
+                    break
+            elif is_stop_on_match:
+                # 段内最后一条（反转后的第一条）就是该段中最新的匹配
+                events_all = [events_all[0]]
+                stopped_by = StopReason.MATCH_FOUND
+                break
 
-        seg_events.reverse()  # 段内反转为降序
-        events_all.extend(seg_events)
+    if stopped_by is not None:
+        stats.stopped_by = stopped_by
+    stats.total_events = len(events_all)
+    return events_all, stats
 
-        if on_receive_batch is not None:
-            # 自定义回调优先于 is_stop_on_match
-            if seg_events and on_receive_batch(seg_events):
-                stopped_by = StopReason.ON_RECEIVE_BATCH
-                break
-        elif is_stop_on_match and seg_events:
-            # 段内最后一条（反转后的第一条）就是该段中最新的匹配
-            events_all = [events_all[0]]
-            stopped_by = StopReason.MATCH_FOUND
-            break
 
-        if stop_event is not None and stop_event.is_set():
-            stopped_by = StopReason.STOP_EVENT
-            break
+def iter_filter_log_events_descending(
+        aws_region: str, log_group_name: str, pattern: str = '',
+        dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
+        stop_event=None,
+        client=None,
+        segment_duration: timedelta = timedelta(hours=1),
+        limiter: Optional[RateLimiter] = None,
+        stats: Optional[FetchStats] = None,
+) -> Iterator[List[dict]]:
+    """filter_log_events_descending 的流式版本：从后往前逐段拉取，每段拉完后 yield 该段事件（降序）。
 
-        seg_end = seg_start
+    只 yield 非空的段，内存占用上限为单段事件量。调用方停止迭代即提前结束（stopped_by=CONSUMER_CLOSED）。
 
-    total_duration_ms = round((time.perf_counter() - t_start) * 1000, 2)
-    stats = FetchStats(
-        iterations=total_iterations,
-        total_events=len(events_all),
-        total_duration_ms=total_duration_ms,
-        avg_iteration_ms=round(total_duration_ms / total_iterations, 2) if total_iterations > 0 else 0.0,
-        events_per_iteration=events_per_iteration,
-        stopped_by=stopped_by,
-    )
+    Args:
+        stats: 可选的 FetchStats，每段拉完后原地更新。
+    """
+    log_group_name = get_complete_log_group_name(log_group_name)
+    if client is None:
+        client = get_log_client(aws_region, get_env_from_log_group_name(log_group_name), adaptive=limiter is None)
+    stats = stats if stats is not None else FetchStats()
 
-    return events_all, stats
+    t_start = time.perf_counter()
+    stats.stopped_by = StopReason.COMPLETED
+    try:
+        # 相邻段共享边界毫秒（startTime / endTime 都是闭区间），用 eventId 去重
+        boundary_ids: set = set()
+        seg_end = dt_end
+        while seg_end > dt_start:
+            seg_start = max(seg_end - segment_duration, dt_start)
+            seg_stats = FetchStats()
+            seg_events: List[dict] = []
+            for page in iter_filter_log_events(
+                    aws_region, log_group_name, pattern,
+                    dt_start=seg_start, dt_end=seg_end,
+                    is_stop_on_match=False,  # 段内需要拉完才能拿到最新的匹配
+                    stop_event=stop_event,
+                    client=client,
+                    limiter=limiter,
+                    stats=seg_stats,
+            ):
+                seg_events += page
+            stats.iterations += seg_stats.iterations
+            stats.total_events += seg_stats.total_events
+            stats.events_per_iteration.extend(seg_stats.events_per_iteration)
+            stats.update_duration(t_start)
+
+            if boundary_ids:
+                seg_events = [e for e in seg_events if e.get('eventId') not in boundary_ids]
+            seg_start_ms = int(seg_start.timestamp() * 1000)
+            boundary_ids = {e.get('eventId') for e in seg_events if e['timestamp'] <= seg_start_ms}
+            if seg_events:
+                seg_events.reverse()  # 段内反转为降序
+                yield seg_events
+
+            if stop_event is not None and stop_event.is_set():
+                stats.stopped_by = StopReason.STOP_EVENT
+                break
+
+            seg_end = seg_start
+    except GeneratorExit:
+        stats.stopped_by = StopReason.CONSUMER_CLOSED
+        raise
+    finally:
+        stats.update_duration(t_start)
 
 
 def get_log_events(
@@ -262,63 +630,85 @@ def get_log_events(
         startFromHead: bool = False,
         stop_event=None,
 ) -> Tuple[List[dict], FetchStats]:
+    stats = FetchStats()
+    events_all: List[dict] = []
+    for page in iter_get_log_events(
+            client, logStreamName,
+            logGroupName=logGroupName,
+            startTime=startTime,
+            endTime=endTime,
+            limit=limit,
+            startFromHead=startFromHead,
+            stop_event=stop_event,
+            stats=stats,
+    ):
+        events_all += page
+    return events_all, stats
+
+
+def iter_get_log_events(
+        client,
+        logStreamName,
+        logGroupName: Optional[str] = None,
+        startTime: Optional[Union[int, datetime]] = None,
+        endTime: Optional[Union[int, datetime]] = None,
+        limit: Optional[int] = None,
+        startFromHead: bool = False,
+        stop_event=None,
+        stats: Optional[FetchStats] = None,
+) -> Iterator[List[dict]]:
+    """get_log_events 的流式版本：每拿到一页就 yield 该页，调用方可随时停止迭代。
+
+    Args:
+        stats: 可选的 FetchStats，每次 API 调用后原地更新。
+    """
     if isinstance(startTime, datetime):
         startTime = int(startTime.timestamp() * 1000)
     if isinstance(endTime, datetime):
         endTime = int(endTime.timestamp() * 1000)
+    stats = stats if stats is not None else FetchStats()
+
+    kwargs = {}
+    if logGroupName is not None:
+        kwargs['logGroupName'] = logGroupName
+    if startTime is not None:
+        kwargs['startTime'] = startTime
+    if endTime is not None:
+        kwargs['endTime'] = endTime
+    if limit is not None:
+        kwargs['limit'] = limit
+    if startFromHead:
+        kwargs['startFromHead'] = True
 
     next_tkn = ''
-    events_all: List[dict] = []
-    iterations = 0
-    events_per_iteration: List[int] = []
     t_start = time.perf_counter()
+    try:
+        while True:
+            if next_tkn:
+                kwargs['nextToken'] = next_tkn
 
-    while True:
-        kwargs = {}
-        if logGroupName is not None:
-            kwargs['logGroupName'] = logGroupName
-        if startTime is not None:
-            kwargs['startTime'] = startTime
-        if endTime is not None:
-            kwargs['endTime'] = endTime
-        if next_tkn:
-            kwargs['nextToken'] = next_tkn
-        if limit is not None:
-            kwargs['limit'] = limit
-        if startFromHead:
-            kwargs['startFromHead'] = True
-
-        if iterations > 0 and _API_CALL_INTERVAL > 0:
-            time.sleep(_API_CALL_INTERVAL)
+            _sleep_api_interval(client, stats.iterations)
 
-        response = _call_with_throttle_retry(client.get_log_events, logStreamName=logStreamName, **kwargs)
-        events = response['events']
-        iterations += 1
-        events_per_iteration.append(len(events))
-
-        if not events:
-            stopped_by = StopReason.EMPTY_RESPONSE
-            break
-        events_all += events
+            response = _call_with_throttle_retry(client.get_log_events, logStreamName=logStreamName, **kwargs)
+            events = response['events']
+            stats.record_iteration(t_start, len(events))
 
-        next_tkn_curr = response['nextForwardToken'] if startFromHead else response['nextBackwardToken']
-        if next_tkn_curr == next_tkn:
-            stopped_by = StopReason.TOKEN_EXHAUSTED
-            break
-        next_tkn = next_tkn_curr
-
-        if stop_event is not None and stop_event.is_set():
-            stopped_by = StopReason.STOP_EVENT
-            break
+            if not events:
+                stats.stopped_by = StopReason.EMPTY_RESPONSE
+                break
+            yield events
 
-    total_duration_ms = round((time.perf_counter() - t_start) * 1000, 2)
-    stats = FetchStats(
-        iterations=iterations,
-        total_events=len(events_all),
-        total_duration_ms=total_duration_ms,
-        avg_iteration_ms=round(total_duration_ms / iterations, 2) if iterations > 0 else 0.0,
-        events_per_iteration=events_per_iteration,
-        stopped_by=stopped_by,
-    )
+            next_tkn_curr = response['nextForwardToken'] if startFromHead else response['nextBackwardToken']
+            if next_tkn_curr == next_tkn:
+                stats.stopped_by = StopReason.TOKEN_EXHAUSTED
+                break
+            next_tkn = next_tkn_curr
 
-    return events_all, stats
+            if stop_event is not None and stop_event.is_set():
+                stats.stopped_by = StopReason.STOP_EVENT
+                break
+    except GeneratorExit:
+        stats.stopped_by = StopReason.CONSUMER_CLOSED
+        raise
+    finally:
+        stats.update_duration(t_start)
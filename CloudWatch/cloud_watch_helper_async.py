@@ -0,0 +1,493 @@
+"""cloud_watch_helper 的 aiobotocore 异步版本。
+
+函数与同步版一一对应（filter_log_events / filter_log_events_descending / get_log_events /
+describe_log_streams_all），返回值形状相同，额外支持：
+    - limiter:   AsyncRateLimiter，同一事件循环内所有协程共享 TPS 预算（取代固定 sleep）
+    - semaphore: asyncio.Semaphore，限制同一 client 上的在途请求数（连接池大小）
+    - stop_event: 协作式取消（asyncio.Event / threading.Event 均可），每页之间及限速等待中检查；
+                  直接 task.cancel() 也能立即中断
+
+用法：
+    async with open_log_client_async(region, env) as client:
+        limiter = AsyncRateLimiter.for_cloudwatch()
+        results = await asyncio.gather(*(
+            get_log_events_async(client, stream, log_group, limiter=limiter) for stream in streams
+        ))
+"""
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, List, Optional, Tuple, Union
+
+from botocore.client import Config as BotoConfig
+from botocore.exceptions import ClientError
+
+from CloudWatch.cloud_watch_dataclass import FetchStats, StopReason
+from CloudWatch.cloud_watch_helper import (
+    _THROTTLE_BASE_DELAY, _THROTTLE_MAX_DELAY, _THROTTLE_MAX_RETRIES,
+    get_complete_log_group_name, get_env_from_log_group_name, merge_time_slices, split_time_range,
+)
+from utils.aws_aiosession_helper import get_cached_aiosession
+from utils.aws_consts import Env
+from utils.proxy_helper import check_proxy
+from utils.rate_limiter import AsyncRateLimiter
+
+# 未传 limiter 时每次 API 调用后的最小间隔（秒），与同步版 _API_CALL_INTERVAL 一致
+_API_CALL_INTERVAL = 0.2
+
+# 单个 logs client 的连接池大小（同时也是建议的 semaphore 上限）
+MAX_POOL_CONNECTIONS = 50
+
+_PARALLEL_DEFAULT_SLICES = 4
+
+
+@asynccontextmanager
+async def open_log_client_async(rgn: str, env: Env):
+    """创建 aiobotocore logs client（async with 作用域内复用同一个连接池）。"""
+    proxy_enable, proxy = check_proxy()
+    config = BotoConfig(
+        connect_timeout=3, retries={'mode': 'standard'}, max_pool_connections=MAX_POOL_CONNECTIONS,
+        proxies={'http': proxy, 'https': proxy} if proxy_enable else None,
+    )
+    session = get_cached_aiosession(region=rgn, is_prod=env.is_prod_aws)
+    async with session.create_client('logs', region_name=rgn, config=config) as client:
+        yield client
+
+
+@asynccontextmanager
+async def _client_scope(client, aws_region: str, log_group_name: str):
+    """传入了 client 就直接用；否则临时创建一个，用完关闭。"""
+    if client is not None:
+        yield client
+        return
+    async with open_log_client_async(aws_region, get_env_from_log_group_name(log_group_name)) as new_client:
+        yield new_client
+
+
+async def _call_with_throttle_retry_async(api_fn, semaphore: Optional[asyncio.Semaphore] = None, **kwargs):
+    """异步调用 AWS API，遇到 ThrottlingException 时指数退避重试（退避期间不占 semaphore）。"""
+    for attempt in range(_THROTTLE_MAX_RETRIES + 1):
+        try:
+            if semaphore is None:
+                return await api_fn(**kwargs)
+            async with semaphore:
+                return await api_fn(**kwargs)
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ThrottlingException' and attempt < _THROTTLE_MAX_RETRIES:
+                delay = min(_THROTTLE_BASE_DELAY * (2 ** attempt) + random.uniform(0, 1), _THROTTLE_MAX_DELAY)
+                print(f'[Throttled] {getattr(api_fn, "__name__", api_fn)} attempt {attempt + 1}/{_THROTTLE_MAX_RETRIES}, '
+                      f'retrying in {delay:.1f}s ...')
+                await asyncio.sleep(delay)
+            else:
+                raise
+
+
+async def _pace(limiter: Optional[AsyncRateLimiter], iterations: int, stop_event) -> bool:
+    """API 调用前的限速：有 limiter 走令牌桶，否则按固定间隔。返回 False 表示被取消。"""
+    if limiter is not None:
+        return await limiter.acquire(cancel=stop_event)
+    if iterations > 0 and _API_CALL_INTERVAL > 0:
+        await asyncio.sleep(_API_CALL_INTERVAL)
+    return True
+
+
+async def describe_log_streams_all_async(
+        aws_region: str, log_group_name: str,
+        stop_event=None,
+        client=None,
+        limiter: Optional[AsyncRateLimiter] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+) -> List[dict]:
+    log_group_name = get_complete_log_group_name(log_group_name)
+    async with _client_scope(client, aws_region, log_group_name) as client:
+        log_stream_all = []
+        next_tkn = ''
+        iterations = 0
+        while True:
+            kwargs = dict()
+            if next_tkn:
+                kwargs['nextToken'] = next_tkn
+
+            if not await _pace(limiter, iterations, stop_event):
+                break
+
+            response = await _call_with_throttle_retry_async(
+                client.describe_log_streams, semaphore,
+                logGroupName=log_group_name,
+                **kwargs
+            )
+            iterations += 1
+            log_streams, next_tkn = response['logStreams'], response.get('nextToken', '')
+            log_stream_all += log_streams
+
+            if not next_tkn:
+                break
+            if stop_event is not None and stop_event.is_set():
+                break
+        return log_stream_all
+
+
+async def iter_filter_log_events_async(
+        aws_region: str, log_group_name: str, pattern: str = '',
+        dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
+        is_stop_on_match: bool = False,
+        stop_event=None,
+        client=None,
+        log_stream_names: Optional[List[str]] = None,
+        limiter: Optional[AsyncRateLimiter] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        stats: Optional[FetchStats] = None,
+) -> AsyncIterator[List[dict]]:
+    """iter_filter_log_events 的异步版本：逐页 yield 非空结果（升序），stats 原地更新。"""
+    log_group_name = get_complete_log_group_name(log_group_name)
+    stats = stats if stats is not None else FetchStats()
+
+    kwargs = dict()
+    if dt_start is not None:
+        kwargs['startTime'] = int(dt_start.timestamp() * 1000)
+    if dt_end is not None:
+        kwargs['endTime'] = int(dt_end.timestamp() * 1000)
+    if pattern:
+        kwargs['filterPattern'] = pattern
+    if log_stream_names:
+        kwargs['logStreamNames'] = log_stream_names
+
+    next_tkn = ''
+    t_start = time.perf_counter()
+    async with _client_scope(client, aws_region, log_group_name) as client:
+        try:
+            while True:
+                if next_tkn:
+                    kwargs['nextToken'] = next_tkn
+
+                if not await _pace(limiter, stats.iterations, stop_event):
+                    stats.stopped_by = StopReason.STOP_EVENT
+                    break
+
+                response = await _call_with_throttle_retry_async(
+                    client.filter_log_events, semaphore,
+                    logGroupName=log_group_name,
+                    **kwargs
+                )
+                events, next_tkn = response['events'], response.get('nextToken', '')
+                stats.record_iteration(t_start, len(events))
+                if events:
+                    yield events
+
+                if is_stop_on_match and events:
+                    stats.stopped_by = StopReason.MATCH_FOUND
+                    break
+                if not next_tkn:
+                    stats.stopped_by = StopReason.TOKEN_EXHAUSTED
+                    break
+                if stop_event is not None and stop_event.is_set():
+                    stats.stopped_by = StopReason.STOP_EVENT
+                    break
+        except GeneratorExit:
+            stats.stopped_by = StopReason.CONSUMER_CLOSED
+            raise
+        finally:
+            stats.update_duration(t_start)
+
+
+async def filter_log_events_async(
+        aws_region: str, log_group_name: str, pattern: str = '',
+        dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
+        is_stop_on_match: bool = False,
+        stop_event=None,
+        client=None,
+        log_stream_names: Optional[List[str]] = None,
+        limiter: Optional[AsyncRateLimiter] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+) -> Tuple[List[dict], FetchStats]:
+    """filter_log_events 的异步版本，参数语义相同。"""
+    stats = FetchStats()
+    events_all: List[dict] = []
+    async for page in iter_filter_log_events_async(
+            aws_region, log_group_name, pattern,
+            dt_start=dt_start, dt_end=dt_end,
+            is_stop_on_match=is_stop_on_match,
+            stop_event=stop_event,
+            client=client,
+            log_stream_names=log_stream_names,
+            limiter=limiter,
+            semaphore=semaphore,
+            stats=stats,
+    ):
+        events_all += page
+    return events_all, stats
+
+
+async def filter_log_events_parallel_async(
+        aws_region: str, log_group_name: str, pattern: str = '',
+        dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
+        is_stop_on_match: bool = False,
+        stop_event=None,
+        client=None,
+        log_stream_names: Optional[List[str]] = None,
+        slices: int = _PARALLEL_DEFAULT_SLICES,
+        limiter: Optional[AsyncRateLimiter] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+) -> Tuple[List[dict], FetchStats]:
+    """filter_log_events_parallel 的异步版本：各时间分段作为协程在同一事件循环上并发。"""
+    log_group_name = get_complete_log_group_name(log_group_name)
+    if limiter is None:
+        limiter = AsyncRateLimiter.for_cloudwatch()
+    async with _client_scope(client, aws_region, log_group_name) as client:
+        if dt_start is None or dt_end is None or slices <= 1:
+            return await filter_log_events_async(
+                aws_region, log_group_name, pattern,
+                dt_start=dt_start, dt_end=dt_end,
+                is_stop_on_match=is_stop_on_match,
+                stop_event=stop_event,
+                client=client,
+                log_stream_names=log_stream_names,
+                limiter=limiter,
+                semaphore=semaphore,
+            )
+
+        t_start = time.perf_counter()
+        bounds = split_time_range(dt_start, dt_end, slices)
+        tasks = [
+            asyncio.ensure_future(filter_log_events_async(
+                aws_region, log_group_name, pattern,
+                dt_start=seg_start, dt_end=seg_end,
+                is_stop_on_match=is_stop_on_match,
+                stop_event=stop_event,
+                client=client,
+                log_stream_names=log_stream_names,
+                limiter=limiter,
+                semaphore=semaphore,
+            ))
+            for seg_start, seg_end in bounds
+        ]
+        try:
+            pending = set(tasks)
+            while pending:
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if is_stop_on_match:
+                    # 最早一个已命中的段之后的所有段都不再需要
+                    hit_idx = next((
+                        idx for idx, task in enumerate(tasks)
+                        if task.done() and not task.cancelled() and task.exception() is None and task.result()[0]
+                    ), None)
+                    if hit_idx is not None:
+                        for task in tasks[hit_idx + 1:]:
+                            task.cancel()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        skipped = [task.cancelled() for task in tasks]
+        # 段内异常在这里抛出
+        results = [([], FetchStats()) if task.cancelled() else task.result() for task in tasks]
+        is_stopped_externally = stop_event is not None and stop_event.is_set()
+        return merge_time_slices(bounds, results, skipped, is_stop_on_match, is_stopped_externally, t_start)
+
+
+async def iter_filter_log_events_descending_async(
+        aws_region: str, log_group_name: str, pattern: str = '',
+        dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
+        stop_event=None,
+        client=None,
+        segment_duration: timedelta = timedelta(hours=1),
+        limiter: Optional[AsyncRateLimiter] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        stats: Optional[FetchStats] = None,
+) -> AsyncIterator[List[dict]]:
+    """iter_filter_log_events_descending 的异步版本：从后往前逐段拉取，每段 yield 一次（降序）。"""
+    log_group_name = get_complete_log_group_name(log_group_name)
+    stats = stats if stats is not None else FetchStats()
+
+    t_start = time.perf_counter()
+    stats.stopped_by = StopReason.COMPLETED
+    async with _client_scope(client, aws_region, log_group_name) as client:
+        try:
+            # 相邻段共享边界毫秒（startTime / endTime 都是闭区间），用 eventId 去重
+            boundary_ids: set = set()
+            seg_end = dt_end
+            while seg_end > dt_start:
+                seg_start = max(seg_end - segment_duration, dt_start)
+                seg_events, seg_stats = await filter_log_events_async(
+                    aws_region, log_group_name, pattern,
+                    dt_start=seg_start, dt_end=seg_end,
+                    is_stop_on_match=False,  # 段内需要拉完才能拿到最新的匹配
+                    stop_event=stop_event,
+                    client=client,
+                    limiter=limiter,
+                    semaphore=semaphore,
+                )
+                stats.iterations += seg_stats.iterations
+                stats.total_events += seg_stats.total_events
+                stats.events_per_iteration.extend(seg_stats.events_per_iteration)
+                stats.update_duration(t_start)
+
+                if boundary_ids:
+                    seg_events = [e for e in seg_events if e.get('eventId') not in boundary_ids]
+                seg_start_ms = int(seg_start.timestamp() * 1000)
+                boundary_ids = {e.get('eventId') for e in seg_events if e['timestamp'] <= seg_start_ms}
+                if seg_events:
+                    seg_events.reverse()  # 段内反转为降序
+                    yield seg_events
+
+                if stop_event is not None and stop_event.is_set():
+                    stats.stopped_by = StopReason.STOP_EVENT
+                    break
+
+                seg_end = seg_start
+        except GeneratorExit:
+            stats.stopped_by = StopReason.CONSUMER_CLOSED
+            raise
+        finally:
+            stats.update_duration(t_start)
+
+
+async def filter_log_events_descending_async(
+        aws_region: str, log_group_name: str, pattern: str = '',
+        dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
+        is_stop_on_match: bool = False,
+        stop_event=None,
+        client=None,
+        segment_duration: timedelta = timedelta(hours=1),
+        on_receive_batch: Optional[Callable[[List[dict]], bool]] = None,
+        limiter: Optional[AsyncRateLimiter] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+) -> Tuple[List[dict], FetchStats]:
+    """filter_log_events_descending 的异步版本，参数语义相同（on_receive_batch 为同步回调）。"""
+    stats = FetchStats()
+    events_all: List[dict] = []
+    stopped_by: Optional[StopReason] = None
+    seg_iter = iter_filter_log_events_descending_async(
+        aws_region, log_group_name, pattern,
+        dt_start=dt_start, dt_end=dt_end,
+        stop_event=stop_event,
+        client=client,
+        segment_duration=segment_duration,
+        limiter=limiter,
+        semaphore=semaphore,
+        stats=stats,
+    )
+    try:
+        async for seg_events in seg_iter:
+            events_all.extend(seg_events)
+
+            if on_receive_batch is not None:
+                # 自定义回调优先于 is_stop_on_match
+                if on_receive_batch(seg_events):
+                    stopped_by = StopReason.ON_RECEIVE_BATCH
+                    break
+            elif is_stop_on_match:
+                # 段内最后一条（反转后的第一条）就是该段中最新的匹配
+                events_all = [events_all[0]]
+                stopped_by = StopReason.MATCH_FOUND
+                break
+    finally:
+        await seg_iter.aclose()
+
+    if stopped_by is not None:
+        stats.stopped_by = stopped_by
+    stats.total_events = len(events_all)
+    return events_all, stats
+
+
+async def iter_get_log_events_async(
+        client,
+        logStreamName,
+        logGroupName: Optional[str] = None,
+        startTime: Optional[Union[int, datetime]] = None,
+        endTime: Optional[Union[int, datetime]] = None,
+        limit: Optional[int] = None,
+        startFromHead: bool = False,
+        stop_event=None,
+        limiter: Optional[AsyncRateLimiter] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        stats: Optional[FetchStats] = None,
+) -> AsyncIterator[List[dict]]:
+    """iter_get_log_events 的异步版本：逐页 yield，stats 原地更新。"""
+    if isinstance(startTime, datetime):
+        startTime = int(startTime.timestamp() * 1000)
+    if isinstance(endTime, datetime):
+        endTime = int(endTime.timestamp() * 1000)
+    stats = stats if stats is not None else FetchStats()
+
+    kwargs = {}
+    if logGroupName is not None:
+        kwargs['logGroupName'] = logGroupName
+    if startTime is not None:
+        kwargs['startTime'] = startTime
+    if endTime is not None:
+        kwargs['endTime'] = endTime
+    if limit is not None:
+        kwargs['limit'] = limit
+    if startFromHead:
+        kwargs['startFromHead'] = True
+
+    next_tkn = ''
+    t_start = time.perf_counter()
+    try:
+        while True:
+            if next_tkn:
+                kwargs['nextToken'] = next_tkn
+
+            if not await _pace(limiter, stats.iterations, stop_event):
+                stats.stopped_by = StopReason.STOP_EVENT
+                break
+
+            response = await _call_with_throttle_retry_async(
+                client.get_log_events, semaphore, logStreamName=logStreamName, **kwargs
+            )
+            events = response['events']
+            stats.record_iteration(t_start, len(events))
+
+            if not events:
+                stats.stopped_by = StopReason.EMPTY_RESPONSE
+                break
+            yield events
+
+            next_tkn_curr = response['nextForwardToken'] if startFromHead else response['nextBackwardToken']
+            if next_tkn_curr == next_tkn:
+                stats.stopped_by = StopReason.TOKEN_EXHAUSTED
+                break
+            next_tkn = next_tkn_curr
+
+            if stop_event is not None and stop_event.is_set():
+                stats.stopped_by = StopReason.STOP_EVENT
+                break
+    except GeneratorExit:
+        stats.stopped_by = StopReason.CONSUMER_CLOSED
+        raise
+    finally:
+        stats.update_duration(t_start)
+
+
+async def get_log_events_async(
+        client,
+        logStreamName,
+        logGroupName: Optional[str] = None,
+        startTime: Optional[Union[int, datetime]] = None,
+        endTime: Optional[Union[int, datetime]] = None,
+        limit: Optional[int] = None,
+        startFromHead: bool = False,
+        stop_event=None,
+        limiter: Optional[AsyncRateLimiter] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+) -> Tuple[List[dict], FetchStats]:
+    """get_log_events 的异步版本，参数语义相同。"""
+    stats = FetchStats()
+    events_all: List[dict] = []
+    async for page in iter_get_log_events_async(
+            client, logStreamName,
+            logGroupName=logGroupName,
+            startTime=startTime,
+            endTime=endTime,
+            limit=limit,
+            startFromHead=startFromHead,
+            stop_event=stop_event,
+            limiter=limiter,
+            semaphore=semaphore,
+            stats=stats,
+    ):
+        events_all += page
+    return events_all, stats
@@ -0,0 +1,200 @@
+"""CloudWatch Logs 拉取任务池：固定数量的常驻 worker 进程从队列领取 (日志组, region, 时间窗) 任务。
+
+取代"每个 (日志组, region) 起一个进程"的做法：进程数（以及 boto3 导入开销、峰值内存）
+只取决于 pool_size，与任务数无关。每个 worker 进程内按 (profile, region) 复用 logs client，
+所有 worker 共享按 (profile, region) 划分的跨进程限速器。
+
+用法：
+    def my_job(job: LogFetchJob, ctx: WorkerContext) -> Tuple[Any, FetchStats]:
+        events, stats = filter_log_events(
+            job.region, job.log_group_name, dt_start=job.dt_start, dt_end=job.dt_end,
+            client=ctx.get_client(job.region, job.log_group_name),
+            limiter=ctx.get_limiter(job.region, job.log_group_name),
+            stop_event=ctx.stop_event,
+        )
+        return len(events), stats
+
+    results = run_job_pool(jobs, my_job, pool_size=8)
+
+job_fn 必须是模块级函数（Windows spawn 需要可 pickle）。
+"""
+import dataclasses
+import multiprocessing
+import os
+import queue
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from CloudWatch.cloud_watch_dataclass import FetchStats
+from CloudWatch.cloud_watch_helper import (
+    FILTER_LOG_EVENTS_TPS, get_env_from_log_group_name, get_log_account_key, get_log_client,
+)
+from utils.rate_limiter import RateLimiter, create_shared_limiters
+
+DEFAULT_POOL_SIZE = min(8, os.cpu_count() or 1)
+
+_RESULT_POLL_INTERVAL = 0.5  # 主进程等待结果时检查 worker 存活的间隔（秒）
+
+
+@dataclasses.dataclass
+class LogFetchJob:
+    """一个拉取任务：(日志组, region, 时间窗) + 任务自定义参数。"""
+    log_group_name: str
+    region: str
+    dt_start: Optional[datetime] = None
+    dt_end: Optional[datetime] = None
+    payload: Dict[str, Any] = dataclasses.field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        from utils.aws_consts import REGION_TO_ABBR
+        return f'{self.log_group_name} {REGION_TO_ABBR.get(self.region, self.region)}'
+
+
+@dataclasses.dataclass
+class LogFetchJobResult:
+    job: LogFetchJob
+    result: Any = None
+    stats: Optional[FetchStats] = None
+    error: Optional[str] = None
+    duration: float = 0.0
+    worker_pid: int = 0
+
+
+class WorkerContext:
+    """单个 worker 进程内的共享资源：logs client 缓存、限速器、取消信号和调用方附加对象。"""
+
+    def __init__(self, limiters: Dict[Hashable, RateLimiter], stop_event, extras: Dict[str, Any]):
+        self.limiters = limiters
+        self.stop_event = stop_event
+        self.extras = extras
+        self._clients: Dict[Tuple[str, str], Any] = {}
+
+    def get_client(self, region: str, log_group_name: str):
+        """按 (profile, region) 复用 logs client，同一 worker 内的后续任务不再重建。
+        限速由跨进程共享的 limiters 负责，client 不挂自适应限速。"""
+        key = get_log_account_key(region, log_group_name)
+        if key not in self._clients:
+            self._clients[key] = get_log_client(region, get_env_from_log_group_name(log_group_name), adaptive=False)
+        return self._clients[key]
+
+    def get_limiter(self, region: str, log_group_name: str) -> Optional[RateLimiter]:
+        return self.limiters.get(limiter_key(region, log_group_name))
+
+
+def limiter_key(region: str, log_group_name: str) -> Tuple[str, str]:
+    """共享限速器的 key：(profile, region)。profile 解析失败时退化为按 region 共享，错误留给任务本身报告。"""
+    try:
+        return get_log_account_key(region, log_group_name)
+    except (KeyError, ValueError):
+        return '', region
+
+
+def _worker_loop(job_fn, job_queue, result_queue, limiters, stop_event, extras):
+    ctx = WorkerContext(limiters, stop_event, extras)
+    pid = os.getpid()
+    while True:
+        item = job_queue.get()
+        if item is None:
+            break
+        idx, job = item
+        if stop_event.is_set():
+            result_queue.put((idx, LogFetchJobResult(job=job, error='cancelled', worker_pid=pid)))
+            continue
+
+        t_start = time.perf_counter()
+        res = LogFetchJobResult(job=job, worker_pid=pid)
+        try:
+            res.result, res.stats = job_fn(job, ctx)
+        except Exception as e:
+            res.error = str(e)
+        res.duration = time.perf_counter() - t_start
+        result_queue.put((idx, res))
+
+
+def run_job_pool(
+        jobs: List[LogFetchJob],
+        job_fn: Callable[[LogFetchJob, WorkerContext], Tuple[Any, Optional[FetchStats]]],
+        pool_size: int = DEFAULT_POOL_SIZE,
+        tps: float = FILTER_LOG_EVENTS_TPS,
+        extras: Optional[Dict[str, Any]] = None,
+        on_result: Optional[Callable[[LogFetchJobResult], None]] = None,
+        stop_event=None,
+) -> List[Optional[LogFetchJobResult]]:
+    """用固定大小的 worker 进程池执行 jobs，按提交顺序返回结果。
+
+    Args:
+        jobs: 待执行的任务列表
+        job_fn: 模块级任务函数 (job, ctx) -> (result, FetchStats)
+        pool_size: worker 进程数上限（实际取 min(pool_size, len(jobs))）
+        tps: 每个 (profile, region) 的共享 TPS 预算
+        extras: 附加给 WorkerContext.extras 的对象（需可随进程继承，如 Manager().Lock()）
+        on_result: 主进程中每个任务完成时的回调（按完成顺序）
+        stop_event: 外部取消信号（multiprocessing.Event）；None 时内部创建，Ctrl+C 时 set
+
+    Returns:
+        与 jobs 一一对应的结果列表；worker 异常退出导致没有结果的任务为 None。
+    """
+    if not jobs:
+        return []
+    stop_event = stop_event if stop_event is not None else multiprocessing.Event()
+    limiters = create_shared_limiters(
+        (limiter_key(job.region, job.log_group_name) for job in jobs), rate=tps,
+    )
+
+    job_queue = multiprocessing.Queue()
+    result_queue = multiprocessing.Queue()
+    worker_cnt = max(1, min(pool_size, len(jobs)))
+    for idx, job in enumerate(jobs):
+        job_queue.put((idx, job))
+    for _ in range(worker_cnt):
+        job_queue.put(None)
+
+    processes = [
+        multiprocessing.Process(
+            target=_worker_loop,
+            args=(job_fn, job_queue, result_queue, limiters, stop_event, extras or {}),
+        )
+        for _ in range(worker_cnt)
+    ]
+    for p in processes:
+        p.start()
+
+    results: List[Optional[LogFetchJobResult]] = [None] * len(jobs)
+
+    def __collect():
+        pending = sum(1 for r in results if r is None)
+        while pending:
+            try:
+                idx, res = result_queue.get(timeout=_RESULT_POLL_INTERVAL)
+            except queue.Empty:
+                if not any(p.is_alive() for p in processes) and result_queue.empty():
+                    break  # 全部 worker 已退出，剩余任务没有结果
+                continue
+            results[idx] = res
+            pending -= 1
+            if on_result is not None:
+                on_result(res)
+
+    try:
+        __collect()
+    except KeyboardInterrupt:
+        print('Keyboard Interrupted')
+        stop_event.set()
+        __collect()
+    finally:
+        stop_event.set()
+        # worker 写入 result_queue 的数据未被读走时其 feeder 线程不退出，直接 join 会卡住：等待期间持续排空
+        while any(p.is_alive() for p in processes):
+            try:
+                idx, res = result_queue.get(timeout=_RESULT_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if results[idx] is None:
+                results[idx] = res
+        for p in processes:
+            p.join()
+        # worker 异常退出时 job_queue 可能还有未取走的任务，不等待本进程的 feeder 线程把它们写完
+        job_queue.cancel_join_thread()
+    return results
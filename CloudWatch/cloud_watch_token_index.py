@@ -0,0 +1,91 @@
+"""CloudWatch 日志的标识符倒排索引：请求 / 玩家维度的点查，不再每次全量扫描 + 正则。
+
+从每条事件的 message 中提取的 token（带类型前缀，便于区分同值不同义的标识符）：
+    log_id:<id>       app 网关日志的首 token（"XVJGbp ⚕ [INFO] ..."，判定规则见 is_orphan_first_token）
+    req:<uuid>        AWS RequestId：START / END / REPORT 行、python runtime 的 "[ERROR]\\t<ts>\\t<uuid>\\t" 行、
+                      "Task timed out" 行；统一转小写
+    caller:<id>       GraphQL 请求体里的 __CallerId
+    platform:<id>     请求体里的 platformId
+
+本模块只负责提取，不依赖具体存储；倒排表分别建在：
+    - EventCache（SQLite）的 event_tokens 表，见 EventCache.query_tokens
+    - 导出归档的 sidecar 文件 .cw_archive_tokens，见 cloud_watch_export_archive.ArchiveTokenIndex
+
+用法：
+    cache.query_tokens(region, log_group, [request_token(req_id)])
+    lookup_archive_events(archive_root, [platform_token('7656119...')], dt_start=..., dt_end=...)
+"""
+import re
+from typing import Set
+
+TOKEN_LOG_ID = 'log_id'
+TOKEN_REQUEST = 'req'
+TOKEN_CALLER = 'caller'
+TOKEN_PLATFORM = 'platform'
+
+# Lambda 运行时打的行首标记，用于识别一行日志是否属于 app（否则视为 runtime 行）
+RUNTIME_FIRST_TOKENS = frozenset([
+    'START', 'END', 'REPORT', 'INIT_START', 'LOGS', 'EXTENSION',
+    'LAMBDA_WARNING', 'LAMBDA_RUNTIME',
+])
+
+_UUID = r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+_PAT_REQUEST_IDS = (
+    re.compile(rf'^(?:START|END|REPORT)\s+RequestId:\s+({_UUID})'),
+    re.compile(rf'^\[[A-Z]+\]\t\S+\t({_UUID})\t'),
+    re.compile(rf'\s({_UUID})\s+Task timed out after'),
+)
+_PAT_TS_TOKEN = re.compile(r'^\d{4}-\d{2}-\d{2}T')  # "Task timed out" 等 runtime 行以时间戳开头
+_PAT_CALLER_ID = re.compile(r"__CallerId': '(.*?)'")
+_PAT_PLATFORM_ID = re.compile(r'platformId\D{0,16}?(\d+)')
+
+
+def is_orphan_first_token(first_token: str) -> bool:
+    """判断 message 首个空格分隔的 token 是不是 app log_id。
+    app 网关日志形如 "XVJGbp ⚕ [INFO] ..." —— 首 token 是随机 log_id。
+    orphan 行首 token 会是 "[ERROR]" / "[INFO]" / runtime 关键字，此时视为无 log_id。"""
+    if not first_token:
+        return True
+    if first_token.startswith('[') and first_token.endswith(']'):
+        return True
+    if first_token in RUNTIME_FIRST_TOKENS:
+        return True
+    return False
+
+
+# region token
+
+def log_id_token(log_id: str) -> str:
+    return f'{TOKEN_LOG_ID}:{log_id}'
+
+
+def request_token(aws_req_id: str) -> str:
+    return f'{TOKEN_REQUEST}:{aws_req_id.lower()}'
+
+
+def caller_token(caller_id: str) -> str:
+    return f'{TOKEN_CALLER}:{caller_id}'
+
+
+def platform_token(platform_id: str) -> str:
+    return f'{TOKEN_PLATFORM}:{platform_id}'
+
+
+def extract_tokens(message: str) -> Set[str]:
+    """message 中可检索的标识符 token。"""
+    tokens: Set[str] = set()
+    first_token = message.split(' ', 1)[0]
+    if (not is_orphan_first_token(first_token) and not _PAT_TS_TOKEN.match(first_token)
+            and '\t' not in first_token and '\n' not in first_token):
+        tokens.add(log_id_token(first_token))
+    for pat in _PAT_REQUEST_IDS:
+        m = pat.search(message)
+        if m is not None:
+            tokens.add(request_token(m.group(1)))
+    if '__CallerId' in message:
+        tokens.update(caller_token(c) for c in _PAT_CALLER_ID.findall(message) if c)
+    if 'platformId' in message:
+        tokens.update(platform_token(p) for p in _PAT_PLATFORM_ID.findall(message))
+    return tokens
+
+# endregion token
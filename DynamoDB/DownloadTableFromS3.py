@@ -1,15 +1,19 @@
 import os
 import sys
-from typing import List
+from typing import Iterator, List
 
 CURR_FOLDER_NAME = os.path.basename(os.path.dirname(os.path.abspath(__file__)))
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 os.chdir('..')
 sys.path.append(os.getcwd())
 
+from DynamoDB.dynamodb_columnar import COLUMNAR_DIR_NAME, ColumnarTable, convert_export_to_columnar
 from DynamoDB.pa_dynamodb_helper import get_env_from_pa_table
-from DynamoDB.dynamodb_helper import extract_table_files
+from DynamoDB.dynamodb_helper import (
+    extract_table_files, iter_export_dir_records, iter_s3_export_records, list_s3_export_keys,
+)
 from S3.s3_downloader import download_dir_from_s3
+from utils.aws_client_pool import get_env_client
 from utils.aws_consts import AllEnvs
 
 BUCKET_TABLE_ADHOC_CN = '471636885451-heo-table-export-adhoc'
@@ -20,7 +24,9 @@ DATA_OUTPUT_DIR = f'./{CURR_FOLDER_NAME}/Data/output'
 def download_pa_table_export_adhoc_from_s3(
         region: str, table_name: str, output_dir: str = DATA_OUTPUT_DIR,
         is_skip_download: bool = False,
-) -> None:
+        is_extract: bool = False,
+) -> str:
+    """下载表导出到本地；is_extract=True 时额外解压出 .ion 文件（read_table_records 可直接读 .gz，通常不需要）。"""
     bucket_name = BUCKET_TABLE_ADHOC_CN if region.startswith('cn') else BUCKET_TABLE_ADHOC_US
     env = get_env_from_pa_table(table_name)
     dir_key = f'{env.name}/{table_name}'
@@ -37,11 +43,38 @@ def download_pa_table_export_adhoc_from_s3(
             bucket_name=bucket_name, dir_key=dir_key,
             output_path=output_dir,
         )
-    extract_table_files(output_dir)
+    if is_extract:
+        extract_table_files(output_dir)
     return output_dir
 
 
+def read_table_records(table_dir_path: str) -> Iterator[dict]:
+    """逐条读取本地导出目录（.gz 边解压边解析），内存占用与导出大小无关。"""
+    if not os.path.exists(table_dir_path):
+        print(f"Directory {table_dir_path} does not exist")
+        return
+    yield from iter_export_dir_records(table_dir_path)
+
+
+def open_columnar_table(table_dir_path: str, rebuild: bool = False) -> ColumnarTable:
+    """打开导出目录对应的列式存储，不存在（或 rebuild=True）时先转换。"""
+    columnar_dir = os.path.join(table_dir_path, COLUMNAR_DIR_NAME)
+    if rebuild or not os.path.exists(columnar_dir):
+        convert_export_to_columnar(table_dir_path, columnar_dir)
+    return ColumnarTable(columnar_dir)
+
+
+def stream_pa_table_export_adhoc_from_s3(region: str, table_name: str) -> Iterator[dict]:
+    """不落盘，直接从 S3 逐条读取表导出记录。"""
+    bucket_name = BUCKET_TABLE_ADHOC_CN if region.startswith('cn') else BUCKET_TABLE_ADHOC_US
+    env = get_env_from_pa_table(table_name)
+    client = get_env_client('s3', AllEnvs.PartyAnimalsInteral, region)
+    keys = list_s3_export_keys(client, bucket_name, f'{env.name}/{table_name}')
+    yield from iter_s3_export_records(client, bucket_name, keys)
+
+
 def read_extracted_table(table_dir_path: str) -> List[dict]:
+    """读取已解压的 .ion 文件（旧流程，新代码用 read_table_records）。"""
     import glob
     import amazon.ion.simpleion as ion
 
@@ -79,7 +112,5 @@ if __name__ == "__main__":
     output_dir = download_pa_table_export_adhoc_from_s3(region='cn-northwest-1', table_name=table_name,
                                                         # is_skip_download=True,
                                                         )
-    table_items = read_extracted_table(output_dir)
-    table_data = [item['Item'] for item in table_items]
-    for elem in table_data:
-        print(elem)
+    for item in read_table_records(output_dir):
+        print(item['Item'])
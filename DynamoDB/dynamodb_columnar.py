@@ -0,0 +1,344 @@
+"""
+DynamoDB 表导出的列式存储与查询。
+
+导出下载后只需转换一次，之后的分析按列读取压缩文件，不再把整表还原成 List[dict]：
+
+    convert_export_to_columnar('DynamoDB/Data/output/<env>/<table>')
+    table = ColumnarTable('DynamoDB/Data/output/<env>/<table>/columnar')
+    for row in table.scan(columns=['pk', 'status'], where=[('level', '>=', 10)]):
+        ...
+    table.group_count('status', where=[('region', '==', 'cn')])
+
+存储格式（<table>/columnar/）：
+    _manifest.json           各分区的行数、列名与每列的 min / max / null 数
+    part-00000/c0.col ...    每列一个文件：zlib 压缩的 JSON Lines，每行一个值，按 manifest 中的列序号命名
+
+值编码（_encode_value）：None / bool / int / str / 有限 float 直接写 JSON；其余类型写成单键对象
+    {"$d": "1.50"} Decimal    {"$t": "2024-01-01T00:00:00+00:00"} datetime    {"$b": "<base64>"} bytes
+    {"$f": "nan"} 非有限 float    {"$m": {...}} dict（值递归编码）    list 元素递归编码
+
+设计：
+    - 分区 = 导出分片按 rows_per_partition 切成的行块，由 iter_export_batches_parallel 多进程解码
+    - 投影：只读取 columns 与 where 涉及的列文件
+    - 谓词下推：先按 manifest 中的 min / max / null 统计跳过不可能命中的分区，再逐行过滤
+    - 列值保持 ion_to_python 的类型（str / int / Decimal / datetime / dict / list ...），
+      不存在的属性为 None；类型混杂、无法比较的列不记录 min / max，也就不参与分区裁剪
+
+不引入 pyarrow：压缩与序列化只用标准库，文件只供本工具读写。
+"""
+
+import base64
+import json
+import math
+import os
+import shutil
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from DynamoDB.dynamodb_helper import RecordBatch, iter_export_batches_parallel
+
+COLUMNAR_DIR_NAME = 'columnar'
+MANIFEST_FILE_NAME = '_manifest.json'
+ROWS_PER_PARTITION = 100000
+_FORMAT_VERSION = 1
+_ZLIB_LEVEL = 6
+
+Predicate = Tuple[str, str, Any]  # (column, op, value)，op 见 _OPS
+
+_OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+    'in': lambda a, b: a in b,
+    'is_null': lambda a, _: a is None,
+    'not_null': lambda a, _: a is not None,
+}
+
+
+@dataclass
+class ColumnStats:
+    nulls: int = 0
+    min: Any = None
+    max: Any = None
+    has_range: bool = False  # False 表示列为空或类型不可比较，min / max 无意义
+
+
+@dataclass
+class PartitionInfo:
+    name: str
+    num_rows: int
+    columns: Dict[str, int] = field(default_factory=dict)  # 列名 -> 列文件序号
+    stats: Dict[str, ColumnStats] = field(default_factory=dict)
+
+
+def _column_stats(values: list) -> ColumnStats:
+    present = [v for v in values if v is not None]
+    stats = ColumnStats(nulls=len(values) - len(present))
+    if present:
+        try:
+            stats.min, stats.max, stats.has_range = min(present), max(present), True
+        except TypeError:
+            pass
+    return stats
+
+
+# region 值编码
+
+def _encode_value(value: Any) -> Any:
+    """把列值转成可 JSON 序列化的形式，JSON 没有的类型用单键对象标记，见模块说明。"""
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        return value if math.isfinite(value) else {'$f': repr(value)}
+    if isinstance(value, Decimal):
+        return {'$d': str(value)}
+    if isinstance(value, datetime):
+        return {'$t': value.isoformat()}
+    if isinstance(value, (bytes, bytearray)):
+        return {'$b': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, dict):
+        return {'$m': {str(k): _encode_value(v) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return [_encode_value(v) for v in value]
+    raise TypeError(f'Unsupported column value type: {type(value).__name__}')
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode_value(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    (tag, raw), = value.items()
+    if tag == '$d':
+        return Decimal(raw)
+    if tag == '$t':
+        return datetime.fromisoformat(raw)
+    if tag == '$b':
+        return base64.b64decode(raw)
+    if tag == '$f':
+        return float(raw)
+    if tag == '$m':
+        return {k: _decode_value(v) for k, v in raw.items()}
+    raise ValueError(f'Unknown column value tag: {tag}')
+
+# endregion 值编码
+
+
+def _write_column(path: str, values: list) -> None:
+    lines = '\n'.join(json.dumps(_encode_value(v), ensure_ascii=False, separators=(',', ':')) for v in values)
+    with open(path, 'wb') as f:
+        f.write(zlib.compress(lines.encode('utf-8'), _ZLIB_LEVEL))
+
+
+def _read_column(path: str) -> list:
+    with open(path, 'rb') as f:
+        data = zlib.decompress(f.read()).decode('utf-8')
+    return [_decode_value(json.loads(line)) for line in data.split('\n')] if data else []
+
+
+def _partition_to_json(part: PartitionInfo) -> dict:
+    return {
+        'name': part.name,
+        'num_rows': part.num_rows,
+        'columns': part.columns,
+        'stats': {
+            col: {'nulls': st.nulls, 'min': _encode_value(st.min), 'max': _encode_value(st.max),
+                  'has_range': st.has_range}
+            for col, st in part.stats.items()
+        },
+    }
+
+
+def _partition_from_json(data: dict) -> PartitionInfo:
+    return PartitionInfo(
+        name=data['name'],
+        num_rows=data['num_rows'],
+        columns=data['columns'],
+        stats={
+            col: ColumnStats(nulls=st['nulls'], min=_decode_value(st['min']), max=_decode_value(st['max']),
+                             has_range=st['has_range'])
+            for col, st in data['stats'].items()
+        },
+    )
+
+
+def _write_partition(root: str, name: str, batch: RecordBatch) -> PartitionInfo:
+    part_dir = os.path.join(root, name)
+    os.makedirs(part_dir, exist_ok=True)
+    info = PartitionInfo(name=name, num_rows=batch.num_rows)
+    for idx, (col, values) in enumerate(zip(batch.columns, batch.values)):
+        _write_column(os.path.join(part_dir, f'c{idx}.col'), values)
+        info.columns[col] = idx
+        info.stats[col] = _column_stats(values)
+    return info
+
+
+def convert_export_to_columnar(
+        table_dir_path: str,
+        output_dir: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        rows_per_partition: int = ROWS_PER_PARTITION,
+) -> str:
+    """
+    把导出目录（.gz / .ion 分片）转换成列式存储，返回列式目录路径。
+
+    :param output_dir: 默认 <table_dir_path>/columnar；已存在时整体重建
+    """
+    output_dir = output_dir or os.path.join(table_dir_path, COLUMNAR_DIR_NAME)
+    tmp_dir = f'{output_dir}.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    partitions: List[PartitionInfo] = []
+    total_rows = 0
+    batches = iter_export_batches_parallel(
+        table_dir_path, max_workers=max_workers, ordered=False, batch_size=rows_per_partition,
+    )
+    for batch in batches:
+        partitions.append(_write_partition(tmp_dir, f'part-{len(partitions):05d}', batch))
+        total_rows += batch.num_rows
+    with open(os.path.join(tmp_dir, MANIFEST_FILE_NAME), 'w', encoding='utf-8') as f:
+        json.dump({'version': _FORMAT_VERSION, 'partitions': [_partition_to_json(p) for p in partitions]},
+                  f, ensure_ascii=False)
+
+    # 写完再替换，转换中途失败不会破坏已有的列式数据
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(tmp_dir, output_dir)
+    print(f'Columnar conversion completed. rows={total_rows} partitions={len(partitions)} output={output_dir}')
+    return output_dir
+
+
+def _may_match(part: PartitionInfo, pred: Predicate) -> bool:
+    """按分区统计判断 pred 是否可能命中；无法判断时返回 True。"""
+    col, op, value = pred
+    if col not in part.columns:
+        return op == 'is_null' or (op == '!=' and value is not None)
+    stats = part.stats[col]
+    if op == 'is_null':
+        return stats.nulls > 0
+    if op == 'not_null':
+        return stats.nulls < part.num_rows
+    if stats.nulls == part.num_rows:
+        return op == '!='
+    if not stats.has_range:
+        return True
+    try:
+        if op == '==':
+            return stats.min <= value <= stats.max
+        if op == 'in':
+            return any(stats.min <= v <= stats.max for v in value)
+        if op == '<':
+            return stats.min < value
+        if op == '<=':
+            return stats.min <= value
+        if op == '>':
+            return stats.max > value
+        if op == '>=':
+            return stats.max >= value
+    except TypeError:
+        return True
+    return True
+
+
+def _row_match(fn: Callable[[Any, Any], bool], op: str, a: Any, b: Any) -> bool:
+    if a is None and op not in ('is_null', 'not_null', '!='):
+        return False
+    try:
+        return fn(a, b)
+    except TypeError:
+        return False
+
+
+class ColumnarTable:
+    """列式存储的只读查询入口。"""
+
+    def __init__(self, path: str):
+        self.path = path
+        manifest_path = os.path.join(path, MANIFEST_FILE_NAME)
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != _FORMAT_VERSION:
+            raise ValueError(f'Unsupported columnar format version: {manifest.get("version")}')
+        self.partitions: List[PartitionInfo] = [_partition_from_json(p) for p in manifest['partitions']]
+
+    @property
+    def num_rows(self) -> int:
+        return sum(p.num_rows for p in self.partitions)
+
+    @property
+    def columns(self) -> List[str]:
+        seen: Dict[str, None] = {}
+        for part in self.partitions:
+            seen.update(dict.fromkeys(part.columns))
+        return list(seen)
+
+    def _load(self, part: PartitionInfo, col: str) -> list:
+        if col not in part.columns:
+            return [None] * part.num_rows
+        return _read_column(os.path.join(self.path, part.name, f'c{part.columns[col]}.col'))
+
+    def _iter_selected(
+            self, columns: Sequence[str], where: Sequence[Predicate],
+    ) -> Iterator[Tuple[PartitionInfo, Dict[str, list], List[int]]]:
+        """逐个分区产出 (分区, 所需列的取值, 命中的行号)。"""
+        for op in {op for _, op, _ in where}:
+            if op not in _OPS:
+                raise ValueError(f'Unsupported predicate op: {op}')
+        for part in self.partitions:
+            if not all(_may_match(part, pred) for pred in where):
+                continue
+            data: Dict[str, list] = {}
+            rows = range(part.num_rows)
+            for col, op, value in where:
+                if col not in data:
+                    data[col] = self._load(part, col)
+                fn, col_values = _OPS[op], data[col]
+                rows = [i for i in rows if _row_match(fn, op, col_values[i], value)]
+                if not rows:
+                    break
+            if not rows:
+                continue
+            for col in columns:
+                if col not in data:
+                    data[col] = self._load(part, col)
+            yield part, data, list(rows)
+
+    def scan(
+            self, columns: Optional[Sequence[str]] = None, where: Sequence[Predicate] = (),
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        逐行产出命中的记录。
+
+        :param columns: 需要的列，None 表示全部列
+        :param where:   条件列表（AND），如 [('level', '>=', 10), ('status', 'in', {'A', 'B'})]
+        """
+        columns = list(columns) if columns is not None else self.columns
+        for _, data, rows in self._iter_selected(columns, where):
+            col_values = [data[c] for c in columns]
+            for i in rows:
+                yield {c: values[i] for c, values in zip(columns, col_values)}
+
+    def count(self, where: Sequence[Predicate] = ()) -> int:
+        if not where:
+            return self.num_rows
+        return sum(len(rows) for _, _, rows in self._iter_selected([], where))
+
+    def group_count(self, by: str, where: Sequence[Predicate] = ()) -> Dict[Any, int]:
+        """按 by 列的取值计数（dict / list 等不可哈希的取值按 repr 归组）。"""
+        counts: Dict[Any, int] = {}
+        for _, data, rows in self._iter_selected([by], where):
+            values = data[by]
+            for i in rows:
+                key = values[i]
+                try:
+                    hash(key)
+                except TypeError:
+                    key = repr(key)
+                counts[key] = counts.get(key, 0) + 1
+        return counts
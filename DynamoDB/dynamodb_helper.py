@@ -1,6 +1,17 @@
 import glob
 import gzip
 import os
+import shutil
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import IO, Any, Deque, Dict, Iterable, Iterator, List, Optional, Set
+
+_COPY_BUFFER_SIZE = 1024 * 1024  # 解压写盘的块大小
+DECODE_BATCH_SIZE = 10000        # 并行解码时每个列式批次的最大行数
+MAX_IN_FLIGHT_PER_WORKER = 2     # 并行解码时每个 worker 对应的在途分片数，限制已解码未消费的结果占用的内存
 
 
 def extract_table_files(output_path: str) -> None:
@@ -25,10 +36,217 @@ def extract_table_files(output_path: str) -> None:
 
             print(f"Extracting {os.path.basename(gz_file)}")
 
-            # Extract the file
+            # Extract the file（按块解压，内存占用与文件大小无关）
             with gzip.open(gz_file, 'rb') as f_in:
                 with open(output_file, 'wb') as f_out:
-                    f_out.write(f_in.read())
+                    shutil.copyfileobj(f_in, f_out, _COPY_BUFFER_SIZE)
 
         except Exception as e:
             print(f"Error extracting {gz_file}: {str(e)}")
+
+
+# region 流式读取 Ion 导出
+
+def ion_to_python(value: Any) -> Any:
+    """把 simpleion 读出的 IonPy* 值递归转成普通 Python 类型（dict / list / str / int / Decimal / ...）。"""
+    from amazon.ion.core import IonType
+    from amazon.ion.simple_types import IonPyNull
+
+    if isinstance(value, IonPyNull):
+        return None
+    ion_type = getattr(value, 'ion_type', None)
+    if ion_type is None:
+        return value
+    if ion_type == IonType.STRUCT:
+        return {k: ion_to_python(v) for k, v in value.items()}
+    if ion_type in (IonType.LIST, IonType.SEXP):
+        return [ion_to_python(v) for v in value]
+    if ion_type == IonType.BOOL:
+        return bool(value)
+    if ion_type == IonType.INT:
+        return int(value)
+    if ion_type == IonType.FLOAT:
+        return float(value)
+    if ion_type in (IonType.STRING, IonType.SYMBOL):
+        return str(getattr(value, 'text', value))
+    if ion_type in (IonType.BLOB, IonType.CLOB):
+        return bytes(value)
+    if ion_type == IonType.DECIMAL:
+        return Decimal(value)
+    if ion_type == IonType.TIMESTAMP:
+        return datetime(value.year, value.month, value.day, value.hour, value.minute, value.second,
+                        value.microsecond, value.tzinfo)
+    return value
+
+
+def iter_ion_records(fp: IO[bytes]) -> Iterator[dict]:
+    """从 Ion 字节流中逐条读出顶层值（DynamoDB 导出中每条为 {'Item': {...}}），不一次性读入整个文件。"""
+    import amazon.ion.simpleion as ion
+
+    for record in ion.load(fp, single_value=False, parse_eagerly=False):
+        yield ion_to_python(record)
+
+
+def iter_export_file_records(file_path: str) -> Iterator[dict]:
+    """读取单个导出分片，.gz 边解压边解析，.ion 直接解析。"""
+    opener = gzip.open if file_path.endswith('.gz') else open
+    with opener(file_path, 'rb') as f:
+        yield from iter_ion_records(f)
+
+
+def find_export_files(dir_path: str) -> List[str]:
+    """目录下的导出分片：优先 .gz，无需先解压到磁盘；只有已解压的 .ion 文件时返回 .ion。"""
+    files = sorted(glob.glob(os.path.join(dir_path, "**/*.gz"), recursive=True))
+    if not files:
+        files = sorted(glob.glob(os.path.join(dir_path, "**/*.ion"), recursive=True))
+    return files
+
+
+def iter_export_dir_records(dir_path: str) -> Iterator[dict]:
+    """逐条读取目录下全部导出分片的记录（单进程）。"""
+    files = find_export_files(dir_path)
+    print(f"Found {len(files)} export files to read")
+    for file_path in files:
+        yield from iter_export_file_records(file_path)
+
+
+def iter_s3_export_records(client, bucket_name: str, keys: Iterable[str]) -> Iterator[dict]:
+    """直接从 S3 响应体流式解压、解析导出分片，不落盘。"""
+    for key in keys:
+        body = client.get_object(Bucket=bucket_name, Key=key)['Body']
+        try:
+            fp = gzip.GzipFile(fileobj=body, mode='rb') if key.endswith('.gz') else body
+            yield from iter_ion_records(fp)
+        finally:
+            body.close()
+
+
+def list_s3_export_keys(client, bucket_name: str, dir_key: str, suffix: Optional[str] = '.gz') -> Iterator[str]:
+    """列出 dir_key 下的导出分片 key（默认只要 .gz 数据文件，跳过 manifest 等）。"""
+    paginator = client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=dir_key):
+        for obj in page.get('Contents', []):
+            if suffix is None or obj['Key'].endswith(suffix):
+                yield obj['Key']
+
+# endregion 流式读取 Ion 导出
+
+
+# region 多进程并行解码
+
+@dataclass
+class RecordBatch:
+    """
+    列式记录批次：columns[i] 列的全部取值在 values[i]，各列等长。
+
+    来自同一个分片的连续记录；某条记录没有的属性取 None。
+    DynamoDB 导出的每条记录是 {'Item': {...}}，这里直接按 Item 的属性拆列。
+    """
+    source: str
+    columns: List[str] = field(default_factory=list)
+    values: List[list] = field(default_factory=list)
+    num_rows: int = 0
+
+    def column(self, name: str) -> list:
+        return self.values[self.columns.index(name)]
+
+    def to_items(self) -> Iterator[Dict[str, Any]]:
+        """还原成逐条的 Item dict（跳过取值为 None 的列）。"""
+        for row in zip(*self.values):
+            yield {col: val for col, val in zip(self.columns, row) if val is not None}
+
+
+def _items_to_batch(source: str, items: List[dict]) -> RecordBatch:
+    col_index: Dict[str, int] = {}
+    for item in items:
+        for key in item:
+            if key not in col_index:
+                col_index[key] = len(col_index)
+    values = [[None] * len(items) for _ in col_index]
+    for row, item in enumerate(items):
+        for key, val in item.items():
+            values[col_index[key]][row] = val
+    return RecordBatch(source=source, columns=list(col_index), values=values, num_rows=len(items))
+
+
+def decode_export_file(file_path: str, batch_size: int = DECODE_BATCH_SIZE) -> List[RecordBatch]:
+    """解压 + 解析单个分片并转成列式批次（进程池 worker 入口，需为模块级函数）。"""
+    batches: List[RecordBatch] = []
+    items: List[dict] = []
+    for record in iter_export_file_records(file_path):
+        items.append(record.get('Item', record) if isinstance(record, dict) else {'value': record})
+        if len(items) >= batch_size:
+            batches.append(_items_to_batch(file_path, items))
+            items = []
+    if items:
+        batches.append(_items_to_batch(file_path, items))
+    return batches
+
+
+def iter_export_batches_parallel(
+        dir_path: str,
+        max_workers: Optional[int] = None,
+        ordered: bool = True,
+        batch_size: int = DECODE_BATCH_SIZE,
+) -> Iterator[RecordBatch]:
+    """
+    多进程并行解码目录下的导出分片，逐个产出列式批次。
+
+    每个分片由一个 worker 整体解码，结果（该分片的全部批次）一次性传回主进程；
+    同时在途的分片不超过 max_workers * MAX_IN_FLIGHT_PER_WORKER 个，峰值内存约为这么多个分片解码后的大小，
+    消费方处理得慢时不再继续提交。
+
+    :param max_workers: 进程数，默认 CPU 核数
+    :param ordered:     True 按分片文件名顺序产出（与单进程读取顺序一致），队首分片较慢时后面已完成的结果会等待；
+                        False 哪个分片先解码完先产出，首批结果更快
+    """
+    files = find_export_files(dir_path)
+    print(f"Found {len(files)} export files to decode")
+    if not files:
+        return
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = max_workers * MAX_IN_FLIGHT_PER_WORKER
+    pending_files = iter(files)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        def __submit_next() -> Optional[Future]:
+            file_path = next(pending_files, None)
+            return None if file_path is None else pool.submit(decode_export_file, file_path, batch_size)
+
+        if ordered:
+            in_flight: Deque[Future] = deque()
+            for _ in range(max_in_flight):
+                fut = __submit_next()
+                if fut is None:
+                    break
+                in_flight.append(fut)
+            while in_flight:
+                batches = in_flight.popleft().result()
+                fut = __submit_next()
+                if fut is not None:
+                    in_flight.append(fut)
+                yield from batches
+        else:
+            not_done: Set[Future] = set()
+            for _ in range(max_in_flight):
+                fut = __submit_next()
+                if fut is None:
+                    break
+                not_done.add(fut)
+            while not_done:
+                done, not_done = wait(not_done, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    batches = fut.result()
+                    nxt = __submit_next()
+                    if nxt is not None:
+                        not_done.add(nxt)
+                    yield from batches
+
+
+def iter_export_items_parallel(
+        dir_path: str, max_workers: Optional[int] = None, ordered: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """iter_export_batches_parallel 的逐条版本，产出 Item dict。"""
+    for batch in iter_export_batches_parallel(dir_path, max_workers=max_workers, ordered=ordered):
+        yield from batch.to_items()
+
+# endregion 多进程并行解码
@@ -2,34 +2,20 @@ import argparse
 import functools
 import multiprocessing
 import os
-import platform
 import sys
 import time
-import traceback
-from datetime import datetime
 from multiprocessing.synchronize import Event
-from typing import Optional, List, Dict
-
-import boto3
-import boto3.session
-import botocore.exceptions
-from botocore.client import Config as BotoConfig
-from botocore.exceptions import ClientError
+from typing import List, Optional
 
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 os.chdir('..')
 sys.path.append(os.getcwd())
 
-from GameLift.fleet_info_consts import DT_FMT_M  # noqa: E402
-from GameLift.fleet_info_types import (  # noqa: E402
-    EnvFleetStatusRow, EnvFleetStatusTbl,
-    FleetAttribute, FleetCapacity, FleetLocationAttribute, FleetLocationCapacity
-)
-from utils.aws_client_error_handler import handle_expired_token_exception, print_err  # noqa: E402
-from utils.aws_client_helper import get_aws_profile  # noqa: E402
-from utils.aws_consts import AllEnvs, REGION_ABBR, REGION_TO_ABBR  # noqa: E402
-from utils.aws_urls import get_fleet_address  # noqa: E402
-from utils.TablePrinter.table_printer_consts import BoxDrawingChar  # noqa: E402
+from GameLift.fleet_fetch_engine import FleetFetchEngine, create_region_executor  # noqa: E402
+from GameLift.fleet_fetch_executors import EXECUTOR_KINDS, EXECUTOR_THREAD  # noqa: E402
+from GameLift.fleet_status_view import FleetStatusPublisher, process_print_fleet_status  # noqa: E402
+from utils.aws_client_error_handler import print_err  # noqa: E402
+from utils.aws_consts import AllEnvs, REGION_ABBR  # noqa: E402
 
 # region 配置项
 # ENV, SUB_ENV = AllEnvs.NemoTestComedy, ''
@@ -42,10 +28,15 @@ REGIONS = [  # 需要拉取的地区
 ]
 REFRESH_INTERVAL = 60  # 刷新间隔，单位：秒，注意：boto3 gamelift 接口并发有限，如果间隔过短，会导致接口服务过载
 POLLING_DURATION = 20  # 监控时长，单位：分
-ENABLE_TERMINAL_UPDATE = False
+EXECUTOR = EXECUTOR_THREAD  # 请求执行器：serial / thread / asyncio，可用 fleet_fetch_benchmark 对比后选择
+ENABLE_TERMINAL_UPDATE = True  # True：只重写变化的行；False：每次整屏重绘（终端不支持光标移动时使用）
+ENABLE_CAPACITY_HISTORY = True  # True：记录每次拉取的容量快照到本地（见 fleet_capacity_history），表格显示活跃趋势
 # endregion 配置项
 
-if REFRESH_INTERVAL < 30:
+# 请求复用 client 且经过自适应限速，不再需要靠拉长间隔来保护接口
+_MIN_REFRESH_INTERVAL = 15
+
+if REFRESH_INTERVAL < _MIN_REFRESH_INTERVAL:
     raise Exception('REFRESH_INTERVAL 太小，可能导致 gamelift client 过载')
 
 
@@ -61,315 +52,40 @@ def keyboard_interrupt_handler(func):
 
 
 @keyboard_interrupt_handler
-def process_get_fleet_location_status(env, sub_env, region: str, shared_output: dict, stop_event):
-    session = boto3.session.Session(region_name=region, profile_name=get_aws_profile(region, env.is_prod_aws))
-    client = session.client('gamelift', config=BotoConfig(connect_timeout=3, retries={"mode": "standard"}))
-
-    while not stop_event.is_set():
-        # 获取所有 Fleets Attributes
-        fleets_dict_all = []
-        next_token = None
-        is_token_expired = False
-        while True:
-            kwargs = {'NextToken': next_token} if next_token else {}
-            try:
-                data = client.describe_fleet_attributes(**kwargs)
-            except ClientError as e:
-                if 'security token included in the request is expired' in e.response['Error']['Message']:
-                    handle_expired_token_exception(session)
-                    is_token_expired = True
-                else:
-                    print(e, ''.join(list(reversed(traceback.format_tb(e.__traceback__)))), sep='\n')
-                break
-            except Exception as e:
-                print(e, ''.join(list(reversed(traceback.format_tb(e.__traceback__)))), sep='\n')
-                time.sleep(15)
-                continue
-            # 返回结构： https://boto3.amazonaws.com/v1/documentation/api/1.14.25/reference/services/gamelift.html#GameLift.Client.describe_fleet_attributes # noqa
-            if 'FleetAttributes' not in data:
-                raise Exception('Missing Key(FleetAttributes) in boto3 describe_fleet_attributes resp')
-
-            fleets_dict_all += data['FleetAttributes']
-            next_token = data.get('NextToken', '')
-            if not next_token:
-                break
-
-        # 筛选 Fleets Attributes
-        sub_env = sub_env if sub_env else ''
-        env_fleets_info_dict: Dict[str, FleetAttribute] = {
-            f['FleetId']: FleetAttribute.from_dict(f) for f in fleets_dict_all
-            if f['Name'].startswith(f'{env.name}--{sub_env}')
-        }
-        for k, v in env_fleets_info_dict.items():
-            env_fleets_info_dict[k].Region = region
-
-        output_key_na = f'{region}:NA:NA'
-        if not env_fleets_info_dict:
-            kwargs = {}
-            row_kwargs = {}
-            if is_token_expired:
-                kwargs['Name'] = 'AWS MFA Expired'
-                row_kwargs['Name'] = 'AWS MFA Expired'
-            shared_output[output_key_na] = EnvFleetStatusRow(SubEnv=int(sub_env), Region=region, **row_kwargs)
-            time.sleep(REFRESH_INTERVAL)
-            continue
-
-        if output_key_na in shared_output:
-            shared_output.pop(output_key_na)
-
-        env_fleets_location_attributes_dict: Dict[str, List[FleetLocationAttribute]] = {}
-        env_fleets_location_capacity_dict: Dict[str, List[FleetLocationCapacity]] = {}
-        env_fleets_capacity_dict: Dict[str, List[FleetCapacity]] = {}
-
-        support_multi_location = True
-        # 支持 multi location 的地区
-        for fleet_id in env_fleets_info_dict.keys():
-            # 支持 multi location 的地区 - 获取 Fleet Location Attribute
-            next_token = None
-            fleets_location_attrs: List[FleetLocationAttribute] = []
-            while True and support_multi_location:
-                try:
-                    kwargs = {'NextToken': next_token} if next_token else {}
-                    data = client.describe_fleet_location_attributes(FleetId=fleet_id, **kwargs)
-                    # print(f'describe_fleet_location_attributes: {data}')
-                except botocore.exceptions.ClientError as error:
-                    if error.response['Error']['Code'] == 'UnsupportedRegionException':
-                        support_multi_location = False
-                        break
-                    else:
-                        raise error
-                except Exception as e:
-                    print(e)
-                    print(''.join(list(reversed(traceback.format_tb(e.__traceback__)))))
-                    time.sleep(15)
-                    continue
-                if 'LocationAttributes' not in data:
-                    raise Exception('Missing Key(LocationAttributes) in boto3 describe_fleet_location_attributes resp')
-
-                fleets_location_attrs += [FleetLocationAttribute.from_dict(d) for d in data['LocationAttributes']]
-                next_token = data.get('NextToken', '')
-                if not next_token:
-                    break
-            env_fleets_location_attributes_dict[fleet_id] = fleets_location_attrs
-
-            # 支持 multi location 的地区 - 获取 Fleet Location Capacity
-            fleets_location_capacity: List[FleetLocationCapacity] = []
-            if support_multi_location:
-                for attr in fleets_location_attrs:
-                    try:
-                        data = client.describe_fleet_location_capacity(FleetId=fleet_id,
-                                                                       Location=attr.LocationState.Location)
-                        # print(f'describe_fleet_location_capacity: {data}')
-                    except Exception as e:
-                        print(e)
-                        print(''.join(list(reversed(traceback.format_tb(e.__traceback__)))))
-                        continue
-
-                    if 'FleetCapacity' not in data:
-                        raise Exception('Missing Key(FleetCapacity) in boto3 describe_fleet_location_capacity resp')
-                    fleets_location_capacity.append(FleetLocationCapacity.from_dict(data['FleetCapacity']))
-                env_fleets_location_capacity_dict[fleet_id] = fleets_location_capacity
-
-            # 支持 multi location 的地区 - 准备输出
-            if support_multi_location:
-                locations = set([attr.LocationState.Location for attr in fleets_location_attrs])
-                locations = locations.union([elem.Location for elem in fleets_location_capacity])
-                for location in locations:
-                    tmp_attrs_list: List[FleetLocationAttribute] = [
-                        elem for elem in fleets_location_attrs if elem.LocationState.Location == location
-                    ]
-                    tmp_capacity_list: List[FleetLocationCapacity] = [
-                        elem for elem in fleets_location_capacity if elem.Location == location
-                    ]
-                    fleet_location_attrs: FleetLocationAttribute = (
-                        tmp_attrs_list[0] if tmp_attrs_list
-                        else FleetLocationAttribute()
-                    )
-                    fleet_location_capacity: FleetLocationCapacity = (
-                        tmp_capacity_list[0] if tmp_capacity_list
-                        else FleetLocationCapacity(FleetId=fleet_id, Location=location)
-                    )
-
-                    shared_output[f'{region}:{fleet_id}:{location}'] = EnvFleetStatusRow(
-                        Region=region,
-                        SubEnv=int(env_fleets_info_dict[fleet_id].Name.split('--')[-1].split('-')[0]),
-                        FleetId=fleet_id,
-                        FleetType=env_fleets_info_dict[fleet_id].FleetType,
-                        Name=env_fleets_info_dict[fleet_id].Name,
-                        Name_href=get_fleet_address(region, fleet_id),
-                        CreateTime=env_fleets_info_dict[fleet_id].CreationTime.strftime(DT_FMT_M)[:-2],
-                        Status=env_fleets_info_dict[fleet_id].Status,
-                        InstanceType=fleet_location_capacity.InstanceType,
-                        Desired=fleet_location_capacity.InstanceCounts.get('DESIRED', -1),
-                        Minimum=fleet_location_capacity.InstanceCounts.get('MINIMUM', -1),
-                        Maximum=fleet_location_capacity.InstanceCounts.get('MAXIMUM', -1),
-                        Pending=fleet_location_capacity.InstanceCounts.get('PENDING', -1),
-                        Active=fleet_location_capacity.InstanceCounts.get('ACTIVE', -1),
-                        Idle=fleet_location_capacity.InstanceCounts.get('IDLE', -1),
-                        Terminating=fleet_location_capacity.InstanceCounts.get('TERMINATING', -1),
-                        InstanceLocation=location,
-                        LocationStatus=fleet_location_attrs.LocationState.Status,
-                    )
-            else:
-
-                # 不支持 multi location 的地区 - 获取 Fleet Capacity
-                env_fleets_capacity_dict_all = []
-                next_token = None
-                # 获取所有 fleet capacity
-                while True:
-                    fleet_ids = [f_id for f_id in env_fleets_info_dict.keys()]
-                    if not fleet_ids:
-                        break
-                    kwargs = {'NextToken': next_token} if next_token else {}
-                    try:
-                        data = client.describe_fleet_capacity(FleetIds=fleet_ids, **kwargs)
-                        # print(f'describe_fleet_capacity: {data}')
-                    except Exception as e:
-                        print(e)
-                        print(''.join(list(reversed(traceback.format_tb(e.__traceback__)))))
-                        time.sleep(10)
-                        continue
-                    # 返回结构：https://boto3.amazonaws.com/v1/documentation/api/1.14.25/reference/services/gamelift.html#GameLift.Client.describe_fleet_capacity
-                    if 'FleetCapacity' not in data:
-                        raise Exception('Missing Key(FleetCapacity) in boto3 describe_fleet_capacity resp')
-
-                    # print(data['FleetCapacity'])
-                    env_fleets_capacity_dict_all += data['FleetCapacity']
-                    next_token = data.get('NextToken', '')
-                    if not next_token:
-                        break
-
-                for fc in env_fleets_capacity_dict_all:
-                    fleet_capacity = FleetCapacity.from_dict(fc)
-                    fleet_capacity.LastCheckedDt = datetime.now()
-                    if fleet_capacity.FleetId in env_fleets_capacity_dict:
-                        env_fleets_capacity_dict[fleet_capacity.FleetId].append(fleet_capacity)
-                    else:
-                        env_fleets_capacity_dict[fleet_capacity.FleetId] = [fleet_capacity]
-
-                for fleet_id, fleet_attr in env_fleets_info_dict.items():
-                    # print('fleet_attr:', fleet_attr.to_dict())
-
-                    fleet_capacities: List[FleetCapacity] = env_fleets_capacity_dict.get(fleet_id, [])
-                    for fleet_capacity in fleet_capacities:
-                        if fleet_capacity is None:
-                            continue
-                        # print('\tfleet_capacity:', fleet_capacity.to_dict())
-                        shared_output[f'{region}:{fleet_id}:{fleet_capacity.Location}'] = EnvFleetStatusRow(
-                            Region=region,
-                            SubEnv=int(fleet_attr.Name.split('--')[-1].split('-')[0]),
-                            FleetId=fleet_attr.FleetId,
-                            FleetType=fleet_attr.FleetType,
-                            Name=fleet_attr.Name,
-                            Name_href=get_fleet_address(region, fleet_id),
-                            CreateTime=fleet_attr.CreationTime.strftime(DT_FMT_M)[:-2],
-                            Status=fleet_attr.Status,
-                            InstanceType=fleet_capacity.InstanceType,
-                            Desired=fleet_capacity.InstanceCounts.get('DESIRED', -1),
-                            Minimum=fleet_capacity.InstanceCounts.get('MINIMUM', -1),
-                            Maximum=fleet_capacity.InstanceCounts.get('MAXIMUM', -1),
-                            Pending=fleet_capacity.InstanceCounts.get('PENDING', -1),
-                            Active=fleet_capacity.InstanceCounts.get('ACTIVE', -1),
-                            Idle=fleet_capacity.InstanceCounts.get('IDLE', -1),
-                            Terminating=fleet_capacity.InstanceCounts.get('TERMINATING', -1),
-                            InstanceLocation=fleet_capacity.Location,
-                            LocationStatus='不支持',
-                        )
-
-        time.sleep(REFRESH_INTERVAL)
-
-
-def __mask_fleet_id(fleet_id: str) -> str:
-    tokens = fleet_id.split('-')
-    if len(tokens) < 2:
-        return fleet_id
-    return f'***-{tokens[-1]}'
-
-
-@keyboard_interrupt_handler
-def process_print_fleet_status(shared_output: Dict[str, EnvFleetStatusRow], stop_event: Event):
-    last_update_dt: datetime = datetime(2024, 1, 1)
-    while not stop_event.is_set():
-        if any(v.LastCheckedDt > last_update_dt for v in shared_output.values() if v.LastCheckedDt is not None):
-            table = EnvFleetStatusTbl()
-            for k, v in shared_output.items():
-                v.Region = REGION_TO_ABBR.get(v.Region, v.Region)
-                v.FleetId = __mask_fleet_id(v.FleetId)
-                v.FleetType = '按需OD' if v.FleetType == 'ON_DEMAND' else v.FleetType
-                table.insert_row(v)
-                last_update_dt = max(last_update_dt, v.LastCheckedDt) if v.LastCheckedDt is not None else last_update_dt
-
-            # 准备输出数据：表头行、表头分割行
-            lines = [table.get_table_header_str(), table.get_table_header_sep_str()]
-            # 准备输出数据：表行排序
-            rows_sorted: List[EnvFleetStatusRow] = table.get_sorted_rows(
-                order_by=['SubEnv', 'Region', 'Name', 'InstanceType', 'Status', 'InstanceLocation'],
-                ascending=[False, True, False, True, True, True],
-            )
-            # 准备输出数据：额外排序逻辑
-            rows_sorted.sort(key=lambda _row: REGIONS.index(str(REGION_ABBR[_row.Region])))
-
-            # 准备输出数据：数据行、数据分割行
-            row_prev: Optional[EnvFleetStatusRow] = None
-            for row in rows_sorted:
-                # If you don't know what you are doing, it's recommended to add the separator regarding to the sorting order. # noqa
-                # Otherwise, you may see same column value being separated into different chunks and the output looks weird. # noqa
-                row: EnvFleetStatusRow
-                if row_prev is not None and row_prev.Region != row.Region:
-                    lines.append(table.get_table_line_sep_str(
-                        sep_h=BoxDrawingChar.DOUBLE_HORIZONTAL,
-                        sep_v=BoxDrawingChar.VERTICAL_SINGLE_AND_HORIZONTAL_DOUBLE,
-                    ))
-                elif row_prev is not None and row_prev.InstanceType != row.InstanceType:
-                    lines.append(table.get_table_line_sep_str(
-                        sep_h=BoxDrawingChar.LIGHT_HORIZONTAL, sep_v=BoxDrawingChar.LIGHT_VERTICAL, dense=False
-                    ))
-                lines.append(table.get_table_line_str(row))
-                row_prev = row
-
-            # 输出表单
-            if ENABLE_TERMINAL_UPDATE:
-                pass
-            else:
-                sys_type = platform.system()
-                if sys_type == 'Windows':
-                    os.system('cls')
-                else:
-                    os.system('clear')
-                for line in lines:
-                    print(line)
-                print('\n', 'Ctrl+c 停止获取', sep='')
-
-        time.sleep(3)
+def process_get_fleet_location_status(env, sub_env, region: str, shared_output: dict, stop_event, executor: str):
+    # 每个地区进程一个引擎，执行器内的 client / 连接池 / 事件循环在整个轮询期间保持
+    engine = FleetFetchEngine(env, sub_env, region, create_region_executor(executor, region, env))
+    engine.run(shared_output, stop_event, REFRESH_INTERVAL)
 
 
 def fetch_fleet_status():
     stop_event: Event = multiprocessing.Event()
-
-    with multiprocessing.Manager() as manager:
-        shared_dict = manager.dict()
-
-        processes = []
-        for rgn in REGIONS:
-            process = multiprocessing.Process(
-                target=process_get_fleet_location_status, args=(ENV, SUB_ENV, rgn, shared_dict, stop_event,))
-            processes.append(process)
-            process.start()
-
-        process_print = multiprocessing.Process(
-            target=process_print_fleet_status, args=(shared_dict, stop_event,))
-        process_print.start()
-
-        try:
-            time.sleep(POLLING_DURATION * 60)  # 默认最长运行 20 分钟
-        except KeyboardInterrupt:
-            print('Keyboard Interrupted')
-        finally:
-            stop_event.set()
-            process_print.join()
-            for process in processes:
-                process.join()
-        print("All Processes completed.")
+    # 拉取进程把行增量推入队列，输出进程自己维护表状态，不再通过 Manager().dict() 逐 key 读取
+    delta_queue = multiprocessing.Queue()
+    publisher = FleetStatusPublisher(delta_queue)
+
+    processes = []
+    for rgn in REGIONS:
+        process = multiprocessing.Process(
+            target=process_get_fleet_location_status, args=(ENV, SUB_ENV, rgn, publisher, stop_event, EXECUTOR,))
+        processes.append(process)
+        process.start()
+
+    process_print = multiprocessing.Process(
+        target=process_print_fleet_status,
+        args=(delta_queue, stop_event, REGIONS, ENABLE_TERMINAL_UPDATE, ENABLE_CAPACITY_HISTORY,))
+    process_print.start()
+
+    try:
+        time.sleep(POLLING_DURATION * 60)  # 默认最长运行 20 分钟
+    except KeyboardInterrupt:
+        print('Keyboard Interrupted')
+    finally:
+        stop_event.set()
+        process_print.join()
+        for process in processes:
+            process.join()
+    print("All Processes completed.")
 
 
 def parse_args(args: List[str]):
@@ -401,6 +117,10 @@ def parse_args(args: List[str]):
                         help='脚本执行时长，单位：分钟',
                         default=None,
                         )
+    parser.add_argument('--executor', '-ex',
+                        help='请求执行器：serial 串行 / thread 线程池 / asyncio',
+                        choices=EXECUTOR_KINDS,
+                        default=None)
     return parser.parse_args(args)
 
 
@@ -411,9 +131,9 @@ def main():
     arg_env_name = args.environment_name
     arg_sub_env = args.sub_environment_name
     arg_regions: list[str] = args.regions if args.regions else []
-    arg_duration: int = int(args.duration)
+    arg_duration: Optional[int] = int(args.duration) if args.duration else None
 
-    global ENV, SUB_ENV, REGIONS, POLLING_DURATION
+    global ENV, SUB_ENV, REGIONS, POLLING_DURATION, EXECUTOR
 
     if arg_is_prod:
         if arg_env_name:
@@ -435,6 +155,7 @@ def main():
 
     REGIONS = arg_regions if arg_regions else REGIONS
     POLLING_DURATION = POLLING_DURATION if arg_duration is None else arg_duration
+    EXECUTOR = args.executor if args.executor else EXECUTOR
 
     fetch_fleet_status()
 
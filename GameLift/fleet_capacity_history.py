@@ -0,0 +1,357 @@
+"""
+GameLift fleet 容量历史：记录每次拉取到的 EnvFleetStatusRow 快照，扩缩容复盘直接查本地数据，不用重新轮询 AWS。
+
+    输出进程（process_print_fleet_status）
+      FleetStatusBoard.apply(delta) --> CapacityRecorder.record(row)
+                                          - 内存：每个 (region, fleet, location) 一个定长环形缓冲，供表格趋势列使用
+                                          - 磁盘：攒批写入 SQLite，主键 (region, fleet_id, location, ts_ms)，只追加
+
+只在输出进程内写库（单写者），拉取进程不感知。
+
+用法：
+    history = CapacityHistory()
+    samples = history.query_range(start_ms, end_ms, region='us-east-1', fleet_id='fleet-xxx')
+    buckets = downsample(samples, bucket_ms=60_000, agg='max')
+    print(sparkline([s.Active for s in samples]), percentiles([s.Active for s in samples]))
+
+命令行复盘：
+    python -m GameLift.fleet_capacity_history -rgn us-east-1 --since 90 --bucket 60  # 在仓库根目录执行
+
+历史文件路径（与 CloudWatch 事件缓存同目录）：
+  Windows: %LOCALAPPDATA%/AwsTools/gl_capacity.sqlite3
+  其他:     ~/.local/share/AwsTools/gl_capacity.sqlite3
+"""
+import argparse
+import sqlite3
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from GameLift.fleet_info_consts import DT_FMT_S
+from GameLift.fleet_info_types import EnvFleetStatusRow
+from services.cloudwatch.log_groups_cache import get_cache_dir
+
+RING_SIZE = 240         # 每个 (region, fleet, location) 在内存中保留的快照数，按 60 秒刷新约 4 小时
+RETENTION_DAYS = 30     # 磁盘历史保留天数，打开时清理
+SPARKLINE_WIDTH = 16    # 表格趋势列的宽度（字符）
+
+_DB_FILE_NAME = 'gl_capacity.sqlite3'
+_SQLITE_TIMEOUT = 30.0
+_FLUSH_INTERVAL = 10    # 攒批写盘的最长间隔（秒）
+_FLUSH_ROWS = 500       # 攒够这么多条立即写盘
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS capacity_samples (
+    region TEXT NOT NULL,
+    fleet_id TEXT NOT NULL,
+    location TEXT NOT NULL,
+    ts_ms INTEGER NOT NULL,
+    sub_env INTEGER NOT NULL,
+    fleet_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    minimum INTEGER NOT NULL,
+    maximum INTEGER NOT NULL,
+    desired INTEGER NOT NULL,
+    pending INTEGER NOT NULL,
+    active INTEGER NOT NULL,
+    idle INTEGER NOT NULL,
+    terminating INTEGER NOT NULL,
+    game_sessions INTEGER NOT NULL,
+    players INTEGER NOT NULL,
+    PRIMARY KEY (region, fleet_id, location, ts_ms)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_capacity_ts ON capacity_samples (ts_ms);
+"""
+_COLUMNS = (
+    'region, fleet_id, location, ts_ms, sub_env, fleet_name, status, minimum, maximum, '
+    'desired, pending, active, idle, terminating, game_sessions, players'
+)
+
+_SPARK_CHARS = '▁▂▃▄▅▆▇█'
+
+SeriesKey = Tuple[str, str, str]  # (region, fleet_id, location)
+
+
+class CapacitySample(NamedTuple):
+    Region: str
+    FleetId: str
+    Location: str
+    TsMs: int
+    SubEnv: int
+    Name: str
+    Status: str
+    Minimum: int
+    Maximum: int
+    Desired: int
+    Pending: int
+    Active: int
+    Idle: int
+    Terminating: int
+    GameSessions: int
+    Players: int
+
+    @property
+    def key(self) -> SeriesKey:
+        return self.Region, self.FleetId, self.Location
+
+    @property
+    def dt(self) -> datetime:
+        return datetime.fromtimestamp(self.TsMs / 1000)
+
+
+NUMERIC_FIELDS = (
+    'Minimum', 'Maximum', 'Desired', 'Pending', 'Active', 'Idle', 'Terminating', 'GameSessions', 'Players',
+)
+
+
+def sample_from_row(row: EnvFleetStatusRow) -> Optional[CapacitySample]:
+    """拉取进程产出的原始行（未脱敏）转成样本；占位行（无战斗服 / 凭证过期）返回 None。"""
+    if row.FleetId == 'NA' or row.LastCheckedDt is None:
+        return None
+    return CapacitySample(
+        Region=row.Region, FleetId=row.FleetId, Location=row.InstanceLocation,
+        TsMs=int(row.LastCheckedDt.timestamp() * 1000), SubEnv=int(row.SubEnv), Name=row.Name, Status=row.Status,
+        Minimum=row.Minimum, Maximum=row.Maximum, Desired=row.Desired, Pending=row.Pending, Active=row.Active,
+        Idle=row.Idle, Terminating=row.Terminating, GameSessions=row.GameSessions, Players=row.Players,
+    )
+
+
+# region 汇总
+
+def downsample(samples: Sequence[CapacitySample], bucket_ms: int, agg: str = 'last') -> List[CapacitySample]:
+    """
+    按 (序列, 时间桶) 聚合，每桶输出一个样本，时间戳为桶起点。
+    :param agg: last / max / min / avg，只作用于数值列；非数值列取桶内最后一条
+    """
+    if agg not in ('last', 'max', 'min', 'avg'):
+        raise ValueError(f'unsupported agg: {agg}')
+    buckets: Dict[Tuple[SeriesKey, int], List[CapacitySample]] = {}
+    for s in sorted(samples, key=lambda _s: _s.TsMs):
+        buckets.setdefault((s.key, s.TsMs - s.TsMs % bucket_ms), []).append(s)
+
+    result: List[CapacitySample] = []
+    for (_, bucket_start), items in buckets.items():
+        last = items[-1]
+        if agg == 'last':
+            values = {f: getattr(last, f) for f in NUMERIC_FIELDS}
+        elif agg == 'avg':
+            values = {f: round(sum(getattr(s, f) for s in items) / len(items)) for f in NUMERIC_FIELDS}
+        else:
+            fn = max if agg == 'max' else min
+            values = {f: fn(getattr(s, f) for s in items) for f in NUMERIC_FIELDS}
+        result.append(last._replace(TsMs=bucket_start, **values))
+    result.sort(key=lambda _s: (_s.key, _s.TsMs))
+    return result
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """线性插值百分位，p 取 0~100；values 为空时返回 -1（与行里的缺省值一致）。"""
+    if not values:
+        return -1
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * p / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def percentiles(values: Sequence[float], ps: Iterable[float] = (50, 95, 100)) -> str:
+    """形如 '12/30/31' 的百分位摘要；负值（未取到）忽略。"""
+    values = [v for v in values if v >= 0]
+    return '/'.join(f'{percentile(values, p):g}' for p in ps)
+
+
+def sparkline(values: Sequence[float], width: int = SPARKLINE_WIDTH) -> str:
+    """取最近 width 个值画迷你折线；全相同时画一条底线。负值（未取到）忽略。"""
+    values = [v for v in values if v >= 0][-width:]
+    if not values:
+        return ''
+    lo, hi = min(values), max(values)
+    if hi == lo:
+        return _SPARK_CHARS[0] * len(values)
+    scale = (len(_SPARK_CHARS) - 1) / (hi - lo)
+    return ''.join(_SPARK_CHARS[int(round((v - lo) * scale))] for v in values)
+
+# endregion 汇总
+
+
+class CapacityHistory:
+    """磁盘上的容量历史（SQLite）。每次操作新开连接。"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = str(db_path) if db_path is not None else str(get_cache_dir() / _DB_FILE_NAME)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=_SQLITE_TIMEOUT)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def append(self, samples: Sequence[CapacitySample]) -> None:
+        if not samples:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                f'INSERT OR IGNORE INTO capacity_samples ({_COLUMNS}) VALUES ({",".join("?" * 16)})', samples,
+            )
+
+    def query_range(
+            self, start_ms: int, end_ms: int,
+            region: Optional[str] = None, fleet_id: Optional[str] = None, location: Optional[str] = None,
+            sub_env: Optional[int] = None,
+    ) -> List[CapacitySample]:
+        """[start_ms, end_ms] 内的样本，按 (region, fleet_id, location, ts_ms) 排序；过滤条件为 None 表示不限。"""
+        where = ['ts_ms BETWEEN ? AND ?']
+        params: list = [start_ms, end_ms]
+        for col, value in (('region', region), ('fleet_id', fleet_id), ('location', location), ('sub_env', sub_env)):
+            if value is not None:
+                where.append(f'{col} = ?')
+                params.append(value)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f'SELECT {_COLUMNS} FROM capacity_samples WHERE {" AND ".join(where)} '
+                f'ORDER BY region, fleet_id, location, ts_ms',
+                params,
+            ).fetchall()
+        return [CapacitySample(*r) for r in rows]
+
+    def latest(self, key: SeriesKey, limit: int) -> List[CapacitySample]:
+        """某条序列最近 limit 个样本，按时间升序。"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f'SELECT {_COLUMNS} FROM capacity_samples WHERE region = ? AND fleet_id = ? AND location = ? '
+                f'ORDER BY ts_ms DESC LIMIT ?',
+                (*key, limit),
+            ).fetchall()
+        return [CapacitySample(*r) for r in reversed(rows)]
+
+    def prune(self, older_than_days: int = RETENTION_DAYS) -> int:
+        cutoff_ms = int((time.time() - older_than_days * 86400) * 1000)
+        with self._connect() as conn:
+            return conn.execute('DELETE FROM capacity_samples WHERE ts_ms < ?', (cutoff_ms,)).rowcount
+
+
+class CapacityRecorder:
+    """
+    输出进程内的记录器：内存环形缓冲 + 攒批写盘。
+    :param history: None 时只保留内存缓冲（不落盘）
+    """
+
+    def __init__(self, history: Optional[CapacityHistory] = None, ring_size: int = RING_SIZE):
+        self.history = history
+        self.ring_size = ring_size
+        self.rings: Dict[SeriesKey, Deque[CapacitySample]] = {}
+        self._pending: List[CapacitySample] = []
+        self._last_flush = time.monotonic()
+
+    def _ring(self, key: SeriesKey) -> Deque[CapacitySample]:
+        ring = self.rings.get(key)
+        if ring is None:
+            # 新序列先用磁盘上的最近样本填充，重启后趋势列不用从零开始
+            history = self.history.latest(key, self.ring_size) if self.history is not None else []
+            ring = self.rings[key] = deque(history, maxlen=self.ring_size)
+        return ring
+
+    def record(self, row: EnvFleetStatusRow) -> Optional[CapacitySample]:
+        sample = sample_from_row(row)
+        if sample is None:
+            return None
+        ring = self._ring(sample.key)
+        if ring and ring[-1].TsMs >= sample.TsMs:
+            return None
+        ring.append(sample)
+        if self.history is not None:
+            self._pending.append(sample)
+            if len(self._pending) >= _FLUSH_ROWS:
+                self.flush()
+        return sample
+
+    def flush_if_due(self) -> None:
+        if self._pending and time.monotonic() - self._last_flush >= _FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if self.history is None or not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        try:
+            self.history.append(pending)
+        except sqlite3.Error as e:
+            # 写盘失败不影响看板，丢弃这批样本（内存缓冲仍保留）
+            print(f'容量历史写入失败: {e}')
+
+    def series(self, key: SeriesKey, field_name: str = 'Active') -> List[int]:
+        ring = self.rings.get(key)
+        return [getattr(s, field_name) for s in ring] if ring else []
+
+    def trend(self, row: EnvFleetStatusRow, field_name: str = 'Active') -> str:
+        """表格趋势列：最近若干次的迷你折线 + 内存窗口内的 P50/P95/Max。"""
+        values = self.series((row.Region, row.FleetId, row.InstanceLocation), field_name)
+        if not values:
+            return ''
+        return f'{sparkline(values)} {percentiles(values)}'
+
+
+# region 命令行复盘
+
+def parse_args(args: List[str]):
+    parser = argparse.ArgumentParser(
+        description='查看本地记录的 fleet 容量历史（由 env_fleet_status_fetcher 运行时记录）',
+        epilog='用例：python -m GameLift.fleet_capacity_history -rgn us-east-1 --since 90 --bucket 60 --agg max'
+    )
+    parser.add_argument('--regions', '-rgn', help='地区，不填表示全部', nargs='+', default=None)
+    parser.add_argument('--fleet-id', '-fid', help='fleet id，不填表示全部', default=None)
+    parser.add_argument('--location', '-loc', help='实例地区，不填表示全部', default=None)
+    parser.add_argument('--since', help='查看最近多少分钟', type=int, default=60)
+    parser.add_argument('--bucket', help='降采样时间桶，单位：秒；0 表示不降采样', type=int, default=60)
+    parser.add_argument('--agg', help='降采样聚合方式', choices=['last', 'max', 'min', 'avg'], default='last')
+    parser.add_argument('--prune-days', help='清理多少天前的历史', type=int, default=None)
+    return parser.parse_args(args)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    history = CapacityHistory()
+    if args.prune_days is not None:
+        print(f'已清理 {history.prune(args.prune_days)} 条')
+        return
+
+    end_ms = int(time.time() * 1000)
+    start_ms = end_ms - args.since * 60 * 1000
+    regions = args.regions or [None]
+    samples: List[CapacitySample] = []
+    for rgn in regions:
+        samples += history.query_range(start_ms, end_ms, region=rgn, fleet_id=args.fleet_id, location=args.location)
+    if not samples:
+        print(f'最近 {args.since} 分钟没有记录，确认 env_fleet_status_fetcher 运行时 ENABLE_CAPACITY_HISTORY = True')
+        return
+    if args.bucket > 0:
+        samples = downsample(samples, args.bucket * 1000, args.agg)
+
+    series: Dict[SeriesKey, List[CapacitySample]] = {}
+    for s in samples:
+        series.setdefault(s.key, []).append(s)
+    for key, items in series.items():
+        print(f'== {items[-1].Name} {" ".join(key)} ({len(items)} 点)')
+        for field_name in ('Desired', 'Active', 'Idle', 'GameSessions', 'Players'):
+            values = [getattr(s, field_name) for s in items]
+            print(f'  {field_name:<12} {sparkline(values, width=60):<60} P50/P95/Max={percentiles(values)}')
+        for s in items:
+            print(f'  {s.dt.strftime(DT_FMT_S)}  {s.Status:<10} 所需={s.Desired:<4} 活跃={s.Active:<4} '
+                  f'空闲={s.Idle:<4} 对局={s.GameSessions:<5} 玩家={s.Players}')
+
+
+if __name__ == '__main__':
+    main()
+
+# endregion 命令行复盘
@@ -0,0 +1,239 @@
+"""
+执行器基准测试：在桩 gamelift 后端上分别用 serial / thread / asyncio 执行器跑 FleetFetchEngine.fetch_once，对比耗时。
+
+桩后端不访问 AWS：按参数生成 fleet / location，每次调用等待 latency 模拟网络往返，并统计各接口调用次数。
+每个执行器的首轮包含 multi location 探测与 client 创建，单独列为 首轮(s)，不计入平均。
+
+用法：
+    python GameLift/fleet_fetch_benchmark.py --fleets 40 --locations 3 --latency-ms 80 --rounds 5
+    python GameLift/fleet_fetch_benchmark.py --fleets 200 --single-location -ex thread asyncio
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import ClassVar, Dict, List
+
+from botocore.exceptions import ClientError
+
+sys.path.append(os.getcwd())
+from GameLift.fleet_fetch_engine import FleetFetchEngine  # noqa: E402
+from GameLift.fleet_fetch_executors import EXECUTOR_ASYNCIO, EXECUTOR_KINDS, create_executor  # noqa: E402
+from utils.aws_consts import AllEnvs  # noqa: E402
+from utils.TablePrinter.table_printer import BaseRow, BaseTable, ColumnConfig  # noqa: E402
+
+_REGION = 'us-east-1'
+_SUB_ENV = '141270'
+_PAGE_SIZE = 50  # 桩 describe_fleet_attributes / describe_fleet_location_attributes 每页条数
+
+
+class StubGameLiftBackend:
+    """
+    生成 fleet_count 个 fleet，每个 fleet 有 locations_per_fleet 个 location（首个为主地区）。
+    :param multi_location: False 时 describe_fleet_location_attributes 抛 UnsupportedRegionException
+    """
+
+    def __init__(self, fleet_count: int, locations_per_fleet: int, latency: float, multi_location: bool = True):
+        self.latency = latency
+        self.multi_location = multi_location
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+        env_name = AllEnvs.PartyAnimals.name
+        created = datetime.now() - timedelta(days=1)
+        self.fleets = [
+            {
+                'FleetId': f'fleet-{i:08x}', 'FleetType': 'ON_DEMAND', 'Name': f'{env_name}--{_SUB_ENV}-gs-{i}',
+                'CreationTime': created, 'TerminationTime': created, 'Status': 'ACTIVE',
+            }
+            for i in range(fleet_count)
+        ]
+        # 不属于当前子环境的 fleet，验证筛选
+        self.fleets += [dict(f, FleetId=f'{f["FleetId"]}-other', Name=f'{env_name}--999999-gs') for f in self.fleets[:2]]
+        self.locations = [_REGION] + [f'{_REGION}-loc{j}' for j in range(1, locations_per_fleet)]
+
+    def _record(self, api: str) -> None:
+        with self._lock:
+            self.calls[api] += 1
+
+    @staticmethod
+    def _page(items: list, resp_key: str, next_token=None) -> dict:
+        start = int(next_token) if next_token else 0
+        data = {resp_key: items[start:start + _PAGE_SIZE]}
+        if start + _PAGE_SIZE < len(items):
+            data['NextToken'] = str(start + _PAGE_SIZE)
+        return data
+
+    @staticmethod
+    def _counts(fleet_id: str, location: str) -> dict:
+        n = (sum(map(ord, fleet_id + location)) % 7) + 1
+        return {'DESIRED': n, 'MINIMUM': 0, 'MAXIMUM': 10, 'PENDING': 0, 'ACTIVE': n, 'IDLE': 1, 'TERMINATING': 0}
+
+    def describe_fleet_attributes(self, NextToken=None) -> dict:
+        self._record('describe_fleet_attributes')
+        return self._page(self.fleets, 'FleetAttributes', NextToken)
+
+    def describe_fleet_location_attributes(self, FleetId: str, NextToken=None) -> dict:
+        self._record('describe_fleet_location_attributes')
+        if not self.multi_location:
+            raise ClientError(
+                {'Error': {'Code': 'UnsupportedRegionException', 'Message': 'unsupported'}},
+                'DescribeFleetLocationAttributes')
+        attrs = [{'LocationState': {'Location': loc, 'Status': 'ACTIVE'}, 'StoppedActions': []}
+                 for loc in self.locations]
+        return self._page(attrs, 'LocationAttributes', NextToken)
+
+    def describe_fleet_location_capacity(self, FleetId: str, Location: str) -> dict:
+        self._record('describe_fleet_location_capacity')
+        return {'FleetCapacity': {'FleetId': FleetId, 'InstanceType': 'c5.large', 'Location': Location,
+                                  'InstanceCounts': self._counts(FleetId, Location)}}
+
+    def describe_fleet_capacity(self, FleetIds: List[str], NextToken=None) -> dict:
+        self._record('describe_fleet_capacity')
+        return {'FleetCapacity': [{'FleetId': fid, 'InstanceType': 'c5.large', 'Location': _REGION,
+                                   'InstanceCounts': self._counts(fid, _REGION)} for fid in FleetIds]}
+
+    def describe_fleet_utilization(self, FleetIds: List[str], NextToken=None) -> dict:
+        self._record('describe_fleet_utilization')
+        return {'FleetUtilization': [{'FleetId': fid, 'Location': _REGION, 'ActiveServerProcessCount': 1,
+                                      'ActiveGameSessionCount': 2, 'CurrentPlayerSessionCount': 8,
+                                      'MaximumPlayerSessionCount': 16} for fid in FleetIds]}
+
+
+class StubGameLiftClient:
+    """同步桩 client：每次调用 time.sleep(latency)。"""
+
+    def __init__(self, backend: StubGameLiftBackend):
+        self.backend = backend
+
+    def __getattr__(self, api: str):
+        api_fn = getattr(self.backend, api)
+
+        def __call(**kwargs):
+            time.sleep(self.backend.latency)
+            return api_fn(**kwargs)
+
+        return __call
+
+
+class StubGameLiftClientAsync:
+    """异步桩 client：每次调用 await asyncio.sleep(latency)。"""
+
+    def __init__(self, backend: StubGameLiftBackend):
+        self.backend = backend
+
+    def __getattr__(self, api: str):
+        api_fn = getattr(self.backend, api)
+
+        async def __call(**kwargs):
+            await asyncio.sleep(self.backend.latency)
+            return api_fn(**kwargs)
+
+        return __call
+
+
+def create_stub_executor(kind: str, backend: StubGameLiftBackend):
+    if kind == EXECUTOR_ASYNCIO:
+        @asynccontextmanager
+        async def __open_client():
+            yield StubGameLiftClientAsync(backend)
+
+        return create_executor(kind, __open_client)
+    return create_executor(kind, lambda: StubGameLiftClient(backend))
+
+
+@dataclass
+class FetchBenchmarkRow(BaseRow):
+    Executor: str = ''
+    __Executor_config: ClassVar[ColumnConfig] = ColumnConfig(alias='执行器')
+    Rows: int = 0
+    __Rows_config: ClassVar[ColumnConfig] = ColumnConfig(alias='行数')
+    CallsPerRound: int = 0
+    __CallsPerRound_config: ClassVar[ColumnConfig] = ColumnConfig(alias='每轮请求')
+    FirstRound: str = ''
+    __FirstRound_config: ClassVar[ColumnConfig] = ColumnConfig(alias='首轮(s)')
+    AvgRound: str = ''
+    __AvgRound_config: ClassVar[ColumnConfig] = ColumnConfig(alias='平均(s)')
+    MaxRound: str = ''
+    __MaxRound_config: ClassVar[ColumnConfig] = ColumnConfig(alias='最慢(s)')
+    Speedup: str = ''
+    __Speedup_config: ClassVar[ColumnConfig] = ColumnConfig(alias='相对串行')
+
+
+class FetchBenchmarkTbl(BaseTable):
+    row_type = FetchBenchmarkRow
+
+
+def benchmark_executor(kind: str, backend: StubGameLiftBackend, rounds: int) -> Dict:
+    engine = FleetFetchEngine(AllEnvs.PartyAnimals, _SUB_ENV, _REGION, create_stub_executor(kind, backend))
+    durations: List[float] = []
+    result = None
+    try:
+        for _ in range(rounds + 1):
+            t_start = time.perf_counter()
+            result = engine.fetch_once()
+            durations.append(time.perf_counter() - t_start)
+    finally:
+        engine.executor.close()
+    steady = durations[1:] or durations
+    return {
+        'rows': len(result.rows), 'calls': result.call_count, 'first': durations[0],
+        'avg': sum(steady) / len(steady), 'max': max(steady),
+    }
+
+
+def run_benchmark(
+        executors: List[str], fleet_count: int, locations_per_fleet: int, latency: float, rounds: int,
+        multi_location: bool = True,
+) -> FetchBenchmarkTbl:
+    table = FetchBenchmarkTbl()
+    stats: Dict[str, Dict] = {}
+    for kind in executors:
+        backend = StubGameLiftBackend(fleet_count, locations_per_fleet, latency, multi_location)
+        stats[kind] = benchmark_executor(kind, backend, rounds)
+        print(f'{kind:<8} 完成，调用次数: {dict(backend.calls)}')
+
+    baseline = stats.get(EXECUTOR_KINDS[0], {}).get('avg')
+    for kind, s in stats.items():
+        table.insert_row(FetchBenchmarkRow(
+            Executor=kind, Rows=s['rows'], CallsPerRound=s['calls'], FirstRound=f'{s["first"]:.3f}',
+            AvgRound=f'{s["avg"]:.3f}', MaxRound=f'{s["max"]:.3f}',
+            Speedup=f'{baseline / s["avg"]:.1f}x' if baseline and s['avg'] else '-',
+        ))
+    return table
+
+
+def parse_args(args: List[str]):
+    parser = argparse.ArgumentParser(
+        description='在桩 gamelift 后端上对比 fleet 状态拉取执行器',
+        epilog='用例：python fleet_fetch_benchmark.py --fleets 40 --locations 3 --latency-ms 80'
+    )
+    parser.add_argument('--executors', '-ex', help='参与对比的执行器', nargs='+', choices=EXECUTOR_KINDS,
+                        default=EXECUTOR_KINDS)
+    parser.add_argument('--fleets', help='子环境 fleet 数', type=int, default=40)
+    parser.add_argument('--locations', help='每个 fleet 的 location 数', type=int, default=3)
+    parser.add_argument('--latency-ms', help='每次调用的模拟延迟，单位：毫秒', type=float, default=80)
+    parser.add_argument('--rounds', help='首轮之后计时的轮数', type=int, default=3)
+    parser.add_argument('--single-location', help='模拟不支持 multi location 的地区', action='store_true',
+                        default=False)
+    return parser.parse_args(args)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    print(f'fleet={args.fleets} location/fleet={args.locations} latency={args.latency_ms}ms '
+          f'rounds={args.rounds} multi_location={not args.single_location}')
+    table = run_benchmark(
+        args.executors, args.fleets, args.locations, args.latency_ms / 1000, args.rounds,
+        multi_location=not args.single_location,
+    )
+    table.print_table()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+"""
+GameLift fleet 状态拉取引擎：请求规划、行构造、缓存只有这一份，发请求交给可替换的执行器（见 fleet_fetch_executors）。
+
+每轮（fetch_once）分阶段执行，同一阶段内的请求互不依赖，由执行器决定串行还是并发：
+    1. describe_fleet_attributes，按 <env>--<sub_env> 前缀筛选
+    2. 支持 multi location 的地区：utilization 分批 + 每个 fleet 的 location 属性
+       不支持的地区：          utilization 分批 + capacity 分批
+    3. 支持 multi location 的地区：全部 (fleet, location) 的 location capacity
+
+跨轮次缓存：执行器里的 client / 连接池、地区是否支持 multi location、AioSession。
+
+用法：
+    engine = FleetFetchEngine(env, sub_env, region, create_region_executor(EXECUTOR_ASYNCIO, region, env))
+    engine.run(shared_output, stop_event, refresh_interval=60)   # 按固定网格轮询，直到 stop_event 被设置
+
+执行器的选择可以用 fleet_fetch_benchmark 在桩后端上对比。
+"""
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from multiprocessing.synchronize import Event
+from typing import Dict, List, Optional, Union
+
+from aiobotocore.session import AioSession
+from botocore.client import Config as BotoConfig
+from botocore.exceptions import ClientError
+
+from GameLift.fleet_fetch_executors import (
+    EXECUTOR_ASYNCIO, MAX_CONCURRENT_REQUESTS, FetchExecutor, create_executor, print_exception,
+)
+from GameLift.fleet_info_consts import DT_FMT_M
+from GameLift.fleet_info_types import (
+    EnvFleetStatusRow,
+    FleetAttribute, FleetCapacity, FleetLocationAttribute, FleetLocationCapacity, FleetUtilization
+)
+from GameLift.fleet_request_planner import (
+    group_capacity, group_utilization, match_utilization, plan_capacity_calls, plan_fleet_attributes_call,
+    plan_location_attribute_calls, plan_location_capacity_calls, plan_location_requests, plan_utilization_calls,
+)
+from utils.adaptive_rate_control import install_adaptive_rate_control
+from utils.aws_client_error_handler import handle_expired_token_exception
+from utils.aws_client_helper import get_aws_profile
+from utils.aws_client_pool import get_client, get_session
+from utils.aws_consts import Env
+from utils.aws_urls import get_fleet_address
+
+GAMELIFT_BOTO_CONFIG = BotoConfig(
+    connect_timeout=3, retries={"mode": "standard"}, max_pool_connections=MAX_CONCURRENT_REQUESTS * 2,
+)
+
+_AIOSESSION_CACHE: Dict[str, AioSession] = {}  # Cache for AioSession
+_TOKEN_EXPIRED_MESSAGES = (
+    'security token included in the request is expired',
+    'security token included in the request is invalid',
+)
+
+
+# region client
+
+def _aiosession_key(region: str, env: Env) -> str:
+    return f'{region}:{env.is_prod_aws}'
+
+
+def get_cached_aiosession(region: str, env: Env) -> AioSession:
+    key = _aiosession_key(region, env)
+    if key not in _AIOSESSION_CACHE:
+        _AIOSESSION_CACHE[key] = AioSession(profile=get_aws_profile(region, env.is_prod_aws))
+    return _AIOSESSION_CACHE[key]
+
+
+@asynccontextmanager
+async def open_gamelift_client_async(region: str, env: Env):
+    """创建挂好自适应限速的 aiobotocore gamelift client（async with 作用域内复用同一个连接池）。"""
+    session = get_cached_aiosession(region=region, env=env)
+    async with session.create_client('gamelift', region_name=region, config=GAMELIFT_BOTO_CONFIG) as client:
+        install_adaptive_rate_control(client, account=session.profile, is_async=True)
+        yield client
+
+
+def create_region_executor(kind: str, region: str, env: Env) -> FetchExecutor:
+    """按执行器类型创建连接真实 gamelift 的执行器。"""
+    if kind == EXECUTOR_ASYNCIO:
+        return create_executor(kind, lambda: open_gamelift_client_async(region, env))
+    profile = get_aws_profile(region, env.is_prod_aws)
+    return create_executor(
+        kind, lambda: get_client('gamelift', region, profile, config=GAMELIFT_BOTO_CONFIG, adaptive=True))
+
+
+def is_token_expired_error(e: ClientError) -> bool:
+    err_msg = e.response.get('Error', {}).get('Message', '')
+    return any(msg in err_msg for msg in _TOKEN_EXPIRED_MESSAGES)
+
+# endregion client
+
+
+# region 行构造
+
+def filter_env_fleets(fleets_attr_all: List[dict], env: Env, sub_env: str, region: str) -> Dict[str, FleetAttribute]:
+    env_fleets_info_dict: Dict[str, FleetAttribute] = {
+        f['FleetId']: FleetAttribute.from_dict(f) for f in fleets_attr_all
+        if f['Name'].startswith(f'{env.name}--{sub_env}')
+    }
+    for fleet_attr in env_fleets_info_dict.values():
+        fleet_attr.Region = region
+    return env_fleets_info_dict
+
+
+def build_fleet_status_row(
+        region: str, fleet_attr: FleetAttribute, capacity: Union[FleetCapacity, FleetLocationCapacity],
+        utilization: FleetUtilization, location: str, location_status: str,
+) -> EnvFleetStatusRow:
+    fleet_id = fleet_attr.FleetId
+    return EnvFleetStatusRow(
+        Region=region,
+        SubEnv=int(fleet_attr.Name.split('--')[-1].split('-')[0]),
+        FleetId=fleet_id,
+        FleetType=fleet_attr.FleetType,
+        Name=fleet_attr.Name,
+        Name_href=get_fleet_address(region, fleet_id),
+        CreateTime=fleet_attr.CreationTime.strftime(DT_FMT_M)[:-2],
+        Status=fleet_attr.Status,
+        InstanceType=capacity.InstanceType,
+        Desired=capacity.InstanceCounts.get('DESIRED', -1),
+        Minimum=capacity.InstanceCounts.get('MINIMUM', -1),
+        Maximum=capacity.InstanceCounts.get('MAXIMUM', -1),
+        Pending=capacity.InstanceCounts.get('PENDING', -1),
+        Active=capacity.InstanceCounts.get('ACTIVE', -1),
+        Idle=capacity.InstanceCounts.get('IDLE', -1),
+        Terminating=capacity.InstanceCounts.get('TERMINATING', -1),
+        GameSessions=utilization.ActiveGameSessionCount,
+        Players=utilization.CurrentPlayerSessionCount,
+        InstanceLocation=location,
+        LocationStatus=location_status,
+    )
+
+
+def build_multi_location_rows(
+        region: str,
+        fleets: Dict[str, FleetAttribute],
+        location_attrs_all: Dict[str, List[FleetLocationAttribute]],
+        location_capacity_all: Dict[str, List[FleetLocationCapacity]],
+        utilization_all: Dict[str, FleetUtilization],
+) -> Dict[str, EnvFleetStatusRow]:
+    rows: Dict[str, EnvFleetStatusRow] = {}
+    for fleet_id, fleet_attr in fleets.items():
+        fleets_location_attrs = location_attrs_all.get(fleet_id, [])
+        fleets_location_capacity = location_capacity_all.get(fleet_id, [])
+
+        locations = set([attr.LocationState.Location for attr in fleets_location_attrs])
+        locations = locations.union([elem.Location for elem in fleets_location_capacity])
+        for location in locations:
+            fleet_location_attrs: FleetLocationAttribute = next(
+                (elem for elem in fleets_location_attrs if elem.LocationState.Location == location),
+                FleetLocationAttribute(),
+            )
+            fleet_location_capacity: FleetLocationCapacity = next(
+                (elem for elem in fleets_location_capacity if elem.Location == location),
+                FleetLocationCapacity(FleetId=fleet_id, Location=location),
+            )
+            fleet_utilization = match_utilization(utilization_all, fleet_id, location) or FleetUtilization(fleet_id)
+            rows[f'{region}:{fleet_id}:{location}'] = build_fleet_status_row(
+                region, fleet_attr, fleet_location_capacity, fleet_utilization,
+                location=location, location_status=fleet_location_attrs.LocationState.Status,
+            )
+    return rows
+
+
+def build_home_location_rows(
+        region: str,
+        fleets: Dict[str, FleetAttribute],
+        capacity_all: Dict[str, List[FleetCapacity]],
+        utilization_all: Dict[str, FleetUtilization],
+) -> Dict[str, EnvFleetStatusRow]:
+    rows: Dict[str, EnvFleetStatusRow] = {}
+    for fleet_id, fleet_attr in fleets.items():
+        for fleet_capacity in capacity_all.get(fleet_id, []):
+            if fleet_capacity is None:
+                continue
+            fleet_utilization = (
+                match_utilization(utilization_all, fleet_id, fleet_capacity.Location) or FleetUtilization(fleet_id)
+            )
+            rows[f'{region}:{fleet_id}:{fleet_capacity.Location}'] = build_fleet_status_row(
+                region, fleet_attr, fleet_capacity, fleet_utilization,
+                location=fleet_capacity.Location, location_status='不支持',
+            )
+    return rows
+
+# endregion 行构造
+
+
+@dataclass
+class FleetFetchResult:
+    rows: Dict[str, EnvFleetStatusRow] = field(default_factory=dict)
+    is_token_expired: bool = False
+    call_count: int = 0  # 本轮执行的 GameLiftCall 数（分页算一次）
+
+
+class FleetFetchEngine:
+    """
+    单个地区的 fleet 状态拉取。
+    :param executor: 执行器，引擎负责在 run 结束时关闭
+    """
+
+    def __init__(self, env: Env, sub_env: str, region: str, executor: FetchExecutor):
+        self.env = env
+        self.sub_env = sub_env if sub_env else ''
+        self.region = region
+        self.executor = executor
+        self.has_multiloc: Optional[bool] = None  # 地区是否支持 multi location，首轮探测后缓存
+
+    def _run(self, calls, result: FleetFetchResult) -> list:
+        result.call_count += len(calls)
+        return self.executor.run(calls)
+
+    def _handle_token_expired(self) -> None:
+        """提示 aws-mfa 命令，丢弃 session / client，下一轮按新凭证重建。"""
+        handle_expired_token_exception(get_session(get_aws_profile(self.region, self.env.is_prod_aws), self.region))
+        _AIOSESSION_CACHE.pop(_aiosession_key(self.region, self.env), None)
+        self.executor.reset_client()
+
+    def _probe_multiloc(self, fleet_id: str, result: FleetFetchResult) -> bool:
+        resp, = self._run(plan_location_attribute_calls([fleet_id]), result)
+        if isinstance(resp, ClientError):
+            if resp.response['Error']['Code'] == 'UnsupportedRegionException':
+                return False
+            raise resp
+        return True
+
+    def fetch_once(self) -> FleetFetchResult:
+        result = FleetFetchResult()
+
+        # 获取所有 Fleets Attributes
+        fleets_attr_all, = self._run([plan_fleet_attributes_call()], result)
+        if isinstance(fleets_attr_all, ClientError):
+            if is_token_expired_error(fleets_attr_all):
+                result.is_token_expired = True
+                self._handle_token_expired()
+            else:
+                print_exception(fleets_attr_all)
+            fleets_attr_all = []
+
+        fleets = filter_env_fleets(fleets_attr_all, self.env, self.sub_env, self.region)
+        if not fleets:
+            return result
+        fleet_ids = list(fleets.keys())
+
+        if self.has_multiloc is None:
+            self.has_multiloc = self._probe_multiloc(fleet_ids[0], result)
+
+        utilization_calls = plan_utilization_calls(fleet_ids)
+        if self.has_multiloc:
+            # 支持 multi location 的地区：utilization 与 location 属性同一阶段，再按 (fleet, location) 拉取容量
+            resps = self._run(utilization_calls + plan_location_attribute_calls(fleet_ids), result)
+            utilization_all = group_utilization([u for r in resps[:len(utilization_calls)] for u in r])
+            location_attrs_all: Dict[str, List[FleetLocationAttribute]] = {}
+            for fleet_id, resp in zip(fleet_ids, resps[len(utilization_calls):]):
+                if isinstance(resp, ClientError):
+                    raise resp
+                location_attrs_all[fleet_id] = [FleetLocationAttribute.from_dict(d) for d in resp]
+
+            requests = plan_location_requests(location_attrs_all)
+            location_capacity_all: Dict[str, List[FleetLocationCapacity]] = {fleet_id: [] for fleet_id in fleet_ids}
+            for (fleet_id, _), resp in zip(requests, self._run(plan_location_capacity_calls(requests), result)):
+                if resp is not None:
+                    location_capacity_all[fleet_id].append(FleetLocationCapacity.from_dict(resp))
+
+            result.rows = build_multi_location_rows(
+                self.region, fleets, location_attrs_all, location_capacity_all, utilization_all)
+        else:
+            # 不支持 multi location 的地区：utilization 与 capacity 都按 FLEET_IDS_PER_CALL 分批，同一阶段
+            resps = self._run(utilization_calls + plan_capacity_calls(fleet_ids), result)
+            utilization_all = group_utilization([u for r in resps[:len(utilization_calls)] for u in r])
+            capacity_all = group_capacity([c for r in resps[len(utilization_calls):] for c in r])
+            result.rows = build_home_location_rows(self.region, fleets, capacity_all, utilization_all)
+        return result
+
+    def publish(self, shared_output: dict, result: FleetFetchResult) -> None:
+        """写入 shared_output；没有 fleet 时写一行占位（凭证过期时提示）。"""
+        output_key_na = f'{self.region}:NA:NA'
+        if not result.rows:
+            row_kwargs = {'Name': 'AWS MFA Expired'} if result.is_token_expired else {}
+            sub_env = int(self.sub_env) if self.sub_env else -1
+            shared_output[output_key_na] = EnvFleetStatusRow(SubEnv=sub_env, Region=self.region, **row_kwargs)
+            return
+        if output_key_na in shared_output:
+            shared_output.pop(output_key_na)
+        for key, row in result.rows.items():
+            shared_output[key] = row
+
+    def run(self, shared_output: dict, stop_event: Event, refresh_interval: float) -> None:
+        """
+        按 起始时刻 + n * refresh_interval 的固定网格轮询，单轮耗时不会累积成漂移；
+        单轮超过一个间隔时跳过错过的格点，不连续补跑。
+        """
+        next_tick = time.monotonic()
+        try:
+            while not stop_event.is_set():
+                result = self.fetch_once()
+                if stop_event.is_set():
+                    break
+                self.publish(shared_output, result)
+                next_tick += refresh_interval
+                now = time.monotonic()
+                if now > next_tick:
+                    next_tick += ((now - next_tick) // refresh_interval + 1) * refresh_interval
+                if stop_event.wait(next_tick - now):
+                    break
+        finally:
+            self.executor.close()
@@ -0,0 +1,219 @@
+"""
+GameLift 请求执行器：执行一组互不依赖的 GameLiftCall（见 fleet_request_planner），按原顺序返回结果。
+
+    SerialFetchExecutor      逐个同步调用，一个 boto3 client；请求数少、或需要排查问题时使用
+    ThreadPoolFetchExecutor  线程池并发同步调用，共用一个 boto3 client（client 线程安全）
+    AsyncioFetchExecutor     aiobotocore client，在执行器自己的常驻事件循环里 gather；请求多时开销最小
+
+执行器持有 client，跨轮次复用；client 由 client_factory 创建，便于基准测试换成桩：
+    同步执行器：client_factory() -> boto3 client
+    AsyncioFetchExecutor：client_factory() -> 异步上下文管理器，async with 得到 aiobotocore client
+
+用法：
+    with create_executor(EXECUTOR_THREAD, client_factory) as executor:
+        results = executor.run(calls)
+"""
+import asyncio
+import concurrent.futures
+import time
+import traceback
+from contextlib import AsyncExitStack
+from typing import Any, Callable, List, Optional
+
+from botocore.exceptions import ClientError
+
+from GameLift.fleet_request_planner import ON_ERROR_CLIENT_ERROR, ON_ERROR_SKIP, GameLiftCall
+
+EXECUTOR_SERIAL = 'serial'
+EXECUTOR_THREAD = 'thread'
+EXECUTOR_ASYNCIO = 'asyncio'
+EXECUTOR_KINDS = [EXECUTOR_SERIAL, EXECUTOR_THREAD, EXECUTOR_ASYNCIO]
+
+MAX_CONCURRENT_REQUESTS = 20  # 线程池 / asyncio 执行器的在途请求数
+_RETRY_INTERVAL = 15          # 非预期异常后的重试间隔（秒）
+
+
+def print_exception(e: Exception) -> None:
+    print(e)
+    print(''.join(list(reversed(traceback.format_tb(e.__traceback__)))))
+
+
+def _should_retry(call: GameLiftCall, e: Exception) -> bool:
+    if call.on_error == ON_ERROR_CLIENT_ERROR and isinstance(e, ClientError):
+        return False
+    print_exception(e)
+    return call.on_error != ON_ERROR_SKIP
+
+
+def _error_result(call: GameLiftCall, e: Exception) -> Any:
+    return e if call.on_error == ON_ERROR_CLIENT_ERROR else None
+
+
+def _check_resp(call: GameLiftCall, data: dict) -> None:
+    if call.resp_key not in data:
+        raise Exception(f'Missing Key({call.resp_key}) in boto3 {call.api} resp')
+
+
+def call_sync(client, call: GameLiftCall) -> Any:
+    api_fn = getattr(client, call.api)
+    items: list = []
+    next_token = None
+    while True:
+        kwargs = dict(call.kwargs, NextToken=next_token) if next_token else call.kwargs
+        try:
+            data = api_fn(**kwargs)
+        except Exception as e:
+            if not _should_retry(call, e):
+                return _error_result(call, e)
+            time.sleep(_RETRY_INTERVAL)
+            continue
+        _check_resp(call, data)
+        if not call.paginated:
+            return data[call.resp_key]
+        items += data[call.resp_key]
+        next_token = data.get('NextToken', '')
+        if not next_token:
+            return items
+
+
+async def call_async(client, call: GameLiftCall, sem: asyncio.Semaphore) -> Any:
+    api_fn = getattr(client, call.api)
+    items: list = []
+    next_token = None
+    while True:
+        kwargs = dict(call.kwargs, NextToken=next_token) if next_token else call.kwargs
+        try:
+            async with sem:
+                data = await api_fn(**kwargs)
+        except Exception as e:
+            if not _should_retry(call, e):
+                return _error_result(call, e)
+            await asyncio.sleep(_RETRY_INTERVAL)
+            continue
+        _check_resp(call, data)
+        if not call.paginated:
+            return data[call.resp_key]
+        items += data[call.resp_key]
+        next_token = data.get('NextToken', '')
+        if not next_token:
+            return items
+
+
+class FetchExecutor:
+    name = ''
+
+    def __init__(self, client_factory: Callable):
+        self.client_factory = client_factory
+
+    def run(self, calls: List[GameLiftCall]) -> List[Any]:
+        raise NotImplementedError
+
+    def reset_client(self) -> None:
+        """丢弃当前 client（凭证过期后），下次 run 时重新创建。"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        self.reset_client()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class SerialFetchExecutor(FetchExecutor):
+    name = EXECUTOR_SERIAL
+
+    def __init__(self, client_factory: Callable):
+        super().__init__(client_factory)
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = self.client_factory()
+        return self._client
+
+    def run(self, calls: List[GameLiftCall]) -> List[Any]:
+        client = self._get_client()
+        return [call_sync(client, call) for call in calls]
+
+    def reset_client(self) -> None:
+        self._client = None
+
+
+class ThreadPoolFetchExecutor(SerialFetchExecutor):
+    name = EXECUTOR_THREAD
+
+    def __init__(self, client_factory: Callable, max_workers: int = MAX_CONCURRENT_REQUESTS):
+        super().__init__(client_factory)
+        self.max_workers = max_workers
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    def run(self, calls: List[GameLiftCall]) -> List[Any]:
+        client = self._get_client()
+        if len(calls) <= 1:
+            return [call_sync(client, call) for call in calls]
+        if self._pool is None:
+            self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        return list(self._pool.map(lambda _call: call_sync(client, _call), calls))
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        super().close()
+
+
+class AsyncioFetchExecutor(FetchExecutor):
+    """执行器持有一个事件循环，每次 run 在其中 run_until_complete；client 在同一个循环内创建并跨轮次复用。"""
+    name = EXECUTOR_ASYNCIO
+
+    def __init__(self, client_factory: Callable, max_concurrency: int = MAX_CONCURRENT_REQUESTS):
+        super().__init__(client_factory)
+        self.max_concurrency = max_concurrency
+        self._loop = asyncio.new_event_loop()
+        self._client = None
+        self._client_stack: Optional[AsyncExitStack] = None
+
+    async def _get_client(self):
+        if self._client is None:
+            self._client_stack = AsyncExitStack()
+            self._client = await self._client_stack.enter_async_context(self.client_factory())
+        return self._client
+
+    async def _close_client(self) -> None:
+        if self._client_stack is not None:
+            await self._client_stack.aclose()
+        self._client, self._client_stack = None, None
+
+    async def _run(self, calls: List[GameLiftCall]) -> List[Any]:
+        client = await self._get_client()
+        sem = asyncio.Semaphore(self.max_concurrency)
+        return list(await asyncio.gather(*(call_async(client, call, sem) for call in calls)))
+
+    def run(self, calls: List[GameLiftCall]) -> List[Any]:
+        return self._loop.run_until_complete(self._run(calls))
+
+    def reset_client(self) -> None:
+        if not self._loop.is_closed():
+            self._loop.run_until_complete(self._close_client())
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        try:
+            self.reset_client()
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+        finally:
+            self._loop.close()
+
+
+def create_executor(kind: str, client_factory: Callable) -> FetchExecutor:
+    if kind == EXECUTOR_SERIAL:
+        return SerialFetchExecutor(client_factory)
+    if kind == EXECUTOR_THREAD:
+        return ThreadPoolFetchExecutor(client_factory)
+    if kind == EXECUTOR_ASYNCIO:
+        return AsyncioFetchExecutor(client_factory)
+    raise ValueError(f'unsupported executor: {kind}, allowed: {EXECUTOR_KINDS}')
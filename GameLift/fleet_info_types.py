@@ -5,7 +5,9 @@ from typing import ClassVar, List, Optional
 from dataclasses_json import DataClassJsonMixin, dataclass_json
 
 from GameLift.fleet_info_consts import DT_FMT_S
-from utils.TablePrinter.table_printer import BaseRow, BaseTable, ColumnConfig, CondFmtContain, CondFmtExactMatch
+from utils.TablePrinter.table_printer import (
+    BaseRow, BaseTable, ColumnAlignment, ColumnConfig, CondFmtContain, CondFmtExactMatch,
+)
 
 
 @dataclass_json
@@ -52,6 +54,17 @@ class FleetLocationCapacity(DataClassJsonMixin):
     Location: str = 'Unknown'
 
 
+@dataclass_json
+@dataclass
+class FleetUtilization(DataClassJsonMixin):
+    FleetId: str
+    Location: str = 'Unknown'
+    ActiveServerProcessCount: int = -1
+    ActiveGameSessionCount: int = -1
+    CurrentPlayerSessionCount: int = -1
+    MaximumPlayerSessionCount: int = -1
+
+
 @dataclass
 class EnvFleetStatusRow(BaseRow):
     SubEnv: int = -1
@@ -85,6 +98,12 @@ class EnvFleetStatusRow(BaseRow):
     __Idle_config: ClassVar[ColumnConfig] = ColumnConfig(alias='空闲')
     Terminating: int = -1
     __Terminating_config: ClassVar[ColumnConfig] = ColumnConfig(hide=True)
+    GameSessions: int = -1
+    __GameSessions_config: ClassVar[ColumnConfig] = ColumnConfig(alias='对局')
+    Players: int = -1
+    __Players_config: ClassVar[ColumnConfig] = ColumnConfig(alias='玩家')
+    ActiveTrend: str = ''  # 输出进程按容量历史填写
+    __ActiveTrend_config: ClassVar[ColumnConfig] = ColumnConfig(alias='活跃趋势 P50/P95/Max', align=ColumnAlignment.LEFT)
     InstanceLocation: str = 'NA'
     __InstanceLocation_config: ClassVar[ColumnConfig] = ColumnConfig(alias='实例地区')
     LocationStatus: str = 'NA'
@@ -0,0 +1,113 @@
+"""
+GameLift fleet 状态拉取的请求规划：能批量的接口按 fleet id 分批，不能批量的按 (fleet, location) 打平。
+
+规划只产出 GameLiftCall 列表，不发请求；由 fleet_fetch_executors 里的执行器（串行 / 线程池 / asyncio）执行。
+
+每轮需要的接口：
+    describe_fleet_attributes         分页，一次调用
+    describe_fleet_capacity           接受 FleetIds 列表 -> 按 FLEET_IDS_PER_CALL 分批，每批一次调用（含分页）
+    describe_fleet_utilization        同上，补充对局数 / 玩家数
+    describe_fleet_location_attributes  只接受单个 FleetId -> 每个 fleet 一次调用
+    describe_fleet_location_capacity  只接受单个 (FleetId, Location) -> 全部 fleet 的 location 打平成一个请求列表
+
+describe_fleet_utilization 只返回 fleet 主地区（home location）的数据，multi location fleet 的其他 location
+不额外调用 describe_fleet_location_utilization，对局数 / 玩家数保持 -1。
+
+用法：
+    calls = plan_capacity_calls(fleet_ids) + plan_utilization_calls(fleet_ids)
+    results = executor.run(calls)   # 与 calls 一一对应
+"""
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from GameLift.fleet_info_types import FleetCapacity, FleetLocationAttribute, FleetUtilization
+
+FLEET_IDS_PER_CALL = 16  # 单次 describe_fleet_capacity / describe_fleet_utilization 传入的 fleet 数上限
+
+# GameLiftCall.on_error
+ON_ERROR_RETRY = 'retry'                # 打印异常，等待后重试
+ON_ERROR_SKIP = 'skip'                  # 打印异常，结果为 None
+ON_ERROR_CLIENT_ERROR = 'client_error'  # ClientError 作为结果返回给调用方判断，其他异常等待后重试
+
+
+class GameLiftCall(NamedTuple):
+    api: str                        # client 方法名
+    kwargs: dict
+    resp_key: str                   # 响应中数据所在的 key
+    paginated: bool = True          # True：按 NextToken 翻页，结果为各页 resp_key 列表拼接；False：结果为 data[resp_key]
+    on_error: str = ON_ERROR_RETRY
+
+
+def batch_fleet_ids(fleet_ids: Sequence[str], batch_size: int = FLEET_IDS_PER_CALL) -> List[List[str]]:
+    return [list(fleet_ids[i:i + batch_size]) for i in range(0, len(fleet_ids), batch_size)]
+
+
+def plan_location_requests(
+        fleet_location_attrs: Dict[str, List[FleetLocationAttribute]],
+) -> List[Tuple[str, str]]:
+    """全部 fleet 的 (fleet_id, location) 请求列表，用于 describe_fleet_location_capacity。"""
+    return [
+        (fleet_id, attr.LocationState.Location)
+        for fleet_id, attrs in fleet_location_attrs.items()
+        for attr in attrs
+    ]
+
+
+# region 请求列表
+
+def plan_fleet_attributes_call() -> GameLiftCall:
+    # 返回结构： https://boto3.amazonaws.com/v1/documentation/api/1.14.25/reference/services/gamelift.html#GameLift.Client.describe_fleet_attributes # noqa
+    return GameLiftCall('describe_fleet_attributes', {}, 'FleetAttributes', on_error=ON_ERROR_CLIENT_ERROR)
+
+
+def plan_capacity_calls(fleet_ids: Sequence[str]) -> List[GameLiftCall]:
+    return [GameLiftCall('describe_fleet_capacity', {'FleetIds': batch}, 'FleetCapacity')
+            for batch in batch_fleet_ids(fleet_ids)]
+
+
+def plan_utilization_calls(fleet_ids: Sequence[str]) -> List[GameLiftCall]:
+    return [GameLiftCall('describe_fleet_utilization', {'FleetIds': batch}, 'FleetUtilization')
+            for batch in batch_fleet_ids(fleet_ids)]
+
+
+def plan_location_attribute_calls(fleet_ids: Sequence[str]) -> List[GameLiftCall]:
+    """ClientError（如地区不支持 multi location 时的 UnsupportedRegionException）作为结果返回。"""
+    return [GameLiftCall('describe_fleet_location_attributes', {'FleetId': fleet_id}, 'LocationAttributes',
+                         on_error=ON_ERROR_CLIENT_ERROR)
+            for fleet_id in fleet_ids]
+
+
+def plan_location_capacity_calls(requests: List[Tuple[str, str]]) -> List[GameLiftCall]:
+    """失败的请求跳过（结果为 None），该 location 显示缺省值。"""
+    return [GameLiftCall('describe_fleet_location_capacity', {'FleetId': fleet_id, 'Location': location},
+                         'FleetCapacity', paginated=False, on_error=ON_ERROR_SKIP)
+            for fleet_id, location in requests]
+
+# endregion 请求列表
+
+
+# region 结果整理
+
+def group_capacity(capacity_dicts: List[dict]) -> Dict[str, List[FleetCapacity]]:
+    capacity_all: Dict[str, List[FleetCapacity]] = {}
+    for fc in capacity_dicts:
+        fleet_capacity = FleetCapacity.from_dict(fc)
+        fleet_capacity.LastCheckedDt = datetime.now()
+        capacity_all.setdefault(fleet_capacity.FleetId, []).append(fleet_capacity)
+    return capacity_all
+
+
+def group_utilization(utilization_dicts: List[dict]) -> Dict[str, FleetUtilization]:
+    return {fu['FleetId']: FleetUtilization.from_dict(fu, infer_missing=True) for fu in utilization_dicts}
+
+
+def match_utilization(
+        utilization_all: Dict[str, FleetUtilization], fleet_id: str, location: str,
+) -> Optional[FleetUtilization]:
+    """(fleet, location) 对应的 utilization；describe_fleet_utilization 只覆盖主地区。"""
+    util = utilization_all.get(fleet_id)
+    if util is None or util.Location not in ('Unknown', location):
+        return None
+    return util
+
+# endregion 结果整理
@@ -0,0 +1,179 @@
+"""
+fleet 状态看板：拉取进程推送行增量，输出进程维护本地表状态并原地刷新终端。
+
+    拉取进程（每地区一个）                      输出进程
+    FleetStatusPublisher[key] = row  --Queue-->  process_print_fleet_status
+                                                   - 按 key 保存最新行（版本号更大的才覆盖）
+                                                   - 有变化时重新生成表格行，交给 LiveTableRenderer 只重写变化的行
+                                                   - 每个快照交给 CapacityRecorder 记录容量历史、生成趋势列
+
+FleetStatusPublisher 提供拉取代码用到的 dict 接口（[]= / pop / in），拉取逻辑不需要感知队列。
+取代原先的 Manager().dict()：那种方式输出进程每次读取都要逐 key 走一次代理 IPC。
+"""
+import multiprocessing
+import os
+import queue
+import sys
+from dataclasses import dataclass
+from multiprocessing.synchronize import Event
+from typing import Dict, List, Optional, Set
+
+from GameLift.fleet_capacity_history import CapacityHistory, CapacityRecorder
+from GameLift.fleet_info_types import EnvFleetStatusRow, EnvFleetStatusTbl
+from utils.aws_consts import REGION_ABBR, REGION_TO_ABBR
+from utils.TablePrinter.live_table_renderer import LiveTableRenderer
+from utils.TablePrinter.table_printer_consts import BoxDrawingChar
+
+_DRAIN_TIMEOUT = 0.5     # 输出进程等待增量的最长时间（秒），也是检查 stop_event 的间隔
+_MAX_DELTAS_PER_FRAME = 5000  # 单帧最多合并的增量数，避免增量持续涌入时迟迟不刷新
+
+
+@dataclass
+class FleetRowDelta:
+    key: str                            # '<region>:<fleet_id>:<location>'
+    version: int                        # 同一 key 单调递增（每个 key 只由一个拉取进程写入）
+    row: Optional[EnvFleetStatusRow]    # None 表示删除
+
+
+class FleetStatusPublisher:
+    """拉取进程侧：把行的写入 / 删除转成 FleetRowDelta 推入队列。"""
+
+    def __init__(self, delta_queue: multiprocessing.Queue):
+        self.queue = delta_queue
+        self._writer_pid: Optional[int] = None
+        self._versions: Dict[str, int] = {}
+        self._keys: Set[str] = set()  # 当前存在的 key
+
+    def _publish(self, key: str, row: Optional[EnvFleetStatusRow]) -> None:
+        if self._writer_pid != os.getpid():
+            # 对象在父进程创建、传给拉取进程使用；fork / spawn 后队列的设置会重置，需在写入进程内设置。
+            # 输出进程先于拉取进程退出时，不等待队列缓冲写完
+            self._writer_pid = os.getpid()
+            self.queue.cancel_join_thread()
+        version = self._versions.get(key, 0) + 1
+        self._versions[key] = version
+        self.queue.put(FleetRowDelta(key=key, version=version, row=row))
+
+    def __setitem__(self, key: str, row: EnvFleetStatusRow) -> None:
+        self._keys.add(key)
+        self._publish(key, row)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def pop(self, key: str, default=None):
+        if key not in self._keys:
+            return default
+        self._keys.discard(key)
+        self._publish(key, None)
+        return None
+
+
+def _mask_fleet_id(fleet_id: str) -> str:
+    tokens = fleet_id.split('-')
+    if len(tokens) < 2:
+        return fleet_id
+    return f'***-{tokens[-1]}'
+
+
+def _to_display_row(row: EnvFleetStatusRow) -> EnvFleetStatusRow:
+    row.Region = REGION_TO_ABBR.get(row.Region, row.Region)
+    row.FleetId = _mask_fleet_id(row.FleetId)
+    row.FleetType = '按需OD' if row.FleetType == 'ON_DEMAND' else row.FleetType
+    return row
+
+
+def build_fleet_status_lines(rows: List[EnvFleetStatusRow], regions: List[str]) -> List[str]:
+    table = EnvFleetStatusTbl()
+    for row in rows:
+        table.insert_row(row)
+
+    # 准备输出数据：表头行、表头分割行
+    lines = [table.get_table_header_str(), table.get_table_header_sep_str()]
+    # 准备输出数据：表行排序
+    rows_sorted: List[EnvFleetStatusRow] = table.get_sorted_rows(
+        order_by=['SubEnv', 'Region', 'Name', 'InstanceType', 'Status', 'InstanceLocation'],
+        ascending=[False, True, False, True, True, True],
+    )
+    # 准备输出数据：额外排序逻辑
+    rows_sorted.sort(key=lambda _row: regions.index(str(REGION_ABBR[_row.Region])))
+
+    # 准备输出数据：数据行、数据分割行
+    row_prev: Optional[EnvFleetStatusRow] = None
+    for row in rows_sorted:
+        # If you don't know what you are doing, it's recommended to add the separator regarding to the sorting order. # noqa
+        # Otherwise, you may see same column value being separated into different chunks and the output looks weird. # noqa
+        if row_prev is not None and row_prev.Region != row.Region:
+            lines.append(table.get_table_line_sep_str(
+                sep_h=BoxDrawingChar.DOUBLE_HORIZONTAL,
+                sep_v=BoxDrawingChar.VERTICAL_SINGLE_AND_HORIZONTAL_DOUBLE,
+            ))
+        elif row_prev is not None and row_prev.InstanceType != row.InstanceType:
+            lines.append(table.get_table_line_sep_str(
+                sep_h=BoxDrawingChar.LIGHT_HORIZONTAL, sep_v=BoxDrawingChar.LIGHT_VERTICAL, dense=False
+            ))
+        lines.append(table.get_table_line_str(row))
+        row_prev = row
+    lines += ['', 'Ctrl+c 停止获取']
+    return lines
+
+
+class FleetStatusBoard:
+    """输出进程侧的表状态：按 key 保存最新行，记录是否有未输出的变化。"""
+
+    def __init__(self, regions: List[str], recorder: Optional[CapacityRecorder] = None):
+        self.regions = regions
+        self.recorder = recorder
+        self.rows: Dict[str, EnvFleetStatusRow] = {}
+        self.versions: Dict[str, int] = {}
+        self.dirty = False
+
+    def apply(self, delta: FleetRowDelta) -> None:
+        if delta.version <= self.versions.get(delta.key, 0):
+            return
+        self.versions[delta.key] = delta.version
+        if delta.row is None:
+            self.dirty |= self.rows.pop(delta.key, None) is not None
+        else:
+            if self.recorder is not None:
+                # 记录用未脱敏的原始行，趋势列要在 _to_display_row 之前生成
+                self.recorder.record(delta.row)
+                delta.row.ActiveTrend = self.recorder.trend(delta.row)
+            self.rows[delta.key] = _to_display_row(delta.row)
+            self.dirty = True
+
+    def build_lines(self) -> List[str]:
+        self.dirty = False
+        return build_fleet_status_lines(list(self.rows.values()), self.regions)
+
+
+def process_print_fleet_status(
+        delta_queue: multiprocessing.Queue, stop_event: Event, regions: List[str], incremental: bool = True,
+        record_history: bool = True,
+):
+    recorder = None
+    if record_history:
+        history = CapacityHistory()
+        history.prune()
+        recorder = CapacityRecorder(history)
+    board = FleetStatusBoard(regions, recorder)
+    renderer = LiveTableRenderer(incremental=incremental)
+    try:
+        while not stop_event.is_set():
+            try:
+                board.apply(delta_queue.get(timeout=_DRAIN_TIMEOUT))
+                for _ in range(_MAX_DELTAS_PER_FRAME):
+                    board.apply(delta_queue.get_nowait())
+            except queue.Empty:
+                pass
+            if board.dirty:
+                renderer.render(board.build_lines())
+            if recorder is not None:
+                recorder.flush_if_due()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if recorder is not None:
+            recorder.flush()
+        renderer.close()
+        sys.stdout.flush()
@@ -6,8 +6,6 @@ import sys
 from datetime import datetime
 from typing import Dict, List
 
-import boto3
-import boto3.session
 from botocore.client import Config as BotoConfig
 from botocore.exceptions import ClientError
 
@@ -19,6 +17,7 @@ sys.path.append(os.getcwd())
 from Lambda.lambda_info_types import Function, FunctionRow, FunctionTable  # noqa: E402
 from utils.aws_client_error_handler import handle_expired_token_exception  # noqa: E402
 from utils.aws_client_helper import get_aws_profile  # noqa: E402
+from utils.aws_client_pool import get_client, get_session  # noqa: E402
 from utils.aws_consts import AllEnvs, Env  # noqa: E402
 from utils.aws_urls import get_lambda_function_url  # noqa: E402
 from utils.SystemTools.file_system_helper import create_dir_if_not_exists  # noqa: E402
@@ -36,12 +35,14 @@ REGIONS = [
 # endregion 配置项
 
 DT_FMT = '%Y-%m-%d %H:%M:%S'
+_BOTO_CONFIG = BotoConfig(connect_timeout=3, retries={"mode": "standard"})
 OUTPUT_DIR = f'./{CURR_FOLDER_NAME}/Data/output'
 
 
 def get_env_rgn_functions(env: Env, region: str) -> List[dict]:
-    session = boto3.Session(region_name=region, profile_name=get_aws_profile(region, env.is_prod_aws))
-    client = session.client('lambda', config=BotoConfig(connect_timeout=3, retries={"mode": "standard"}))
+    profile = get_aws_profile(region, env.is_prod_aws)
+    session = get_session(profile, region)
+    client = get_client('lambda', region, profile, config=_BOTO_CONFIG, adaptive=True)
 
     functions = []
     marker = None
@@ -90,8 +91,9 @@ def get_env_rgn_functions_worker(
     if verbose:
         dt_start = datetime.now()
         print(f'{dt_start.strftime(DT_FMT)} » Get functions start. region={region}')
-    session = boto3.Session(region_name=region, profile_name=get_aws_profile(region, env.is_prod_aws))
-    client = session.client('lambda', config=BotoConfig(connect_timeout=3, retries={"mode": "standard"}))
+    profile = get_aws_profile(region, env.is_prod_aws)
+    session = get_session(profile, region)
+    client = get_client('lambda', region, profile, config=_BOTO_CONFIG, adaptive=True)
 
     functions = []
     marker = None
@@ -132,8 +134,8 @@ def get_env_rgn_functions_worker(
 
 
 def get_functions_concurrency(env: Env, region: str, function_names: List[str]) -> Dict[str, dict]:
-    session = boto3.Session(region_name=region, profile_name=get_aws_profile(region, env.is_prod_aws))
-    client = session.client('lambda', config=BotoConfig(connect_timeout=3, retries={"mode": "standard"}))
+    profile = get_aws_profile(region, env.is_prod_aws)
+    client = get_client('lambda', region, profile, config=_BOTO_CONFIG, adaptive=True)
 
     ret = {}
     for function_name in function_names[:]:
@@ -148,8 +150,8 @@ def get_function_concurrency_worker(
     if verbose:
         dt_start = datetime.now()
         print(f'{dt_start.strftime(DT_FMT)} » Get function concurrency start. region={region} fn={function_name}')
-    session = boto3.Session(region_name=region, profile_name=get_aws_profile(region, env.is_prod_aws))
-    client = session.client('lambda', config=BotoConfig(connect_timeout=3, retries={"mode": "standard"}))
+    profile = get_aws_profile(region, env.is_prod_aws)
+    client = get_client('lambda', region, profile, config=_BOTO_CONFIG, adaptive=True)
     while not stop_event.is_set():
         try:
             resp = client.get_function_concurrency(FunctionName=function_name)
@@ -20,6 +20,7 @@ if PROJ_ROOT_PATH not in sys.path:
     sys.path.append(PROJ_ROOT_PATH)
 
 from Lambda.lambda_info_types import Function, FunctionRow, FunctionTable  # noqa: E402
+from utils.adaptive_rate_control import install_adaptive_rate_control  # noqa: E402
 from utils.aws_consts import REGION_ABBR, AllEnvs, Env  # noqa: E402
 from utils.aws_aiosession_helper import get_cached_aiosession  # noqa: E402
 from utils.aws_urls import get_lambda_function_url  # noqa: E402
@@ -80,6 +81,7 @@ async def _fetch_via_list_functions(env: Env, region: str) -> List[Function]:
         region_name=region,
         config=BotoConfig(connect_timeout=3, retries={"mode": "standard"}, max_pool_connections=50)
     ) as client:
+        install_adaptive_rate_control(client, account=session.profile, is_async=True)
         raw_functions: List[dict] = []
         marker = None
         while True:
@@ -119,6 +121,7 @@ async def _fetch_via_resource_explorer(env: Env, region: str) -> List[Function]:
         'resource-explorer-2', region_name=region,
         config=BotoConfig(connect_timeout=3, retries={"mode": "standard"}),
     ) as re_client:
+        install_adaptive_rate_control(re_client, account=session.profile, is_async=True)
         next_token = None
         try:
             while True:
@@ -155,6 +158,7 @@ async def _fetch_via_resource_explorer(env: Env, region: str) -> List[Function]:
         'lambda', region_name=region,
         config=BotoConfig(connect_timeout=3, retries={"mode": "standard"}, max_pool_connections=50),
     ) as lambda_client:
+        install_adaptive_rate_control(lambda_client, account=session.profile, is_async=True)
         semaphore = _make_lambda_semaphore(region)
 
         async def fetch(arn: str) -> Optional[Function]:
@@ -197,6 +201,7 @@ async def get_all_function_concurrency(env: Env, fn_list: List[Function]) -> Dic
             region_name=region,
             config=BotoConfig(connect_timeout=3, retries={"mode": "standard"}, max_pool_connections=50)
         ) as client:
+            install_adaptive_rate_control(client, account=session.profile, is_async=True)
             semaphore = _make_lambda_semaphore(region)
 
             async def get_concurrency(fn: Function):
@@ -221,6 +226,7 @@ async def get_function_currency_async(env: Env, region: str, function_name: str)
         region_name=region,
         config=BotoConfig(connect_timeout=3, retries={"mode": "standard"}, max_pool_connections=50)
     ) as client:
+        install_adaptive_rate_control(client, account=session.profile, is_async=True)
         try:
             resp = await client.get_function_concurrency(FunctionName=function_name)  # type: ignore
             return resp
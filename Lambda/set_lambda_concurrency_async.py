@@ -12,6 +12,7 @@ PROJ_ROOT_PATH = os.path.dirname(CURR_DIR_PATH)
 if PROJ_ROOT_PATH not in sys.path:
     sys.path.insert(0, PROJ_ROOT_PATH)
 
+from utils.adaptive_rate_control import install_adaptive_rate_control  # noqa: E402
 from utils.aws_aiosession_helper import get_cached_aiosession  # noqa: E402
 from utils.aws_consts import REGION_ABBR  # noqa: E402
 
@@ -101,6 +102,7 @@ async def set_func_concurrency_async(
         region_name=region,
         config=BotoConfig(connect_timeout=3, retries={"mode": "standard"}, max_pool_connections=50)
     ) as client:
+        install_adaptive_rate_control(client, account=session.profile, is_async=True)
         if concurrency_type == CcyTypeEnum.RESERVE:
             # 加 reserve concurrency 限制
             concurrency = 0 if concurrency is None else concurrency
@@ -1,46 +1,168 @@
+import json
 import logging
 import os
-from boto3.session import Session
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict
+
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config as BotoConfig
 
-from utils.aws_client_helper import get_aws_profile
+from utils.aws_client_pool import get_env_client
 from utils.aws_consts import Env
 from utils.SystemTools.file_system_helper import create_dir_if_not_exists
 
+_BOTO_CONFIG = BotoConfig(connect_timeout=3, retries={"mode": "standard"})
+
+# 目录并发下载
+DOWNLOAD_WORKERS = 16                    # 同时下载的对象数
+_MULTIPART_CONCURRENCY = 4               # 单个大对象的分段并发数
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * 1024 * 1024,
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=_MULTIPART_CONCURRENCY,
+)
+# 连接池要容纳 对象并发 × 分段并发，否则多余的请求在 urllib3 里排队
+_DIR_BOTO_CONFIG = BotoConfig(
+    connect_timeout=3, retries={"mode": "standard"},
+    max_pool_connections=DOWNLOAD_WORKERS * _MULTIPART_CONCURRENCY,
+)
+MANIFEST_FILE_NAME = '.s3_manifest.json'  # 断点续传清单：{key: {"size", "etag"}}，放在 output_path 下
+_MANIFEST_SAVE_EVERY = 50                # 每完成多少个文件落盘一次清单
+_PROGRESS_INTERVAL = 5.0                 # 进度日志间隔（秒）
+
+
+@dataclass
+class DownloadStats:
+    files_total: int = 0
+    files_downloaded: int = 0
+    files_skipped: int = 0      # 清单中 size / ETag 一致、本地文件完整，跳过
+    bytes_total: int = 0
+    bytes_downloaded: int = 0
+    duration: float = 0.0
+
+    @property
+    def throughput_mbps(self) -> float:
+        return self.bytes_downloaded / 1024 / 1024 / self.duration if self.duration > 0 else 0.0
+
+
+def _load_manifest(path: str) -> Dict[str, dict]:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(path: str, manifest: Dict[str, dict]) -> None:
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _is_downloaded(manifest: Dict[str, dict], obj: dict, local_path: str) -> bool:
+    record = manifest.get(obj['Key'])
+    if not record or record.get('etag') != obj.get('ETag') or record.get('size') != obj['Size']:
+        return False
+    return os.path.exists(local_path) and os.path.getsize(local_path) == obj['Size']
+
+
+def download_dir_from_s3(
+        env: Env, region: str, bucket_name: str, dir_key: str, output_path: str,
+        max_workers: int = DOWNLOAD_WORKERS,
+        resume: bool = True,
+) -> DownloadStats:
+    """
+    并发下载 dir_key 下的全部对象到 output_path，边列举边下载。
+
+    大对象按 _TRANSFER_CONFIG 分段并发下载；每个文件先写 .part 再原子改名，中断不会留下半个文件。
+    resume=True 时已完成的对象记录在 output_path/MANIFEST_FILE_NAME，重跑时 size 与 ETag 都一致则跳过。
+    """
+    client = get_env_client('s3', env, region, config=_DIR_BOTO_CONFIG)
+    create_dir_if_not_exists(dir_path=output_path)
+    manifest_path = os.path.join(output_path, MANIFEST_FILE_NAME)
+    manifest = _load_manifest(manifest_path) if resume else {}
+
+    stats = DownloadStats()
+    lock = threading.Lock()
+    t_start = time.perf_counter()
+    t_last_log = t_start
 
-def download_dir_from_s3(env: Env, region: str, bucket_name: str, dir_key: str, output_path: str):
-    session = Session(region_name=region, profile_name=get_aws_profile(region, env.is_prod_aws))
-    client = session.client('s3', config=BotoConfig(connect_timeout=3, retries={"mode": "standard"}))
+    def __on_bytes(n: int):
+        with lock:
+            stats.bytes_downloaded += n
 
-    paginator = client.get_paginator('list_objects_v2')
-    for page in paginator.paginate(Bucket=bucket_name, Prefix=dir_key):
-        if 'Contents' not in page:
-            continue
+    def __download(obj: dict, local_path: str):
+        create_dir_if_not_exists(file_path=local_path)
+        part_path = f'{local_path}.part'
+        client.download_file(bucket_name, obj['Key'], part_path, Config=_TRANSFER_CONFIG, Callback=__on_bytes)
+        os.replace(part_path, local_path)
+        return obj
 
-        for obj in page['Contents']:
-            # Get the relative path of the file
-            relative_path = obj['Key']
-            if relative_path.endswith('/'):  # Skip directory markers
-                continue
+    def __log_progress():
+        elapsed = time.perf_counter() - t_start
+        with lock:
+            done, mb = stats.files_downloaded + stats.files_skipped, stats.bytes_downloaded / 1024 / 1024
+        logging.info(f'Progress: {done}/{stats.files_total} files, {mb:.1f} MB, {mb / elapsed if elapsed else 0:.1f} MB/s')
 
-            # Create the local file path
-            local_path = os.path.join(output_path, os.path.relpath(relative_path, dir_key))
+    def __collect(done_futures):
+        nonlocal t_last_log
+        for fut in done_futures:
+            obj = fut.result()
+            manifest[obj['Key']] = {'size': obj['Size'], 'etag': obj.get('ETag')}
+            stats.files_downloaded += 1
+            if resume and stats.files_downloaded % _MANIFEST_SAVE_EVERY == 0:
+                _save_manifest(manifest_path, manifest)
+        now = time.perf_counter()
+        if now - t_last_log >= _PROGRESS_INTERVAL:
+            t_last_log = now
+            __log_progress()
 
-            # Create the directory structure if it doesn't exist
-            local_dir = os.path.dirname(local_path)
-            create_dir_if_not_exists(dir_path=local_dir)
+    pending = set()
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        paginator = client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=bucket_name, Prefix=dir_key):
+            for obj in page.get('Contents', []):
+                if obj['Key'].endswith('/'):  # Skip directory markers
+                    continue
+                local_path = os.path.join(output_path, os.path.relpath(obj['Key'], dir_key))
+                stats.files_total += 1
+                stats.bytes_total += obj['Size']
+                if resume and _is_downloaded(manifest, obj, local_path):
+                    stats.files_skipped += 1
+                    continue
+                pending.add(pool.submit(__download, obj, local_path))
+            # 列举下一页之前先收掉已完成的任务，及时暴露下载错误
+            done, pending = wait(pending, timeout=0, return_when=FIRST_COMPLETED)
+            __collect(done)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            __collect(done)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        if resume:
+            _save_manifest(manifest_path, manifest)
+        stats.duration = time.perf_counter() - t_start
 
-            # Download the file
-            client.download_file(bucket_name, relative_path, local_path)
-        logging.info(f'Completed page with {len(page["Contents"])} files')
-    logging.info(f'Download Completed. output_path={output_path}')
+    __log_progress()
+    logging.info(
+        f'Download Completed. output_path={output_path} downloaded={stats.files_downloaded} '
+        f'skipped={stats.files_skipped} throughput={stats.throughput_mbps:.1f} MB/s'
+    )
+    return stats
 
 
 def download_file_from_s3(
         env: Env, region: str, bucket_name: str, file_key: str, output_dir: str, output_file_name: str = '',
 ) -> None:
-    session = Session(region_name=region, profile_name=get_aws_profile(region, env.is_prod_aws))
-    client = session.client('s3', config=BotoConfig(connect_timeout=3, retries={"mode": "standard"}))
+    client = get_env_client('s3', env, region, config=_BOTO_CONFIG)
 
     # Download the file
     if output_file_name:
@@ -49,4 +171,4 @@ def download_file_from_s3(
         output_path = os.path.join(output_dir, file_key)
     create_dir_if_not_exists(file_path=output_path)
 
-    client.download_file(bucket_name, file_key, output_path)
+    client.download_file(bucket_name, file_key, output_path, Config=_TRANSFER_CONFIG)
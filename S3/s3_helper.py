@@ -1,34 +1,20 @@
 import json
 import logging
-from typing import Dict
 
 import boto3
 from botocore.exceptions import ClientError
 
 from utils.aws_client_helper import get_aws_profile
+from utils.aws_client_pool import get_client_pool, get_env_client
 from utils.aws_consts import Env
-from utils.proxy_helper import check_proxy
-
-SESSION_CACHE: Dict[str, boto3.Session] = {}
 
 
 def get_s3_client(env: Env, rgn: str):
-    # 配置 proxy
-    config = None
-    proxy_enable, proxy = check_proxy()
-    if proxy_enable:
-        from botocore.config import Config
-        config = Config(proxies={'http': proxy, 'https': proxy})
-
-    session = get_session(env=env, rgn=rgn)
-    return session.client('s3', config=config)
+    return get_env_client('s3', env, rgn, use_proxy=True)
 
 
 def get_session(env: Env, rgn: str) -> boto3.Session:
-    key = f"{rgn}:{env.is_prod_aws}"
-    if key not in SESSION_CACHE:
-        SESSION_CACHE[key] = boto3.Session(region_name=rgn, profile_name=get_aws_profile(rgn, env.is_prod_aws))
-    return SESSION_CACHE[key]
+    return get_client_pool().session(get_aws_profile(rgn, env.is_prod_aws), rgn)
 
 
 def is_bucket_exists(env: Env, region: str, bucket_name: str) -> bool:
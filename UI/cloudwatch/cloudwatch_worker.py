@@ -18,7 +18,6 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Callable, Optional
 
-import boto3
 from PyQt5.QtCore import QObject, QRunnable, pyqtSignal, pyqtSlot
 
 from services.cloudwatch.log_groups_cache import save_cache
@@ -27,6 +26,7 @@ from services.cloudwatch.log_groups_service import (
     fetch_last_ingestion_time,
     fetch_log_groups,
 )
+from utils.aws_client_pool import get_client
 from utils.rate_limiter import Cancelled, RateLimiter
 
 _log = logging.getLogger(__name__)
@@ -128,15 +128,10 @@ class FetchIngestionTimeWorker(_CancellableWorker):
 
     @pyqtSlot()
     def run(self):
-        client = None
         pool = None
         try:
             limiter = RateLimiter.for_cloudwatch()
-            session = boto3.Session(
-                profile_name=self._profile_name,
-                region_name=self._region,
-            )
-            client = session.client("logs")
+            client = get_client("logs", self._region, self._profile_name)
 
             max_workers = max(1, int(limiter.rate))
 
@@ -159,10 +154,8 @@ class FetchIngestionTimeWorker(_CancellableWorker):
         finally:
             if pool is not None:
                 # 取消时丢弃尚未启动的任务，让线程池迅速 drain；
-                # 必须先 shutdown 再 close client（在跑的任务还在用它）
+                # client 来自进程级共享池，不在这里 close
                 pool.shutdown(wait=True, cancel_futures=self._stop.is_set())
-            if client is not None:
-                client.close()
             self._emit(lambda: self.signals.all_done.emit())
 
     def _fetch_one(self, client, name: str, limiter: RateLimiter) -> Optional[datetime]:
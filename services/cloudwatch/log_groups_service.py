@@ -17,8 +17,7 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Optional
 
-import boto3
-
+from utils.aws_client_pool import get_client
 from utils.rate_limiter import Cancelled, RateLimiter
 
 
@@ -63,40 +62,36 @@ def fetch_log_groups(
     if limiter is None:
         limiter = RateLimiter.for_cloudwatch()
 
-    session = boto3.Session(profile_name=profile_name, region_name=region)
-    client = session.client("logs")
+    client = get_client("logs", region, profile_name)
 
-    try:
-        groups: list[LogGroupInfo] = []
-
-        # 手动分页：在每次 API 调用前 acquire，语义精确
-        next_token: Optional[str] = None
-        while True:
-            if not limiter.acquire(cancel=cancel):
-                raise Cancelled("fetch_log_groups cancelled")
-            kwargs: dict = {}
-            if next_token:
-                kwargs["nextToken"] = next_token
-            resp = client.describe_log_groups(**kwargs)
-
-            for lg in resp.get("logGroups", []):
-                groups.append(LogGroupInfo(
-                    log_group_name=lg["logGroupName"],
-                    region=region,
-                    creation_time=_ms_to_utc(lg.get("creationTime")),
-                    last_ingestion_time=_ms_to_utc(lg.get("lastIngestionTime")),
-                    stored_bytes=lg.get("storedBytes"),
-                    retention_in_days=lg.get("retentionInDays"),
-                ))
-
-            next_token = resp.get("nextToken")
-            if not next_token:
-                break
-
-        groups.sort(key=lambda g: g.log_group_name.lower())
-        return groups
-    finally:
-        client.close()
+    groups: list[LogGroupInfo] = []
+
+    # 手动分页：在每次 API 调用前 acquire，语义精确
+    next_token: Optional[str] = None
+    while True:
+        if not limiter.acquire(cancel=cancel):
+            raise Cancelled("fetch_log_groups cancelled")
+        kwargs: dict = {}
+        if next_token:
+            kwargs["nextToken"] = next_token
+        resp = client.describe_log_groups(**kwargs)
+
+        for lg in resp.get("logGroups", []):
+            groups.append(LogGroupInfo(
+                log_group_name=lg["logGroupName"],
+                region=region,
+                creation_time=_ms_to_utc(lg.get("creationTime")),
+                last_ingestion_time=_ms_to_utc(lg.get("lastIngestionTime")),
+                stored_bytes=lg.get("storedBytes"),
+                retention_in_days=lg.get("retentionInDays"),
+            ))
+
+        next_token = resp.get("nextToken")
+        if not next_token:
+            break
+
+    groups.sort(key=lambda g: g.log_group_name.lower())
+    return groups
 
 
 def fetch_last_ingestion_time(
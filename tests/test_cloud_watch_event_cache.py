@@ -0,0 +1,99 @@
+"""
+EventCache 覆盖区间：missing_intervals 只返回未拉取的空档，可本地求值的 pattern 复用 pattern='' 的覆盖。
+倒排表：store_events 同步写入，query_tokens 只读。
+"""
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from CloudWatch.cloud_watch_event_cache import EventCache, to_ms
+from CloudWatch.cloud_watch_token_index import log_id_token
+
+_REGION = 'us-east-1'
+_LOG_GROUP = '/test/group'
+
+
+@pytest.fixture
+def cache(tmp_path) -> EventCache:
+    return EventCache(db_path=tmp_path / 'events.sqlite3')
+
+
+def test_missing_intervals_empty_cache(cache: EventCache):
+    assert cache.missing_intervals(_REGION, _LOG_GROUP, '', 1000, 2000) == [(1000, 2000)]
+
+
+def test_missing_intervals_gaps(cache: EventCache):
+    cache.mark_covered(_REGION, _LOG_GROUP, '', 1000, 1499)
+    cache.mark_covered(_REGION, _LOG_GROUP, '', 1700, 1799)
+    assert cache.missing_intervals(_REGION, _LOG_GROUP, '', 900, 2000) == [(900, 999), (1500, 1699), (1800, 2000)]
+    assert cache.missing_intervals(_REGION, _LOG_GROUP, '', 1100, 1400) == []
+
+
+def test_missing_intervals_adjacent_merged(cache: EventCache):
+    cache.mark_covered(_REGION, _LOG_GROUP, '', 1000, 1499)
+    cache.mark_covered(_REGION, _LOG_GROUP, '', 1500, 2000)
+    assert cache.covered_intervals(_REGION, _LOG_GROUP) == [(1000, 2000)]
+    assert cache.missing_intervals(_REGION, _LOG_GROUP, '', 1000, 2000) == []
+
+
+def test_missing_intervals_per_key(cache: EventCache):
+    cache.mark_covered(_REGION, _LOG_GROUP, '', 1000, 2000)
+    assert cache.missing_intervals('eu-west-1', _LOG_GROUP, '', 1000, 2000) == [(1000, 2000)]
+    assert cache.missing_intervals(_REGION, '/other/group', '', 1000, 2000) == [(1000, 2000)]
+
+
+def test_missing_intervals_pattern_reuses_full_coverage(cache: EventCache):
+    cache.mark_covered(_REGION, _LOG_GROUP, '', 1000, 1499)
+    cache.mark_covered(_REGION, _LOG_GROUP, 'ERROR', 1500, 2000)
+    # 可本地编译的 pattern：自身覆盖 + pattern='' 的覆盖
+    assert cache.missing_intervals(_REGION, _LOG_GROUP, 'ERROR', 1000, 2000) == []
+    # pattern='' 不复用具体 pattern 的覆盖
+    assert cache.missing_intervals(_REGION, _LOG_GROUP, '', 1000, 2000) == [(1500, 2000)]
+
+
+def test_missing_intervals_uncompilable_pattern(cache: EventCache):
+    pattern = '{ $.a = '
+    cache.mark_covered(_REGION, _LOG_GROUP, '', 1000, 2000)
+    assert cache.missing_intervals(_REGION, _LOG_GROUP, pattern, 1000, 2000) == [(1000, 2000)]
+
+
+def _events(base_ms: int) -> list:
+    return [
+        {'eventId': 'e1', 'timestamp': base_ms, 'logStreamName': 's1', 'message': 'AAA111 ⚕ [INFO] start'},
+        {'eventId': 'e2', 'timestamp': base_ms + 1, 'logStreamName': 's2', 'message': 'BBB222 ⚕ [ERROR] boom'},
+        {'eventId': 'e3', 'timestamp': base_ms + 2, 'logStreamName': 's1', 'message': 'AAA111 ⚕ [INFO] end'},
+    ]
+
+
+def test_query_tokens(cache: EventCache):
+    base_ms = to_ms(datetime.now(timezone.utc))
+    cache.store_events(_REGION, _LOG_GROUP, '', _events(base_ms))
+    assert [e['eventId'] for e in cache.query_tokens(_REGION, _LOG_GROUP, [log_id_token('AAA111')])] == ['e1', 'e3']
+    assert [e['eventId'] for e in cache.query_tokens(
+        _REGION, _LOG_GROUP, [log_id_token('AAA111'), log_id_token('BBB222')], base_ms + 1, base_ms + 1)] == ['e2']
+    assert cache.query_tokens('eu-west-1', _LOG_GROUP, [log_id_token('AAA111')]) == []
+    assert cache.query_tokens(_REGION, _LOG_GROUP, []) == []
+
+
+def test_query_tokens_does_not_take_write_lock(cache: EventCache):
+    cache.store_events(_REGION, _LOG_GROUP, '', _events(to_ms(datetime.now(timezone.utc))))
+    writer = sqlite3.connect(cache.db_path, timeout=0)
+    try:
+        writer.execute('BEGIN IMMEDIATE')
+        assert len(cache.query_tokens(_REGION, _LOG_GROUP, [log_id_token('AAA111')])) == 2
+    finally:
+        writer.rollback()
+        writer.close()
+
+
+def test_prune_keeps_postings_of_remaining_events(cache: EventCache):
+    now = datetime.now(timezone.utc)
+    cache.store_events(_REGION, _LOG_GROUP, '', _events(to_ms(now - timedelta(days=30))))
+    cache.store_events(_REGION, _LOG_GROUP, '', [
+        {'eventId': 'e4', 'timestamp': to_ms(now), 'logStreamName': 's1', 'message': 'AAA111 ⚕ [INFO] again'},
+    ])
+    assert cache.prune() == 3
+    assert [e['eventId'] for e in cache.query_tokens(_REGION, _LOG_GROUP, [log_id_token('AAA111')])] == ['e4']
+    with sqlite3.connect(cache.db_path) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM event_tokens').fetchone()[0] == 1
@@ -0,0 +1,107 @@
+"""
+_iter_raw_events：导出归档文本行的事件切分（多行消息、字节偏移、从偏移处续读）。
+ArchiveTokenIndex.lookup：按 token 点查，每个文件只顺序解压一遍。
+"""
+import gzip
+import io
+import os
+from datetime import datetime, timezone
+
+from CloudWatch.cloud_watch_export_archive import ArchiveTokenIndex, _iter_raw_events, _to_event
+from CloudWatch.cloud_watch_token_index import log_id_token
+
+_LINES = [
+    b'2026-01-01T00:00:00.000Z first event\n',
+    b'2026-01-01T00:00:01.500Z Traceback (most recent call last):\n',
+    b'  File "app.py", line 1\n',
+    b'ValueError: boom\n',
+    b'2026-01-01T00:01:00.000Z last event without newline',
+]
+
+
+def _ms(*args) -> int:
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _offsets() -> list:
+    return [0, len(_LINES[0]), sum(map(len, _LINES[:4]))]
+
+
+def test_iter_raw_events():
+    events = list(_iter_raw_events(io.BytesIO(b''.join(_LINES))))
+    assert events == [
+        (_offsets()[0], _ms(2026, 1, 1), b'first event\n'),
+        (_offsets()[1], _ms(2026, 1, 1, 0, 0, 1, 500000),
+         b'Traceback (most recent call last):\n  File "app.py", line 1\nValueError: boom\n'),
+        (_offsets()[2], _ms(2026, 1, 1, 0, 1), b'last event without newline'),
+    ]
+
+
+def test_iter_raw_events_from_offset():
+    data = b''.join(_LINES)
+    offset = _offsets()[1]
+    events = list(_iter_raw_events(io.BytesIO(data), offset))
+    assert [pos for pos, _, _ in events] == _offsets()[1:]
+    # 偏移处即可 seek 回事件首行
+    assert data[offset:].startswith(b'2026-01-01T00:00:01.500Z ')
+
+
+def test_iter_raw_events_gzip_seek():
+    data = gzip.compress(b''.join(_LINES))
+    with gzip.open(io.BytesIO(data), 'rb') as fp:
+        events = list(_iter_raw_events(fp, _offsets()[2]))
+    assert events == [(_offsets()[2], _ms(2026, 1, 1, 0, 1), b'last event without newline')]
+
+
+def test_iter_raw_events_leading_continuation():
+    # 文件开头的续行没有所属事件，丢弃
+    events = list(_iter_raw_events(io.BytesIO(b'orphan line\n' + _LINES[0])))
+    assert events == [(len(b'orphan line\n'), _ms(2026, 1, 1), b'first event\n')]
+
+
+def test_iter_raw_events_empty():
+    assert list(_iter_raw_events(io.BytesIO(b''))) == []
+
+
+def test_to_event_strips_trailing_newline():
+    event = _to_event('task/stream/000000.gz', 'stream', 0, _ms(2026, 1, 1), b'first event\n')
+    assert event['message'] == 'first event'
+    assert event['logStreamName'] == 'stream'
+    assert event['timestamp'] == _ms(2026, 1, 1)
+    assert event['eventId'] != _to_event('task/stream/000000.gz', 'stream', 1, 0, b'')['eventId']
+
+
+def _write_archive(root, lines: list) -> None:
+    task_dir = root / 'task'
+    stream_dir = task_dir / 'stream-a'
+    os.makedirs(stream_dir)
+    (task_dir / 'aws-logs-write-test').write_text('')
+    with gzip.open(stream_dir / '000000.gz', 'wb') as fp:
+        fp.write(b''.join(lines))
+
+
+def test_lookup_reads_each_file_once(tmp_path, monkeypatch):
+    lines = [
+        f'2026-01-01T00:00:{i:02d}.000Z {"AAA111" if i % 3 else "BBB222"} \u2695 [INFO] step {i}\n'.encode()
+        for i in range(30)
+    ]
+    _write_archive(tmp_path, lines)
+    index = ArchiveTokenIndex(str(tmp_path))
+    index.build()
+
+    rewinds = []
+    rewind = gzip._GzipReader._rewind
+
+    def __rewind(self):
+        rewinds.append(1)
+        rewind(self)
+
+    monkeypatch.setattr(gzip._GzipReader, '_rewind', __rewind)
+    events = index.lookup([log_id_token('AAA111')])
+    assert [e['message'] for e in events] == [f'AAA111 \u2695 [INFO] step {i}' for i in range(30) if i % 3]
+    assert {e['logStreamName'] for e in events} == {'stream-a'}
+    assert rewinds == []
+
+    events = index.lookup([log_id_token('BBB222')], dt_start=datetime(2026, 1, 1, 0, 0, 10, tzinfo=timezone.utc),
+                          dt_end=datetime(2026, 1, 1, 0, 0, 20, tzinfo=timezone.utc))
+    assert [e['timestamp'] for e in events] == [_ms(2026, 1, 1, 0, 0, i) for i in (12, 15, 18)]
@@ -0,0 +1,77 @@
+"""
+cloud_watch_filter_pattern 一致性用例：本地匹配结果须与 CloudWatch Logs 服务端一致。
+"""
+import pytest
+
+from CloudWatch.cloud_watch_filter_pattern import parse_filter_pattern
+
+# (pattern, message, 期望结果)。用例取自 CloudWatch Logs filter pattern 文档中的示例及其边界情况。
+CONFORMANCE_CASES = [
+    # 非结构化
+    ('', 'anything', True),
+    ('ERROR', '[ERROR] something failed', True),
+    ('ERROR', '[error] something failed', False),
+    ('ERROR Exception', 'ERROR NullPointerException at line 3', True),
+    ('ERROR Exception', 'ERROR at line 3', False),
+    ('"Out of memory"', 'java.lang.Error: Out of memory', True),
+    ('"Out of memory"', 'Out of disk memory', False),
+    ('?ERROR ?WARN', 'WARN disk almost full', True),
+    ('?ERROR ?WARN', 'INFO all good', False),
+    ('ERROR -Exiting', 'ERROR retrying', True),
+    ('ERROR -Exiting', 'ERROR Exiting now', False),
+    ('ERROR -"Exiting now"', 'ERROR Exiting later', True),
+    (r'%\[ERROR\]%', '2026-01-01 [ERROR] boom', True),
+    (r'%\[ERROR\]%', '2026-01-01 ERROR boom', False),
+    (r'%RequestId:%', 'START RequestId: 1234 Version: $LATEST', True),
+    (r'%abc\-1|def\-2%', 'id def-2 done', True),
+    (r'%abc\-1|def\-2%', 'id ghi-3 done', False),
+    (r'%code \d+%', 'resp code 404', True),
+    (r'ERROR %code \d+%', 'ERROR resp code 404', True),
+    (r'ERROR %code \d+%', 'WARN resp code 404', False),
+    # JSON
+    ('{ $.eventType = "UpdateTrail" }', '{"eventType": "UpdateTrail"}', True),
+    ('{ $.eventType = UpdateTrail }', '{"eventType": "UpdateTrail"}', True),
+    ('{ $.eventType = "UpdateTrail" }', '{"eventType": "CreateTrail"}', False),
+    ('{ $.eventType = "UpdateTrail" }', 'eventType UpdateTrail', False),
+    ('{ $.eventType = "*Trail" }', '{"eventType": "CreateTrail"}', True),
+    ('{ $.sourceIPAddress != 123.123.* }', '{"sourceIPAddress": "10.0.0.1"}', True),
+    ('{ $.sourceIPAddress != 123.123.* }', '{"sourceIPAddress": "123.123.0.1"}', False),
+    ('{ $.latency >= 500 }', '{"latency": 500}', True),
+    ('{ $.latency >= 500 }', '{"latency": 499.5}', False),
+    ('{ $.latency > 500 }', '{"latency": "900"}', False),
+    ('{ $.code = 404 }', '{"code": 404}', True),
+    ('{ $.code != 404 }', '{"code": 200}', True),
+    ('{ $.errorCode = %Unauth.*% }', '{"errorCode": "UnauthorizedOperation"}', True),
+    ('{ $.user.id = 1 && $.users[0].name = "bob" }', '{"user": {"id": 1}, "users": [{"name": "bob"}]}', True),
+    ('{ $.user.id = 1 && $.users[0].name = "bob" }', '{"user": {"id": 2}, "users": [{"name": "bob"}]}', False),
+    ('{ ($.a = 1 || $.b = 2) && $.c = 3 }', '{"b": 2, "c": 3}', True),
+    ('{ ($.a = 1 || $.b = 2) && $.c = 3 }', '{"b": 2, "c": 4}', False),
+    ('{ $.tags[*] = "prod" }', '{"tags": ["dev", "prod"]}', True),
+    ('{ $.tags[*] = "prod" }', '{"tags": ["dev"]}', False),
+    ('{ $.a IS NULL }', '{"a": null}', True),
+    ('{ $.a IS NULL }', '{}', False),
+    ('{ $.flag IS TRUE }', '{"flag": true}', True),
+    ('{ $.flag IS FALSE }', '{"flag": true}', False),
+    ('{ $.missing NOT EXISTS }', '{"a": 1}', True),
+    ('{ $.a NOT EXISTS }', '{"a": 1}', False),
+    ('{ $.msg = "a b" }', '{"msg": "a b"}', True),
+    # 空格分隔
+    ('[ip, user, username, timestamp, request = "*html*", status_code = 4*, bytes]',
+     '127.0.0.1 - frank [10/Oct/2000:13:25:15 -0700] "GET /index.html HTTP/1.0" 404 1534', True),
+    ('[ip, user, username, timestamp, request = "*html*", status_code = 4*, bytes]',
+     '127.0.0.1 - frank [10/Oct/2000:13:25:15 -0700] "GET /index.html HTTP/1.0" 200 1534', False),
+    ('[ip, user, username, timestamp, request, status_code, bytes]',
+     '127.0.0.1 - frank [10/Oct/2000:13:25:15 -0700] "GET /index.html HTTP/1.0" 200', False),
+    ('[..., status_code = 404 || status_code = 500, bytes]',
+     '127.0.0.1 - frank [10/Oct/2000:13:25:15 -0700] "GET / HTTP/1.0" 500 12', True),
+    ('[..., bytes > 1000]', 'a b c 1534', True),
+    ('[..., bytes > 1000]', 'a b c 999', False),
+    ('[level = ERROR, ...]', 'ERROR something failed', True),
+    ('[level = ERROR, ...]', 'WARN ERROR something failed', False),
+    ('[level, ..., code = %^E\\d+$%]', 'WARN x y E42', True),
+]
+
+
+@pytest.mark.parametrize('pattern,message,expected', CONFORMANCE_CASES)
+def test_conformance(pattern: str, message: str, expected: bool):
+    assert parse_filter_pattern(pattern)(message) == expected
@@ -0,0 +1,80 @@
+"""
+split_time_range / merge_time_slices：分段边界与按段拼接、边界去重、命中即停。
+"""
+import time
+from datetime import datetime, timedelta
+
+from CloudWatch.cloud_watch_dataclass import FetchStats, StopReason
+from CloudWatch.cloud_watch_helper import merge_time_slices, split_time_range
+
+_DT_START = datetime(2026, 1, 1, 0, 0, 0)
+
+
+def _ms(dt: datetime) -> int:
+    return int(dt.timestamp() * 1000)
+
+
+def _event(event_id: str, dt: datetime) -> dict:
+    return {'eventId': event_id, 'timestamp': _ms(dt), 'message': event_id}
+
+
+def _stats(iterations: int) -> FetchStats:
+    return FetchStats(iterations=iterations, events_per_iteration=[1] * iterations)
+
+
+def test_split_time_range_contiguous():
+    dt_end = _DT_START + timedelta(hours=1)
+    bounds = split_time_range(_DT_START, dt_end, 4)
+    assert len(bounds) == 4
+    assert bounds[0][0] == _DT_START
+    assert bounds[-1][1] == dt_end
+    for (_, prev_end), (next_start, _) in zip(bounds, bounds[1:]):
+        assert prev_end == next_start
+    assert all(seg_end - seg_start == timedelta(minutes=15) for seg_start, seg_end in bounds)
+
+
+def test_split_time_range_min_one_second():
+    bounds = split_time_range(_DT_START, _DT_START + timedelta(seconds=3), 10)
+    assert len(bounds) == 3
+
+
+def test_split_time_range_empty_range():
+    assert split_time_range(_DT_START, _DT_START, 4) == [(_DT_START, _DT_START)]
+
+
+def test_merge_time_slices_dedup_boundary():
+    bounds = split_time_range(_DT_START, _DT_START + timedelta(minutes=2), 2)
+    boundary = bounds[0][1]
+    shared = _event('b', boundary)
+    results = [
+        ([_event('a', _DT_START), shared], _stats(2)),
+        ([shared, _event('c', boundary + timedelta(seconds=1))], _stats(3)),
+    ]
+    events, stats = merge_time_slices(bounds, results, [False, False], False, False, time.perf_counter())
+    assert [e['eventId'] for e in events] == ['a', 'b', 'c']
+    assert stats.iterations == 5
+    assert stats.total_events == 3
+    assert stats.events_per_iteration == [1] * 5
+    assert stats.stopped_by == StopReason.COMPLETED
+
+
+def test_merge_time_slices_stop_on_match():
+    bounds = split_time_range(_DT_START, _DT_START + timedelta(minutes=3), 3)
+    results = [
+        ([], _stats(1)),
+        ([_event('a', bounds[1][0])], _stats(1)),
+        ([_event('b', bounds[2][0])], _stats(1)),
+    ]
+    events, stats = merge_time_slices(bounds, results, [False, False, True], True, False, time.perf_counter())
+    assert [e['eventId'] for e in events] == ['a']
+    assert stats.stopped_by == StopReason.MATCH_FOUND
+    # 被取消的分段仍计入 API 调用统计
+    assert stats.iterations == 3
+
+
+def test_merge_time_slices_stopped_externally():
+    bounds = split_time_range(_DT_START, _DT_START + timedelta(minutes=2), 2)
+    results = [([_event('a', _DT_START)], _stats(1)), ([], _stats(0))]
+    events, stats = merge_time_slices(bounds, results, [False, False], False, True, time.perf_counter())
+    assert [e['eventId'] for e in events] == ['a']
+    assert stats.stopped_by == StopReason.STOP_EVENT
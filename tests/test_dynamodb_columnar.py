@@ -0,0 +1,91 @@
+"""
+ColumnarTable 谓词：分区裁剪（_may_match）与逐行过滤（_row_match）的结果须与逐行直接比较一致。
+"""
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from DynamoDB import dynamodb_columnar
+from DynamoDB.dynamodb_columnar import ColumnarTable, convert_export_to_columnar
+from DynamoDB.dynamodb_helper import RecordBatch
+
+# 两个分区：level 区间分别为 [1, 3] / [10, 12]；第二个分区没有 tag 列
+_BATCHES = [
+    RecordBatch(
+        source='s0', columns=['pk', 'level', 'tag', 'price'], num_rows=3,
+        values=[['a', 'b', 'c'], [1, 2, 3], ['x', None, 'y'], [Decimal('1.5'), None, Decimal('3')]],
+    ),
+    RecordBatch(
+        source='s1', columns=['pk', 'level', 'ts'], num_rows=3,
+        values=[['d', 'e', 'f'], [10, 11, 12],
+                [datetime(2026, 1, d, tzinfo=timezone.utc) for d in (1, 2, 3)]],
+    ),
+]
+
+
+@pytest.fixture
+def table(tmp_path, monkeypatch) -> ColumnarTable:
+    monkeypatch.setattr(dynamodb_columnar, 'iter_export_batches_parallel', lambda *args, **kwargs: iter(_BATCHES))
+    return ColumnarTable(convert_export_to_columnar(str(tmp_path)))
+
+
+def _pks(table: ColumnarTable, where) -> list:
+    return sorted(row['pk'] for row in table.scan(columns=['pk'], where=where))
+
+
+@pytest.mark.parametrize('where,expected', [
+    ([], ['a', 'b', 'c', 'd', 'e', 'f']),
+    ([('level', '==', 2)], ['b']),
+    ([('level', '!=', 2)], ['a', 'c', 'd', 'e', 'f']),
+    ([('level', '<', 3)], ['a', 'b']),
+    ([('level', '<=', 3)], ['a', 'b', 'c']),
+    ([('level', '>', 10)], ['e', 'f']),
+    ([('level', '>=', 10)], ['d', 'e', 'f']),
+    ([('level', 'in', {3, 11, 99})], ['c', 'e']),
+    ([('level', '>', 100)], []),
+    ([('tag', 'is_null', None)], ['b', 'd', 'e', 'f']),
+    ([('tag', 'not_null', None)], ['a', 'c']),
+    ([('tag', '==', 'x')], ['a']),
+    ([('tag', '!=', 'x')], ['b', 'c', 'd', 'e', 'f']),
+    ([('price', '>', Decimal('2'))], ['c']),
+    ([('ts', '>=', datetime(2026, 1, 2, tzinfo=timezone.utc))], ['e', 'f']),
+    ([('level', '>=', 2), ('tag', 'not_null', None)], ['c']),
+    ([('missing', 'is_null', None)], ['a', 'b', 'c', 'd', 'e', 'f']),
+    ([('missing', '==', 1)], []),
+])
+def test_scan_where(table: ColumnarTable, where, expected):
+    assert _pks(table, where) == expected
+    assert table.count(where) == len(expected)
+
+
+def test_partition_pruning(table: ColumnarTable, monkeypatch):
+    loaded = []
+    load = ColumnarTable._load
+
+    def __load(self, part, col):
+        loaded.append(part.name)
+        return load(self, part, col)
+
+    monkeypatch.setattr(ColumnarTable, '_load', __load)
+    assert _pks(table, [('level', '>=', 10)]) == ['d', 'e', 'f']
+    assert set(loaded) == {'part-00001'}
+
+
+def test_values_round_trip(table: ColumnarTable):
+    rows = {row['pk']: row for row in table.scan()}
+    assert rows['a']['price'] == Decimal('1.5')
+    assert rows['b']['price'] is None
+    assert rows['d']['ts'] == datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert rows['d']['tag'] is None
+    assert table.num_rows == 6
+
+
+def test_group_count(table: ColumnarTable):
+    assert table.group_count('tag') == {'x': 1, 'y': 1, None: 4}
+    assert table.group_count('tag', where=[('level', '<', 3)]) == {'x': 1, None: 1}
+
+
+def test_unsupported_op(table: ColumnarTable):
+    with pytest.raises(ValueError):
+        list(table.scan(where=[('level', '~', 1)]))
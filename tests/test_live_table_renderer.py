@@ -0,0 +1,88 @@
+"""
+LiveTableRenderer.render：首帧整屏绘制，之后只重写变化的行，超出终端尺寸时退化为整屏重绘。
+"""
+import io
+import os
+
+import pytest
+
+from utils.TablePrinter import live_table_renderer
+from utils.TablePrinter.live_table_renderer import LiveTableRenderer, get_visible_width
+
+_CSI = '\033['
+_FRAME_START = f'{_CSI}?25l'
+_FRAME_END = f'{_CSI}?25h'
+_CLEAR_SCREEN = f'{_CSI}H{_CSI}2J'
+
+
+@pytest.fixture
+def stream(monkeypatch) -> io.StringIO:
+    monkeypatch.setattr(live_table_renderer.shutil, 'get_terminal_size', lambda: os.terminal_size((40, 10)))
+    return io.StringIO()
+
+
+def _render(renderer: LiveTableRenderer, stream: io.StringIO, lines: list) -> str:
+    stream.seek(0)
+    stream.truncate()
+    renderer.render(lines)
+    out = stream.getvalue()
+    assert out.startswith(_FRAME_START) and out.endswith(_FRAME_END)
+    return out[len(_FRAME_START):-len(_FRAME_END)]
+
+
+def test_first_frame_full_redraw(stream: io.StringIO):
+    renderer = LiveTableRenderer(stream)
+    assert _render(renderer, stream, ['a', 'b']) == f'{_CLEAR_SCREEN}a\nb\n'
+    assert renderer.lines_written == 2
+
+
+def test_unchanged_frame_writes_nothing(stream: io.StringIO):
+    renderer = LiveTableRenderer(stream)
+    renderer.render(['a', 'b', 'c'])
+    assert _render(renderer, stream, ['a', 'b', 'c']) == f'{_CSI}3F{_CSI}3E'
+    assert renderer.lines_written == 3
+
+
+def test_changed_lines_only(stream: io.StringIO):
+    renderer = LiveTableRenderer(stream)
+    renderer.render(['a', 'b', 'c', 'd'])
+    out = _render(renderer, stream, ['a', 'B', 'c', 'D'])
+    assert out == f'{_CSI}4F{_CSI}1E{_CSI}2KB\n{_CSI}1E{_CSI}2KD\n'
+    assert renderer.lines_written == 6
+
+
+def test_shorter_frame_clears_rest(stream: io.StringIO):
+    renderer = LiveTableRenderer(stream)
+    renderer.render(['a', 'b', 'c'])
+    assert _render(renderer, stream, ['a']) == f'{_CSI}3F{_CSI}1E{_CSI}J'
+
+
+def test_longer_frame_appends(stream: io.StringIO):
+    renderer = LiveTableRenderer(stream)
+    renderer.render(['a'])
+    assert _render(renderer, stream, ['a', 'b']) == f'{_CSI}1F{_CSI}1E{_CSI}2Kb\n'
+
+
+@pytest.mark.parametrize('lines', [
+    [str(i) for i in range(10)],  # 帧高度达到终端高度
+    ['x' * 41],                   # 行超出终端宽度
+])
+def test_oversized_frame_full_redraw(stream: io.StringIO, lines: list):
+    renderer = LiveTableRenderer(stream)
+    renderer.render(['a'])
+    assert _render(renderer, stream, lines).startswith(_CLEAR_SCREEN)
+
+
+def test_ansi_line_fits_width(stream: io.StringIO):
+    # 颜色序列不计宽度：显示宽度恰好等于终端宽度时仍增量刷新
+    colored = f'{_CSI}31m{"x" * 40}{_CSI}0m'
+    assert get_visible_width(colored) == 40
+    renderer = LiveTableRenderer(stream)
+    renderer.render(['a'])
+    assert _render(renderer, stream, [colored]) == f'{_CSI}1F{_CSI}2K{colored}\n'
+
+
+def test_non_incremental(stream: io.StringIO):
+    renderer = LiveTableRenderer(stream, incremental=False)
+    renderer.render(['a'])
+    assert _render(renderer, stream, ['a']) == f'{_CLEAR_SCREEN}a\n'
@@ -0,0 +1,51 @@
+"""
+split_export_slices：按 UTC 对齐的 slice_hours 边界切片，首尾片可不满一片。
+"""
+from datetime import datetime, timezone
+
+from CloudWatch.LogGroupDownloader import split_export_slices
+
+_HOUR_MS = 3600 * 1000
+
+
+def _ms(*args) -> int:
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def test_split_export_slices_aligned():
+    start, end = _ms(2026, 1, 1), _ms(2026, 1, 4)
+    assert split_export_slices(start, end, 24) == [
+        (_ms(2026, 1, 1), _ms(2026, 1, 2)),
+        (_ms(2026, 1, 2), _ms(2026, 1, 3)),
+        (_ms(2026, 1, 3), _ms(2026, 1, 4)),
+    ]
+
+
+def test_split_export_slices_unaligned_edges():
+    start, end = _ms(2026, 1, 1, 20, 30), _ms(2026, 1, 3, 1)
+    assert split_export_slices(start, end, 24) == [
+        (start, _ms(2026, 1, 2)),
+        (_ms(2026, 1, 2), _ms(2026, 1, 3)),
+        (_ms(2026, 1, 3), end),
+    ]
+
+
+def test_split_export_slices_contiguous():
+    start, end = _ms(2026, 1, 1, 0, 0, 1), _ms(2026, 1, 1, 23, 59, 59)
+    slices = split_export_slices(start, end, 6)
+    assert len(slices) == 4
+    assert slices[0][0] == start and slices[-1][1] == end
+    for (_, prev_end), (next_start, _) in zip(slices, slices[1:]):
+        assert prev_end == next_start
+        assert next_start % (6 * _HOUR_MS) == 0
+
+
+def test_split_export_slices_within_one_slice():
+    start, end = _ms(2026, 1, 1, 1), _ms(2026, 1, 1, 2)
+    assert split_export_slices(start, end, 24) == [(start, end)]
+
+
+def test_split_export_slices_empty():
+    start = _ms(2026, 1, 1)
+    assert split_export_slices(start, start, 24) == []
+    assert split_export_slices(start, start - 1, 24) == []
@@ -0,0 +1,45 @@
+"""
+fetch_request_logs_single_pass：logStreamNames 超过 FilterLogEvents 上限时分批扫描，结果按时间合并。
+"""
+from datetime import datetime, timedelta, timezone
+
+from CloudWatch.LambdaRequestLog.SearchAlertErrorRequest import FANOUT_MAX_STREAMS, fetch_request_logs_single_pass
+
+
+class _StreamClient:
+    """每个 stream 返回一条事件，时间戳随 stream 序号递减，验证跨批合并后的顺序。"""
+
+    def __init__(self):
+        self.stream_counts = []
+
+    def filter_log_events(self, **kwargs):
+        names = kwargs['logStreamNames']
+        self.stream_counts.append(len(names))
+        return {'events': [
+            {'eventId': name, 'timestamp': 100000 - int(name[1:]), 'logStreamName': name, 'message': f'ID{name} x'}
+            for name in names
+        ]}
+
+
+def test_single_pass_batches_streams():
+    client = _StreamClient()
+    streams = [f's{i}' for i in range(FANOUT_MAX_STREAMS * 2 + 50)]
+    dt_end = datetime.now(timezone.utc)
+    hits = fetch_request_logs_single_pass(
+        client, 'us-east-1', '/test/group', {'IDs0', 'IDs150', 'IDs249'}, dt_end - timedelta(minutes=5), dt_end,
+        log_stream_names=streams,
+    )
+    assert client.stream_counts == [FANOUT_MAX_STREAMS, FANOUT_MAX_STREAMS, 50]
+    assert [e['eventId'] for e in hits] == ['s249', 's150', 's0']
+
+
+def test_single_pass_budget_spans_batches():
+    client = _StreamClient()
+    streams = [f's{i}' for i in range(FANOUT_MAX_STREAMS * 3)]
+    dt_end = datetime.now(timezone.utc)
+    hits = fetch_request_logs_single_pass(
+        client, 'us-east-1', '/test/group', {'IDs0'}, dt_end - timedelta(minutes=5), dt_end,
+        log_stream_names=streams, max_calls=2,
+    )
+    assert hits is None
+    assert len(client.stream_counts) == 3
@@ -0,0 +1,96 @@
+"""
+终端内原地刷新的表格输出：只重写与上一帧不同的行，不清屏、不起子进程。
+
+用法：
+    renderer = LiveTableRenderer()
+    while ...:
+        renderer.render(lines)   # lines: 本帧要显示的全部行（可含颜色 / 超链接等 ANSI 序列）
+    renderer.close()
+
+实现：
+    上一帧结束时光标停在帧末尾的下一行行首。新帧先用 CSI n F 回到帧首，逐行对比：
+    相同的行用 CSI n E 跳过，不同的行 CSI 2K 清行后重写；新帧更短时 CSI J 清掉多余的行。
+    帧高度超过终端高度、或有行超出终端宽度（会折行，光标行数对不上）时退化为整屏重绘（CSI H + CSI 2J）。
+"""
+import os
+import re
+import shutil
+import sys
+from typing import List, Optional, TextIO
+
+from utils.TablePrinter.table_printer import get_display_ansi_width
+
+_CSI = '\033['
+_HIDE_CURSOR = f'{_CSI}?25l'
+_SHOW_CURSOR = f'{_CSI}?25h'
+_CLEAR_SCREEN = f'{_CSI}H{_CSI}2J'
+_CLEAR_LINE = f'{_CSI}2K'
+_CLEAR_TO_END = f'{_CSI}J'
+
+# 颜色等 CSI 序列、OSC 8 超链接，不占显示宽度
+_PAT_ANSI = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]|\x1b\]8;[^\x1b]*\x1b\\')
+
+
+def get_visible_width(line: str) -> int:
+    """去掉 ANSI 控制序列后的显示宽度（宽字符按 2 计）。"""
+    return get_display_ansi_width(_PAT_ANSI.sub('', line))
+
+
+class LiveTableRenderer:
+    """
+    :param stream:      输出流，默认 sys.stdout
+    :param incremental: False 时每帧整屏重绘（终端不支持光标移动时使用）
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, incremental: bool = True):
+        self.stream = stream if stream is not None else sys.stdout
+        self.incremental = incremental
+        self._lines: Optional[List[str]] = None
+        self.lines_written = 0  # 累计重写的行数（观察刷新开销用）
+        if sys.platform == 'win32':
+            os.system('')  # 打开 Windows 控制台的 VT 序列支持，只需一次
+
+    def _need_full_redraw(self, lines: List[str]) -> bool:
+        if not self.incremental or self._lines is None:
+            return True
+        size = shutil.get_terminal_size()
+        if max(len(lines), len(self._lines)) >= size.lines:
+            return True
+        return any(get_visible_width(line) > size.columns for line in lines)
+
+    def render(self, lines: List[str]) -> int:
+        """输出一帧，返回本帧重写的行数。"""
+        out: List[str] = [_HIDE_CURSOR]
+        written = 0
+        if self._need_full_redraw(lines):
+            out.append(_CLEAR_SCREEN)
+            out += [f'{line}\n' for line in lines]
+            written = len(lines)
+        else:
+            prev = self._lines
+            if prev:
+                out.append(f'{_CSI}{len(prev)}F')
+            skip = 0
+            for i, line in enumerate(lines):
+                if i < len(prev) and prev[i] == line:
+                    skip += 1
+                    continue
+                if skip:
+                    out.append(f'{_CSI}{skip}E')
+                    skip = 0
+                out.append(f'{_CLEAR_LINE}{line}\n')
+                written += 1
+            if skip:
+                out.append(f'{_CSI}{skip}E')
+            if len(lines) < len(prev):
+                out.append(_CLEAR_TO_END)
+        out.append(_SHOW_CURSOR)
+        self.stream.write(''.join(out))
+        self.stream.flush()
+        self._lines = list(lines)
+        self.lines_written += written
+        return written
+
+    def close(self) -> None:
+        self.stream.write(_SHOW_CURSOR)
+        self.stream.flush()
@@ -0,0 +1,198 @@
+"""
+按 (account, region, API) 维护 AdaptiveRateLimiter，并通过 botocore 事件钩子接入任意 client。
+
+用法：
+    client = session.client('logs')
+    install_adaptive_rate_control(client, account=profile_name)
+    client.filter_log_events(...)   # 每次发送（含 botocore 重试）前按当前速率排队，
+                                    # 成功加速、ThrottlingException 降速
+
+    # aiobotocore client：等待改为 asyncio.sleep，不阻塞事件循环
+    async with session.create_client('gamelift', ...) as client:
+        install_adaptive_rate_control(client, account=profile_name, is_async=True)
+
+钩子：
+    - before-send.<service>：每次实际发送 HTTP 请求前 acquire（botocore 内部重试也会经过）
+    - needs-retry.<service>：每次收到响应后按错误码 on_success / on_throttle；
+      用 register_first 注册，保证在 botocore 自带重试处理器返回重试延迟之前执行
+
+持久化：
+    学到的速率在进程退出时写入 AwsTools 目录下的 adaptive_rates.json（与 log_groups_cache 同目录），
+    下次运行直接从上次的速率起步。多进程各自学习，保存时按 key 合并，后写入者覆盖同一 key。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from .rate_limiter import AdaptiveRateLimiter
+
+# 视为限流的错误码（各服务命名不一）
+THROTTLE_ERROR_CODES = frozenset([
+    'Throttling', 'ThrottlingException', 'ThrottledException', 'RequestThrottled',
+    'RequestThrottledException', 'TooManyRequestsException', 'RequestLimitExceeded',
+    'ProvisionedThroughputExceededException', 'SlowDown',
+])
+
+# 已知配额，作为没有历史记录时的初始速率（service_name, operation）
+KNOWN_RATES: Dict[Tuple[str, str], float] = {
+    ('logs', 'FilterLogEvents'): 5.0,
+    ('logs', 'DescribeLogGroups'): 5.0,
+    ('logs', 'DescribeLogStreams'): 5.0,
+    ('logs', 'GetLogEvents'): 25.0,
+}
+DEFAULT_RATE = 5.0
+
+_STATE_FILE_NAME = 'adaptive_rates.json'
+_INSTALLED_ATTR = '_adaptive_rate_control_installed'
+
+RateKey = Tuple[str, str, str, str]  # (account, region, service_name, operation)
+
+
+def _key_to_str(key: RateKey) -> str:
+    return '|'.join(key)
+
+
+class AdaptiveRateRegistry:
+    """
+    进程内按 (account, region, service, operation) 懒创建 AdaptiveRateLimiter，线程安全。
+
+    :param state_path: 持久化文件路径；None 表示默认路径，'' 表示不持久化
+    """
+
+    def __init__(self, state_path: Optional[str] = None, **limiter_kwargs):
+        if state_path is None:
+            # 延迟导入：log_groups_cache 经 log_groups_service 依赖 aws_client_pool，而 aws_client_pool 导入本模块
+            from services.cloudwatch.log_groups_cache import get_cache_dir
+            state_path = str(get_cache_dir() / _STATE_FILE_NAME)
+        self.state_path = state_path
+        self._limiter_kwargs = limiter_kwargs
+        self._limiters: Dict[RateKey, AdaptiveRateLimiter] = {}
+        self._lock = threading.Lock()
+        self._saved_rates = self._load()
+
+    def get(self, account: str, region: str, service: str, operation: str) -> AdaptiveRateLimiter:
+        key = (account, region, service, operation)
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                rate = self._saved_rates.get(_key_to_str(key), KNOWN_RATES.get((service, operation), DEFAULT_RATE))
+                limiter = AdaptiveRateLimiter(rate, **self._limiter_kwargs)
+                self._limiters[key] = limiter
+            return limiter
+
+    def snapshot(self) -> Dict[RateKey, float]:
+        """当前各 key 的速率（TPS）。"""
+        with self._lock:
+            return {key: limiter.rate for key, limiter in self._limiters.items()}
+
+    def save(self) -> None:
+        """把本进程用到的各 key 速率合并写回持久化文件（写临时文件后原子替换）。"""
+        if not self.state_path:
+            return
+        rates = self.snapshot()
+        if not rates:
+            return
+        data = self._read_file()
+        now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        for key, rate in rates.items():
+            data[_key_to_str(key)] = {'rate': round(rate, 3), 'updated_at': now}
+        tmp_path = f'{self.state_path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.state_path)
+        except OSError:
+            pass  # 持久化失败不影响本次运行
+
+    def _read_file(self) -> dict:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _load(self) -> Dict[str, float]:
+        rates: Dict[str, float] = {}
+        for key, item in self._read_file().items():
+            try:
+                rates[key] = float(item['rate'])
+            except (KeyError, TypeError, ValueError):
+                continue
+        return rates
+
+
+_registry: Optional[AdaptiveRateRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_adaptive_registry() -> AdaptiveRateRegistry:
+    """进程级默认 registry，首次使用时创建并注册退出时保存。"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = AdaptiveRateRegistry()
+            atexit.register(_registry.save)
+        return _registry
+
+
+def is_adaptive_client(client) -> bool:
+    return getattr(client, _INSTALLED_ATTR, False)
+
+
+def install_adaptive_rate_control(
+    client,
+    account: str,
+    registry: Optional[AdaptiveRateRegistry] = None,
+    is_async: bool = False,
+):
+    """
+    给 boto3 / aiobotocore client 挂上自适应限速钩子，重复调用无副作用。
+
+    :param account:  账号标识（通常是 profile 名），与 region、API 一起组成限速 key
+    :param registry: 默认使用进程级 registry
+    :param is_async: aiobotocore client 传 True，等待改为 asyncio.sleep
+    :return: 传入的 client
+    """
+    if is_adaptive_client(client):
+        return client
+    registry = registry if registry is not None else get_adaptive_registry()
+    service_model = client.meta.service_model
+    service_name = service_model.service_name
+    event_service = service_model.service_id.hyphenize()
+    region = client.meta.region_name or ''
+
+    def __limiter(event_name: str) -> AdaptiveRateLimiter:
+        return registry.get(account, region, service_name, event_name.rsplit('.', 1)[-1])
+
+    if is_async:
+        async def __before_send(event_name: str, **_):
+            await asyncio.sleep(__limiter(event_name).reserve())
+    else:
+        def __before_send(event_name: str, **_):
+            __limiter(event_name).acquire()
+
+    def __needs_retry(event_name: str, response=None, **_):
+        if response is None:
+            return None  # 连接错误等，不反映服务端配额
+        http_response, parsed = response
+        code = parsed.get('Error', {}).get('Code') if isinstance(parsed, dict) else None
+        if code in THROTTLE_ERROR_CODES or getattr(http_response, 'status_code', 0) == 429:
+            __limiter(event_name).on_throttle()
+        elif getattr(http_response, 'status_code', 500) < 400:
+            __limiter(event_name).on_success()
+        return None
+
+    client.meta.events.register(f'before-send.{event_service}', __before_send)
+    client.meta.events.register_first(f'needs-retry.{event_service}', __needs_retry)
+    setattr(client, _INSTALLED_ATTR, True)
+    return client
@@ -0,0 +1,209 @@
+"""
+进程级 boto3 session / client 池（线程安全）。
+
+构造 client 要加载 service model，单次约 50~150ms、占用数 MB；同一进程内按
+(profile, region, service, config) 复用同一个 client，也就复用了它的 HTTP 连接池。
+
+用法：
+    client = get_client('logs', region, profile)
+    client = get_client('lambda', region, profile, config=BotoConfig(connect_timeout=3), adaptive=True)
+    client = get_env_client('s3', env, region)        # profile 由 get_aws_profile 推导
+
+    session = get_session(profile, region)            # 需要 session 本身时（如打印 aws-mfa 命令）
+
+设计：
+    - boto3 client 本身线程安全，session 不是：创建 session / client 都在锁内完成
+    - LRU：最多保留 max_clients 个 client，超出时淘汰最久未用的；
+      被淘汰的 client 不主动 close（别的线程可能还在用），由引用计数回收
+    - 凭证过期：aws-mfa 刷新临时凭证是改写 credentials 文件，已创建的 session 不会重新读取；
+      每隔 _CRED_CHECK_INTERVAL 秒检查一次文件 mtime，变化后清空池，后续调用按新凭证重建。
+      遇到 ExpiredToken 时也可以主动 invalidate(profile)
+    - adaptive=True 的 client 挂上自适应限速钩子（见 utils.adaptive_rate_control），与普通 client 分开缓存
+    - proxy 配置（check_proxy 会读注册表 / 环境变量）每个进程只检查一次
+
+多进程 worker 各自持有一个池，不跨进程共享。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Hashable, Optional, Tuple
+
+import boto3
+from botocore.config import Config as BotoConfig
+
+from .adaptive_rate_control import install_adaptive_rate_control
+from .aws_client_helper import get_aws_profile
+from .aws_consts import Env
+from .proxy_helper import check_proxy
+
+DEFAULT_MAX_CLIENTS = 64
+_CRED_CHECK_INTERVAL = 5.0  # 检查 credentials 文件是否被改写的最短间隔（秒）
+
+ClientKey = Tuple[str, str, str, Hashable, bool]  # (profile, region, service, config_key, adaptive)
+
+
+@lru_cache(maxsize=1)
+def get_proxy_config() -> Optional[BotoConfig]:
+    """系统代理对应的 botocore Config；没有代理时返回 None。每个进程只检查一次。"""
+    proxy_enable, proxy = check_proxy()
+    if not proxy_enable:
+        return None
+    return BotoConfig(proxies={'http': proxy, 'https': proxy})
+
+
+def _config_key(config: Optional[BotoConfig]) -> Hashable:
+    """Config 不可哈希，按用户显式设置的选项生成 key。"""
+    if config is None:
+        return None
+    options = getattr(config, '_user_provided_options', None) or {}
+    return tuple(sorted((k, repr(v)) for k, v in options.items()))
+
+
+def _credentials_file() -> Path:
+    return Path(os.environ.get('AWS_SHARED_CREDENTIALS_FILE', str(Path.home() / '.aws' / 'credentials')))
+
+
+def _file_mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+class ClientPool:
+    """
+    boto3 session / client 池。
+
+    :param max_clients: 最多缓存的 client 数
+    """
+
+    def __init__(self, max_clients: int = DEFAULT_MAX_CLIENTS):
+        self.max_clients = max_clients
+        self._sessions: Dict[Tuple[str, str], boto3.Session] = {}
+        self._clients: 'OrderedDict[ClientKey, object]' = OrderedDict()
+        self._lock = threading.RLock()
+        self._cred_path = _credentials_file()
+        self._cred_mtime = _file_mtime(self._cred_path)
+        self._cred_checked_at = time.monotonic()
+        self.created = 0  # 累计创建的 client 数（观察命中率用）
+
+    def session(self, profile: str, region: str) -> boto3.Session:
+        with self._lock:
+            self._check_credentials()
+            return self._get_session(profile, region)
+
+    def client(
+        self,
+        service: str,
+        region: str,
+        profile: str,
+        config: Optional[BotoConfig] = None,
+        use_proxy: bool = False,
+        adaptive: bool = False,
+    ):
+        """
+        取 (profile, region, service, config) 对应的 client，不存在时创建。
+
+        :param use_proxy: 合并系统代理配置（见 get_proxy_config）
+        :param adaptive:  挂上自适应限速钩子，account 使用 profile
+        """
+        if use_proxy:
+            proxy_config = get_proxy_config()
+            if proxy_config is not None:
+                config = proxy_config if config is None else config.merge(proxy_config)
+        key: ClientKey = (profile, region, service, _config_key(config), adaptive)
+        with self._lock:
+            self._check_credentials()
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                return client
+            client = self._get_session(profile, region).client(service, region_name=region, config=config)
+            if adaptive:
+                install_adaptive_rate_control(client, account=profile)
+            self.created += 1
+            self._clients[key] = client
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+            return client
+
+    def invalidate(self, profile: Optional[str] = None) -> None:
+        """丢弃 profile（None 表示全部）的 session 和 client，下次使用时重新读取凭证。"""
+        with self._lock:
+            if profile is None:
+                self._sessions.clear()
+                self._clients.clear()
+                return
+            for key in [k for k in self._sessions if k[0] == profile]:
+                del self._sessions[key]
+            for key in [k for k in self._clients if k[0] == profile]:
+                del self._clients[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
+
+    def _get_session(self, profile: str, region: str) -> boto3.Session:
+        session = self._sessions.get((profile, region))
+        if session is None:
+            session = boto3.Session(region_name=region, profile_name=profile)
+            self._sessions[(profile, region)] = session
+        return session
+
+    def _check_credentials(self) -> None:
+        now = time.monotonic()
+        if now - self._cred_checked_at < _CRED_CHECK_INTERVAL:
+            return
+        self._cred_checked_at = now
+        mtime = _file_mtime(self._cred_path)
+        if mtime != self._cred_mtime:
+            self._cred_mtime = mtime
+            self._sessions.clear()
+            self._clients.clear()
+
+
+_pool: Optional[ClientPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_client_pool() -> ClientPool:
+    """进程级默认 client 池。"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ClientPool()
+        return _pool
+
+
+def get_session(profile: str, region: str) -> boto3.Session:
+    return get_client_pool().session(profile, region)
+
+
+def get_client(
+    service: str,
+    region: str,
+    profile: str,
+    config: Optional[BotoConfig] = None,
+    use_proxy: bool = False,
+    adaptive: bool = False,
+):
+    return get_client_pool().client(service, region, profile, config=config, use_proxy=use_proxy, adaptive=adaptive)
+
+
+def get_env_client(
+    service: str,
+    env: Env,
+    region: str,
+    config: Optional[BotoConfig] = None,
+    use_proxy: bool = False,
+    adaptive: bool = False,
+):
+    """按环境推导 profile 后取 client。"""
+    profile = get_aws_profile(region, env.is_prod_aws)
+    return get_client(service, region, profile, config=config, use_proxy=use_proxy, adaptive=adaptive)
@@ -23,12 +23,41 @@
     - 传入 cancel 事件时，等待被切成小片，能在 100ms 内响应取消
     - 线程安全（threading.Lock）
     - 适用于在 QRunnable / ThreadPoolExecutor 等后台线程中调用 AWS API
+
+跨进程：
+    SharedRateLimiter 把桶状态放进 multiprocessing 共享内存，语义与 RateLimiter 相同，
+    在父进程创建后作为 Process 参数传给子进程，所有 worker 共用同一个 TPS 预算：
+
+    limiters = create_shared_limiters(keys=[('profile-a', 'cn-north-1')], rate=5)
+    multiprocessing.Process(target=worker, args=(limiters[key], ...))
+
+协程：
+    AsyncRateLimiter 是同语义的 asyncio 版本，在同一个事件循环内的协程之间共享：
+
+    limiter = AsyncRateLimiter.for_cloudwatch()
+    if not await limiter.acquire(cancel=stop):
+        raise Cancelled
+
+自适应：
+    AdaptiveRateLimiter 在令牌桶之上做 AIMD：调用成功时加性增速，被限流时乘性降速。
+    按 (account, region, API) 管理与持久化见 utils.adaptive_rate_control。
+
+    limiter = AdaptiveRateLimiter(rate=5)
+    limiter.acquire()
+    try:
+        client.filter_log_events(...)
+        limiter.on_success()
+    except ThrottlingError:
+        limiter.on_throttle()
 """
 
 from __future__ import annotations
 
+import asyncio
+import multiprocessing
 import threading
 import time
+from typing import Dict, Hashable, Iterable
 
 # 带 cancel 事件等待时的最大单次睡眠时长（秒），决定取消的响应延迟上限
 _CANCEL_POLL_INTERVAL = 0.1
@@ -142,3 +171,204 @@ class RateLimiter:
         capacity=10 允许启动时短暂突发，避免第一批请求全部等待。
         """
         return cls(rate=5.0, capacity=10.0)
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    AIMD 自适应令牌桶：成功时加性增速，被限流时乘性降速，逼近账号实际可承受的最高 TPS。
+
+    - on_success()：rate += increase / rate（稳态下约每秒 +increase TPS），不超过 max_rate
+    - on_throttle()：rate *= decrease，不低于 min_rate，并清空桶，后续请求立即按新速率排队；
+      同一批在途请求会先后报告限流，距上次降速不足 1 秒时不再重复降速
+    - 桶容量随 rate 变化：burst 秒的令牌量，至少 1
+
+    :param rate:     初始速率（TPS）
+    :param min_rate: 降速下限
+    :param max_rate: 增速上限
+    :param increase: 加性增量（TPS/秒）
+    :param decrease: 乘性降速系数（0~1）
+    :param burst:    桶容量对应的秒数
+    """
+
+    _DECREASE_COOLDOWN = 1.0  # 两次降速的最小间隔（秒）
+
+    def __init__(
+        self,
+        rate: float,
+        min_rate: float = 0.5,
+        max_rate: float = 50.0,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+        burst: float = 1.0,
+    ):
+        if not 0 < min_rate <= max_rate:
+            raise ValueError(f"invalid rate bounds: min_rate={min_rate}, max_rate={max_rate}")
+        if not 0 < decrease < 1:
+            raise ValueError(f"decrease must be in (0, 1), got {decrease}")
+        rate = min(max(rate, min_rate), max_rate)
+        super().__init__(rate, capacity=max(1.0, rate * burst))
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.burst = burst
+        self.throttle_count = 0
+        self._last_decrease = 0.0
+
+    def on_success(self) -> None:
+        """一次调用成功（未被限流）后调用。"""
+        with self._lock:
+            self._set_rate(min(self.max_rate, self._rate + self.increase / self._rate))
+
+    def on_throttle(self) -> None:
+        """一次调用被限流（ThrottlingException 等）后调用。"""
+        with self._lock:
+            self.throttle_count += 1
+            now = time.monotonic()
+            if now - self._last_decrease < self._DECREASE_COOLDOWN:
+                return
+            self._last_decrease = now
+            self._refill()
+            self._set_rate(max(self.min_rate, self._rate * self.decrease))
+            self._tokens = 0.0
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        预订 `tokens` 个令牌（允许透支），返回调用方应等待的秒数。
+
+        供不能阻塞线程的调用方（如 asyncio 钩子）使用：`await asyncio.sleep(limiter.reserve())`。
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self._rate)
+
+    def _set_rate(self, rate: float) -> None:
+        """更新速率与桶容量（须在持有锁时调用）。"""
+        self._rate = rate
+        self._capacity = max(1.0, rate * self.burst)
+        self._tokens = min(self._tokens, self._capacity)
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    跨进程令牌桶限速器。
+
+    令牌数与上次补充时间存放在 multiprocessing 共享内存（`Array('d')`）中，
+    由其自带的进程锁保护；acquire / 取消语义与 RateLimiter 完全一致。
+    time.monotonic() 在 Windows / Linux 上都是系统级时钟，跨进程可比。
+
+    只能在创建子进程时作为参数传递（随进程继承），不能经 Queue / Manager 传输。
+
+    :param rate:     每秒补充的令牌数（所有进程合计的最大 TPS）
+    :param capacity: 桶的最大容量，默认等于 rate
+    :param ctx:      multiprocessing 上下文，默认使用全局默认上下文
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None, ctx=None):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        ctx = ctx if ctx is not None else multiprocessing
+        self._rate = rate
+        self._capacity = float(capacity if capacity is not None else rate)
+        # [0] 当前令牌数，[1] 上次补充时间（monotonic 秒）；初始满桶
+        self._state = ctx.Array('d', [self._capacity, time.monotonic()])
+        self._lock = self._state.get_lock()
+
+    @property
+    def _tokens(self) -> float:
+        return self._state[0]
+
+    @_tokens.setter
+    def _tokens(self, value: float) -> None:
+        self._state[0] = value
+
+    @property
+    def _last_refill(self) -> float:
+        return self._state[1]
+
+    @_last_refill.setter
+    def _last_refill(self, value: float) -> None:
+        self._state[1] = value
+
+
+def create_shared_limiters(
+    keys: Iterable[Hashable],
+    rate: float,
+    capacity: float | None = None,
+    ctx=None,
+) -> Dict[Hashable, SharedRateLimiter]:
+    """
+    为每个 key（如 (account, region)）创建一个独立的 SharedRateLimiter。
+
+    须在启动子进程之前于父进程调用，重复的 key 只创建一次。
+    """
+    limiters: Dict[Hashable, SharedRateLimiter] = {}
+    for key in keys:
+        if key not in limiters:
+            limiters[key] = SharedRateLimiter(rate=rate, capacity=capacity, ctx=ctx)
+    return limiters
+
+
+class AsyncRateLimiter:
+    """
+    asyncio 版令牌桶限速器，语义同 RateLimiter。
+
+    只在单个事件循环内使用（不跨线程）；等待时让出事件循环，不阻塞其它协程。
+
+    :param rate:     每秒补充的令牌数（即允许的最大 TPS）
+    :param capacity: 桶的最大容量（允许的短暂突发量），默认等于 rate
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self._rate = rate
+        self._capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self._capacity       # 初始满桶
+        self._last_refill = time.monotonic()
+        self._lock: asyncio.Lock | None = None  # 延迟创建，绑定到首次使用时的事件循环
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    async def acquire(self, tokens: float = 1.0, cancel=None) -> bool:
+        """
+        消耗 `tokens` 个令牌，不足时异步等待。
+
+        :param cancel: 可选的取消事件（asyncio.Event / threading.Event 均可，只用 is_set()），
+                       等待按 <=100ms 分片轮询，被 set 后返回 False（不消耗令牌）。
+        :return: True 表示已取得令牌；False 仅在被 `cancel` 中断时返回。
+        """
+        if tokens > self._capacity:
+            raise ValueError(
+                f"Requested {tokens} tokens exceeds bucket capacity {self._capacity}"
+            )
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # 持锁排队：先到的协程先拿令牌，避免后到的协程插队导致饿死
+        async with self._lock:
+            while True:
+                if cancel is not None and cancel.is_set():
+                    return False
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._last_refill) * self._rate)
+                self._last_refill = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self._rate
+                await asyncio.sleep(wait if cancel is None else min(wait, _CANCEL_POLL_INTERVAL))
+
+    async def __aenter__(self) -> "AsyncRateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        pass
+
+    @classmethod
+    def for_cloudwatch(cls) -> "AsyncRateLimiter":
+        """同 RateLimiter.for_cloudwatch()：5 TPS，允许 10 个突发。"""
+        return cls(rate=5.0, capacity=10.0)